@@ -0,0 +1,156 @@
+import os
+import sys
+
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set the DJANGO_SETTINGS_MODULE environment variable
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")  # noqa
+
+# Initialize Django
+import django
+
+django.setup()
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from telebot import TeleBot, asyncio_filters, asyncio_helper, custom_filters
+from telebot.async_telebot import AsyncTeleBot
+
+from apps.bot.conf import TOKEN
+from apps.bot.loader import register_handlers
+from apps.bot.logger import logger
+from apps.bot.utils.identity import start_identity_refresh
+from apps.bot.utils.sender import ShapedTeleBot
+
+
+def _call_sync(func, *args):
+    # Same connection hygiene Django applies around a request.
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+class _SyncSimpleFilter(asyncio_filters.SimpleCustomFilter):
+    def __init__(self, bot, custom_filter):
+        self.key = custom_filter.key
+        self._bot = bot
+        self._filter = custom_filter
+
+    async def check(self, message):
+        return await self._bot.run_sync(self._filter.check, message)
+
+
+class _SyncAdvancedFilter(asyncio_filters.AdvancedCustomFilter):
+    def __init__(self, bot, custom_filter):
+        self.key = custom_filter.key
+        self._bot = bot
+        self._filter = custom_filter
+
+    async def check(self, message, value):
+        return await self._bot.run_sync(self._filter.check, message, value)
+
+
+class AsyncBot(AsyncTeleBot):
+    """
+    AsyncTeleBot that accepts the same synchronous handlers, filters and
+    middlewares as the threaded bot.
+
+    This is a thread-pool bridge: updates are received and dispatched on the
+    event loop, but every synchronous callable runs on a pool of
+    BOT_ASYNC_WORKERS threads and makes its Telegram API calls through the
+    blocking ``sync_bot``. At most BOT_ASYNC_WORKERS updates are handled at
+    once, the same bound the threaded bot has with as many threads.
+    """
+
+    def __init__(self, token: str, sync_bot: TeleBot, max_workers: int):
+        super().__init__(token)
+        self.sync_bot = sync_bot
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bot-handler"
+        )
+        self.sync_middlewares = []
+
+    async def run_sync(self, func, *args):
+        return await sync_to_async(
+            _call_sync, thread_sensitive=False, executor=self.executor
+        )(func, *args)
+
+    def _build_handler_dict(self, handler, pass_bot=False, **filters):
+        async def run_handler(update):
+            if pass_bot:
+                return await self.run_sync(handler, update, self.sync_bot)
+            return await self.run_sync(handler, update)
+
+        return super()._build_handler_dict(run_handler, **filters)
+
+    def add_custom_filter(self, custom_filter):
+        if isinstance(custom_filter, custom_filters.SimpleCustomFilter):
+            custom_filter = _SyncSimpleFilter(self, custom_filter)
+        elif isinstance(custom_filter, custom_filters.AdvancedCustomFilter):
+            custom_filter = _SyncAdvancedFilter(self, custom_filter)
+        super().add_custom_filter(custom_filter)
+
+    def register_middleware_handler(self, callback, update_types=None):
+        """
+        Register a legacy ``(bot, update)`` middleware, as used by TeleBot
+        with ``apihelper.ENABLE_MIDDLEWARE``.
+        """
+        self.sync_middlewares.append((callback, update_types))
+
+    def _prepare_update(self, update) -> None:
+        """
+        Run legacy middlewares on the update.
+        """
+        for callback, update_types in self.sync_middlewares:
+            if update_types is None:
+                callback(self.sync_bot, update)
+                continue
+            for update_type in update_types:
+                part = getattr(update, update_type, None)
+                if part is not None:
+                    callback(self.sync_bot, part)
+
+    async def _process_update(self, update):
+        try:
+            await self.run_sync(self._prepare_update, update)
+        except Exception as e:
+            logger.error(f"Error while preparing update {update.update_id}: {e}")
+            return
+        await super().process_new_updates([update])
+
+    async def process_new_updates(self, updates):
+        await asyncio.gather(*(self._process_update(update) for update in updates))
+
+
+# Size the shared aiohttp connection pool before the first request
+asyncio_helper.REQUEST_LIMIT = settings.BOT_ASYNC_CONNECTIONS
+
+sync_bot = ShapedTeleBot(TOKEN, threaded=False)
+bot = AsyncBot(TOKEN, sync_bot, max_workers=settings.BOT_ASYNC_WORKERS)
+logger.info("Async bot created")
+
+register_handlers(bot)
+
+
+async def run():
+    try:
+        await bot.infinity_polling(timeout=60, request_timeout=60)
+    finally:
+        await bot.close_session()
+        bot.executor.shutdown(wait=True)
+
+
+if __name__ == "__main__":
+    logger.info("Async bot is running...")
+    logger.info("Press Ctrl + C to stop the bot")
+    start_identity_refresh(sync_bot)
+    asyncio.run(run())
+    logger.info("Bot stopped")
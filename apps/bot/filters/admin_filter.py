@@ -1,6 +1,7 @@
 from telebot.custom_filters import SimpleCustomFilter
 
-from apps.shop.models.users import BotUsers, RoleChoices
+from apps.bot.utils.profile import get_profile
+from apps.shop.models.users import RoleChoices
 
 
 class AdminFilter(SimpleCustomFilter):
@@ -11,7 +12,5 @@ class AdminFilter(SimpleCustomFilter):
     key = "admin"
 
     def check(self, message):
-        admins = BotUsers.objects.exclude(role=RoleChoices.USER).values_list(
-            "telegram_id", flat=True
-        )
-        return message.from_user.id in admins
+        profile = get_profile(message.from_user.id)
+        return profile is not None and profile.role != RoleChoices.USER
@@ -1,6 +1,7 @@
 import re
+from typing import Optional
 
-from django.utils.translation import activate, gettext as _
+from django.utils.translation import gettext as _
 from telebot import TeleBot
 from telebot.types import (
     ReplyKeyboardMarkup,
@@ -16,38 +17,33 @@ from apps.bot.handlers.order import handle_order
 from apps.bot.handlers.user import start_handler
 from apps.bot.keyboard import get_main_buttons
 from apps.bot.logger import logger
-from apps.bot.utils import update_or_create_user
-from apps.bot.utils.language import set_language_code
-from apps.shop.models.cart import Cart, CartItem
-from apps.shop.models.users import BotUsers
+from apps.bot.utils import callbacks
+from apps.bot.utils.callbacks import Action
+from apps.bot.utils.catalog import get_products
+from apps.bot.utils.context import get_context
+from apps.bot.utils.media import send_photo
+from apps.shop.models.products import Product
+from apps.shop.services import cart as cart_service
+from apps.shop.services.cart import CartLine
 
 
 def handle_cart(message: Message, bot: TeleBot):
     user_id = message.from_user.id
-    activate(set_language_code(user_id))
-
-    update_or_create_user(
-        telegram_id=user_id,
-        username=message.from_user.username,
-        first_name=message.from_user.first_name,
-        last_name=message.from_user.last_name,
-        is_active=True,
-    )
+    context = get_context(message)
 
     logger.info(f"User {user_id} selected a handle cart.")
 
-    user = BotUsers.objects.filter(telegram_id=user_id).first()
-    if not user:
+    if not context.profile:
         bot.send_message(message.chat.id, _("User not found."))
         return
 
-    cart = Cart.objects.filter(user=user).first()
-    if not cart:
-        bot.send_message(message.chat.id, _("Cart is empty."))
-        return
-
-    cart_items = CartItem.objects.filter(cart=cart)
-    if not cart_items.exists():
+    lines = context.cart_lines
+    products = get_products(line.product_id for line in lines)
+    missing = [line.product_id for line in lines if line.product_id not in products]
+    if missing:
+        lines = cart_service.discard(context.profile.pk, missing)
+        context.reset_cart()
+    if not lines:
         bot.send_message(message.chat.id, _("Cart is empty."))
         return
 
@@ -62,10 +58,11 @@ def handle_cart(message: Message, bot: TeleBot):
     keyboard.add(KeyboardButton(text=home_text), KeyboardButton(text=clear_text))
 
     items_text = []
-    for index, item in enumerate(cart_items, start=1):
-        keyboard.add(KeyboardButton(text=f"№{index} - {item.product.title}✏️"))
+    for index, line in enumerate(lines, start=1):
+        product = products[line.product_id]
+        keyboard.add(KeyboardButton(text=f"№{index} - {product.title}✏️"))
         items_text.append(
-            f"№{index} - *{item.product.title}*\n{item.quantity} x {int(float(item.product.price)):,} = *{int(float(item.amount)):,} UZS*".replace(
+            f"№{index} - *{product.title}*\n{line.quantity} x {int(float(product.price)):,} = *{int(float(line.amount)):,} UZS*".replace(
                 ",", " "
             )
         )
@@ -74,10 +71,8 @@ def handle_cart(message: Message, bot: TeleBot):
 
     text = f"{your_cart_text}:\n\n{'-' * 20}\n\n"
     text += "\n".join(items_text)
-    text += (
-        f"\n\n{'-' * 20}\n\n{total_text}: *{int(float(cart.amount)):,} UZS*".replace(
-            ",", " "
-        )
+    text += f"\n\n{'-' * 20}\n\n{total_text}: *{int(float(lines[0].cart_amount)):,} UZS*".replace(
+        ",", " "
     )
 
     bot.send_message(
@@ -85,32 +80,36 @@ def handle_cart(message: Message, bot: TeleBot):
     )
 
 
-def build_cart_item_keyboard(item):
+def build_cart_item_keyboard(line: CartLine, user_id: int):
+    def data(action):
+        return callbacks.encode(action, line.product_id, user_id=user_id)
+
     keyboard = InlineKeyboardMarkup()
     keyboard.add(
-        InlineKeyboardButton(text=_("Clear"), callback_data=f"clear_{item.id}")
+        InlineKeyboardButton(text=_("Clear"), callback_data=data(Action.CART_CLEAR))
     )
     keyboard.row(
-        InlineKeyboardButton(text=_("➖"), callback_data=f"minus_{item.id}"),
+        InlineKeyboardButton(text=_("➖"), callback_data=data(Action.CART_MINUS)),
         InlineKeyboardButton(
-            text=f"{item.quantity}", callback_data=f"quantity_{item.id}"
+            text=f"{line.quantity}", callback_data=f"quantity_{line.product_id}"
         ),
-        InlineKeyboardButton(text=_("➕"), callback_data=f"plus_{item.id}"),
+        InlineKeyboardButton(text=_("➕"), callback_data=data(Action.CART_PLUS)),
+    )
+    keyboard.add(
+        InlineKeyboardButton(text=_("Save"), callback_data=data(Action.CART_SAVE))
     )
-    keyboard.add(InlineKeyboardButton(text=_("Save"), callback_data=f"save_{item.id}"))
     return keyboard
 
 
-def update_cart_message(bot, call, item):
-    user_id = call.from_user.id
-    activate(set_language_code(user_id))
-    keyboard = build_cart_item_keyboard(item)
+def update_cart_message(bot, call, line: CartLine, product: Product):
+    get_context(call)
+    keyboard = build_cart_item_keyboard(line, call.from_user.id)
     total_text = _("Total amount")
     pieces_text = _("pieces")
     new_caption = (
-        f"{item.product.title}\n\n\t\t{item.product.description}\n\n"
-        f"{total_text}: *{int(float(item.amount)):,} UZS*\n\n"
-        f"{item.quantity} {pieces_text}"
+        f"{product.title}\n\n\t\t{product.description}\n\n"
+        f"{total_text}: *{int(float(line.amount)):,} UZS*\n\n"
+        f"{line.quantity} {pieces_text}"
     ).replace(",", " ")
 
     current_caption = call.message.caption
@@ -137,31 +136,16 @@ def handle_cart_selection(message, bot: TeleBot):
     Handle a user’s selection on the cart menu.
     """
     user_id = message.from_user.id
-    activate(set_language_code(user_id))
-
-    # Update or create the user record.
-    update_or_create_user(
-        telegram_id=user_id,
-        username=message.from_user.username,
-        first_name=message.from_user.first_name,
-        last_name=message.from_user.last_name,
-        is_active=True,
-    )
+    context = get_context(message)
 
     logger.info(f"User {user_id} selected a handle cart selection.")
 
-    user = BotUsers.objects.filter(telegram_id=user_id).first()
-    if not user:
+    if not context.profile:
         bot.send_message(message.chat.id, _("User not found."))
         return
 
-    cart = Cart.objects.filter(user=user).first()
-    if not cart:
-        bot.send_message(message.chat.id, _("Cart is empty."))
-        return
-
-    cart_items = CartItem.objects.filter(cart=cart)
-    if not cart_items.exists():
+    lines = context.cart_lines
+    if not lines:
         bot.send_message(message.chat.id, _("Cart is empty."))
         return
 
@@ -179,21 +163,28 @@ def handle_cart_selection(message, bot: TeleBot):
         try:
             # Extract the index from text like "№3 - ..." and adjust for 0-based indexing.
             index = int(text.split("№")[1].split(" -")[0]) - 1
-            item = cart_items[index]
+            line = lines[index]
         except (IndexError, ValueError):
             bot.send_message(
                 message.chat.id, _("Invalid selection format or item not found.")
             )
             return
 
-        keyboard = build_cart_item_keyboard(item)
-        bot.send_photo(
+        product = get_product(line.product_id)
+        if product is None:
+            # Deleted since it was added; the cart shown again leaves it out
+            bot.send_message(message.chat.id, _("Item not found."))
+            handle_cart(message, bot)
+            return
+        keyboard = build_cart_item_keyboard(line, user_id)
+        send_photo(
+            bot,
             message.chat.id,
-            photo=item.product.image,
+            product.image,
             caption=(
-                f"{item.product.title}\n\n\t\t{item.product.description}\n\n"
-                f"{_('Total amount')}: *{int(float(item.amount)):,} UZS*\n\n"
-                f"{item.quantity} {_('pieces')}"
+                f"{product.title}\n\n\t\t{product.description}\n\n"
+                f"{_('Total amount')}: *{int(float(line.amount)):,} UZS*\n\n"
+                f"{line.quantity} {_('pieces')}"
             ).replace(",", " "),
             reply_markup=keyboard,
             parse_mode="Markdown",
@@ -204,68 +195,70 @@ def handle_cart_selection(message, bot: TeleBot):
         handle_cart(message, bot)
 
 
-def get_cart_item(item_id: str, bot: TeleBot, call: CallbackQuery):
+def get_product(product_id: int) -> Optional[Product]:
     """
-    Retrieve a CartItem by its ID. If not found, notify via callback.
+    The product of a cart line, from the catalog snapshot when it is there.
+    None if it was deleted since it was added to the cart.
     """
-    user_id = call.from_user.id
-    activate(set_language_code(user_id))
-    try:
-        return CartItem.objects.get(id=item_id)
-    except CartItem.DoesNotExist:
+    return get_products([product_id]).get(product_id)
+
+
+def get_line_product(call: CallbackQuery, bot: TeleBot, product_id: int):
+    """
+    The product of the cart line a callback is about. A deleted product has
+    its line dropped from the cart and the user is told it is gone.
+    """
+    product = get_product(product_id)
+    if product is None:
+        context = get_context(call)
+        cart_service.discard(context.profile.pk, [product_id])
+        context.reset_cart()
         bot.answer_callback_query(call.id, text=_("Item not found."))
-        return None
+    return product
 
 
-def plus_handler(call: CallbackQuery, bot: TeleBot):
+def plus_handler(call: CallbackQuery, bot: TeleBot, product_id: int):
     """
     Increase the quantity of a cart item.
     """
-    user_id = call.from_user.id
-    activate(set_language_code(user_id))
-    item_id = call.data.split("_")[1]
-    item = get_cart_item(item_id, bot, call)
-    if not item:
+    context = get_context(call)
+    product = get_line_product(call, bot, product_id)
+    if product is None:
+        return
+    line = cart_service.increment(context.profile.pk, product_id)
+    if line is None:
+        bot.answer_callback_query(call.id, text=_("Item not found."))
         return
 
-    item.quantity += 1
-    item.amount = item.quantity * item.product.price
-    item.save()
-    update_cart_message(bot, call, item)
+    update_cart_message(bot, call, line, product)
 
 
-def minus_handler(call: CallbackQuery, bot: TeleBot):
+def minus_handler(call: CallbackQuery, bot: TeleBot, product_id: int):
     """
     Decrease the quantity of a cart item (ensuring quantity remains at least 1).
     """
-    user_id = call.from_user.id
-    activate(set_language_code(user_id))
-    item_id = call.data.split("_")[1]
-    item = get_cart_item(item_id, bot, call)
-    if not item:
+    context = get_context(call)
+    product = get_line_product(call, bot, product_id)
+    if product is None:
         return
-
-    if item.quantity > 1:
-        item.quantity -= 1
-        item.amount = item.quantity * item.product.price
-        item.save()
-        update_cart_message(bot, call, item)
-    else:
+    line = cart_service.decrement(context.profile.pk, product_id)
+    if line is not None:
+        update_cart_message(bot, call, line, product)
+    elif any(line.product_id == product_id for line in context.cart_lines):
         bot.answer_callback_query(call.id, text=_("Quantity cannot be less than 1."))
+    else:
+        bot.answer_callback_query(call.id, text=_("Item not found."))
 
 
-def clear_handler(call: CallbackQuery, bot: TeleBot):
+def clear_handler(call: CallbackQuery, bot: TeleBot, product_id: int):
     """
     Remove an item from the cart.
     """
-    user_id = call.from_user.id
-    activate(set_language_code(user_id))
-    item_id = call.data.split("_")[1]
-    item = get_cart_item(item_id, bot, call)
-    if not item:
+    context = get_context(call)
+    if cart_service.remove(context.profile.pk, product_id) is None:
+        bot.answer_callback_query(call.id, text=_("Item not found."))
         return
 
-    item.delete()
     bot.delete_message(call.message.chat.id, call.message.message_id)
     bot.send_message(
         call.message.chat.id,
@@ -274,20 +267,12 @@ def clear_handler(call: CallbackQuery, bot: TeleBot):
     )
 
 
-def save_handler(call: CallbackQuery, bot: TeleBot):
+def save_handler(call: CallbackQuery, bot: TeleBot, product_id: int):
     """
-    Save changes for a cart item.
+    Close the cart item message; changes are already saved.
     """
-    user_id = call.from_user.id
-    activate(set_language_code(user_id))
-    item_id = call.data.split("_")[1]
-    item = get_cart_item(item_id, bot, call)
-    if not item:
-        return
-
-    # Place any additional save logic here if necessary.
+    get_context(call)
     bot.answer_callback_query(call.id, text=_("Changes saved."))
-    update_cart_message(bot, call, item)
     bot.delete_message(call.message.chat.id, call.message.message_id)
     bot.send_message(
         call.message.chat.id, _("Changes saved."), reply_markup=get_main_buttons()
@@ -1,7 +1,7 @@
 import uuid
 
 from click_up import ClickUp
-from django.utils.translation import activate, gettext as _
+from django.utils.translation import gettext as _
 from payme import Payme
 from telebot import TeleBot
 from telebot.types import (
@@ -12,11 +12,12 @@ from telebot.types import (
 )
 
 from apps.bot.logger import logger
-from apps.bot.utils import update_or_create_user
-from apps.bot.utils.language import set_language_code
+from apps.bot.utils import callbacks
+from apps.bot.utils.bot_url import payment_success_link
+from apps.bot.utils.callbacks import Action
+from apps.bot.utils.context import get_context
 from apps.shop.models.donate import Donate
 from apps.shop.models.order import Order
-from apps.shop.models.users import BotUsers
 from core import settings
 
 # Initialize payment processors
@@ -34,7 +35,7 @@ def send_message(
 
 
 def send_donation_selection(
-    chat_id: int, row_width: int = 2
+    user_id: int, row_width: int = 2
 ) -> (str, InlineKeyboardMarkup):
     """
     Build the donation selection message and keyboard.
@@ -47,7 +48,12 @@ def send_donation_selection(
     for index, donate in enumerate(donate_prices):
         # Format the amount and build the callback data
         text = f"{int(float(donate.amount)):,} UZS".replace(",", " ")
-        button = InlineKeyboardButton(text=text, callback_data=f"donate_{donate.id}")
+        button = InlineKeyboardButton(
+            text=text,
+            callback_data=callbacks.encode(
+                Action.DONATE_AMOUNT, donate.id, user_id=user_id
+            ),
+        )
         row.append(button)
         if (index + 1) % row_width == 0:
             keyboard.row(*row)
@@ -59,19 +65,27 @@ def send_donation_selection(
     return text, keyboard
 
 
-def get_payment_method_keyboard(order: Order) -> (str, InlineKeyboardMarkup):
+def get_payment_method_keyboard(
+    order: Order, user_id: int
+) -> (str, InlineKeyboardMarkup):
     """
     Build the payment method selection message and keyboard for a given order.
     """
     keyboard = InlineKeyboardMarkup()
     keyboard.add(
         InlineKeyboardButton(
-            text=_("Payme"), callback_data=f"select_donate_payme_{order.id}"
+            text=_("Payme"),
+            callback_data=callbacks.encode(
+                Action.DONATE_PAYME, order.id, user_id=user_id
+            ),
         )
     )
     keyboard.add(
         InlineKeyboardButton(
-            text=_("Click"), callback_data=f"select_donate_click_{order.id}"
+            text=_("Click"),
+            callback_data=callbacks.encode(
+                Action.DONATE_CLICK, order.id, user_id=user_id
+            ),
         )
     )
     keyboard.add(
@@ -84,7 +98,7 @@ def get_payment_method_keyboard(order: Order) -> (str, InlineKeyboardMarkup):
 
 
 def get_payment_link_keyboard(
-    order: Order, payment_link: str, method: str
+    order: Order, payment_link: str, method: str, user_id: int
 ) -> (str, InlineKeyboardMarkup):
     """
     Build the final payment link message and keyboard.
@@ -95,7 +109,10 @@ def get_payment_link_keyboard(
     keyboard.add(InlineKeyboardButton(text=button_text, url=payment_link))
     keyboard.add(
         InlineKeyboardButton(
-            text=_("Back"), callback_data=f"back_to_payment_method_{order.id}"
+            text=_("Back"),
+            callback_data=callbacks.encode(
+                Action.DONATE_METHODS, order.id, user_id=user_id
+            ),
         )
     )
     text = _("Click the button below to complete your donation of {amount}:").format(
@@ -108,28 +125,21 @@ def handle_donate(message: Message, bot: TeleBot) -> None:
     """
     Handle the initial donation command.
     """
-    activate(set_language_code(message.from_user.id))
-    update_or_create_user(
-        telegram_id=message.from_user.id,
-        username=message.from_user.username,
-        first_name=message.from_user.first_name,
-        last_name=message.from_user.last_name,
-        is_active=True,
-    )
+    get_context(message)
     logger.info(f"User {message.from_user.id} initiated a donation.")
 
-    text, keyboard = send_donation_selection(message.chat.id)
+    text, keyboard = send_donation_selection(message.from_user.id)
     send_message(bot, message.chat.id, text, keyboard)
 
 
-def handle_donate_selection(call: CallbackQuery, bot: TeleBot) -> None:
+def handle_donate_selection(
+    call: CallbackQuery, bot: TeleBot, donate_id: int = None
+) -> None:
     """
     Handle donation amount selection as well as cancel and back actions.
     """
-    activate(set_language_code(call.from_user.id))
-    try:
-        user = BotUsers.objects.get(telegram_id=call.from_user.id)
-    except BotUsers.DoesNotExist:
+    user = get_context(call).user
+    if user is None:
         bot.answer_callback_query(call.id, _("User not found."))
         return
 
@@ -140,7 +150,7 @@ def handle_donate_selection(call: CallbackQuery, bot: TeleBot) -> None:
             send_message(bot, call.message.chat.id, _("Donation canceled."))
             bot.answer_callback_query(call.id, _("Donation canceled."))
         else:
-            text, keyboard = send_donation_selection(call.message.chat.id)
+            text, keyboard = send_donation_selection(call.from_user.id)
             bot.edit_message_text(
                 chat_id=call.message.chat.id,
                 message_id=call.message.message_id,
@@ -151,13 +161,10 @@ def handle_donate_selection(call: CallbackQuery, bot: TeleBot) -> None:
         return
 
     # Process donation amount selection
-    if call.data.startswith("donate_") and not (
-        call.data.startswith("donate_payme_") or call.data.startswith("donate_click_")
-    ):
+    if donate_id is not None:
         try:
-            donate_id = int(call.data.split("_")[1])
             donate = Donate.objects.get(id=donate_id)
-        except (IndexError, ValueError, Donate.DoesNotExist):
+        except Donate.DoesNotExist:
             bot.answer_callback_query(call.id, _("Invalid donation option."))
             return
 
@@ -168,7 +175,7 @@ def handle_donate_selection(call: CallbackQuery, bot: TeleBot) -> None:
             user=user,
             order_type=Order.OrderType.DONATE,
         )
-        text, keyboard = get_payment_method_keyboard(order)
+        text, keyboard = get_payment_method_keyboard(order, call.from_user.id)
         bot.edit_message_text(
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
@@ -185,22 +192,24 @@ def handle_donate_selection(call: CallbackQuery, bot: TeleBot) -> None:
     logger.info(f"User {call.from_user.id} sent unrecognized callback: {call.data}")
 
 
-def handle_send_donate_link(call: CallbackQuery, bot: TeleBot) -> None:
+def handle_send_donate_link(
+    call: CallbackQuery, bot: TeleBot, order_id: int, method: str = None
+) -> None:
     """
-    Handle payment method selection and display the final payment link.
-    Also supports navigation back to the payment method selection screen.
+    Handle payment method selection ("payme" or "click") and display the
+    final payment link. Without a method, go back to the payment method
+    selection screen.
     """
-    activate(set_language_code(call.from_user.id))
-    # Handle navigation back to payment method selection
-    if call.data.startswith("back_to_payment_method_"):
-        try:
-            order_id = int(call.data.split("_")[-1])
-            order = Order.objects.get(id=order_id)
-        except (ValueError, Order.DoesNotExist):
-            bot.answer_callback_query(call.id, _("Order not found."))
-            return
+    get_context(call)
+    try:
+        order = Order.objects.get(id=order_id)
+    except Order.DoesNotExist:
+        bot.answer_callback_query(call.id, _("Order not found."))
+        return
 
-        text, keyboard = get_payment_method_keyboard(order)
+    # Handle navigation back to payment method selection
+    if method is None:
+        text, keyboard = get_payment_method_keyboard(order, call.from_user.id)
         bot.edit_message_text(
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
@@ -210,38 +219,26 @@ def handle_send_donate_link(call: CallbackQuery, bot: TeleBot) -> None:
         bot.answer_callback_query(call.id, _("Returning to payment selection."))
         return
 
-    parts = call.data.split("_")
-    if len(parts) < 4:
-        bot.answer_callback_query(call.id, _("Invalid payment data."))
-        return
-
-    try:
-        order_id = int(parts[3])
-        order = Order.objects.get(id=order_id)
-    except (ValueError, Order.DoesNotExist):
-        bot.answer_callback_query(call.id, _("Order not found."))
-        return
-
     # Generate the payment link based on the selected payment method
-    if call.data.startswith("select_donate_payme_"):
+    if method == "payme":
         payment_link = payme_service.initializer.generate_pay_link(
             id=order.id,
             amount=int(float(order.amount)),
-            return_url=str(settings.PAYME_SUCCESS_URL),
+            return_url=payment_success_link("payme"),
         )
-        method = "payme"
-    elif call.data.startswith("select_donate_click_"):
+    elif method == "click":
         payment_link = click_service.initializer.generate_pay_link(
             id=order.id,
             amount=int(float(order.amount)),
-            return_url=str(settings.CLICK_SUCCESS_URL),
+            return_url=payment_success_link("click"),
         )
-        method = "click"
     else:
         bot.answer_callback_query(call.id, _("Unrecognized payment method."))
         return
 
-    text, keyboard = get_payment_link_keyboard(order, payment_link, method)
+    text, keyboard = get_payment_link_keyboard(
+        order, payment_link, method, call.from_user.id
+    )
     bot.edit_message_text(
         chat_id=call.message.chat.id,
         message_id=call.message.message_id,
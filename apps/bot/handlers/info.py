@@ -1,23 +1,16 @@
-from django.utils.translation import activate, gettext as _
+from django.utils.translation import gettext as _
 from telebot import TeleBot
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
 from telebot.types import Message
 
 from apps.bot.logger import logger
-from apps.bot.utils import update_or_create_user
-from apps.bot.utils.language import set_language_code
+from apps.bot.utils.context import get_context
+from apps.bot.utils.media import send_photo
 from apps.shop.models.info import Info
 
 
 def handle_info(message: Message, bot: TeleBot):
-    activate(set_language_code(message.from_user.id))
-    update_or_create_user(
-        telegram_id=message.from_user.id,
-        username=message.from_user.username,
-        first_name=message.from_user.first_name,
-        last_name=message.from_user.last_name,
-        is_active=True,
-    )
+    get_context(message)
     logger.info(f"User {message.from_user.id} selected a info.")
 
     inline_keyboard = InlineKeyboardMarkup()
@@ -32,9 +25,10 @@ def handle_info(message: Message, bot: TeleBot):
         return
     for info in infos:
         caption = f"*{info.title}*\n\n{info.description}"
-        bot.send_photo(
+        send_photo(
+            bot,
             message.chat.id,
-            photo=info.image,
+            info.image,
             caption=caption,
             parse_mode="Markdown",
             reply_markup=inline_keyboard,
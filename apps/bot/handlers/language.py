@@ -4,20 +4,12 @@ from telebot.types import Message, CallbackQuery
 
 from apps.bot.keyboard import get_main_buttons
 from apps.bot.logger import logger
-from apps.bot.utils import update_or_create_user
-from apps.bot.utils.language import set_language_code
-from apps.shop.models.users import BotUsers, LanguageChoices
+from apps.bot.utils.context import get_context
+from apps.shop.models.users import LanguageChoices
 
 
 def handle_language(message: Message, bot: TeleBot):
-    activate(set_language_code(message.from_user.id))
-    update_or_create_user(
-        telegram_id=message.from_user.id,
-        username=message.from_user.username,
-        first_name=message.from_user.first_name,
-        last_name=message.from_user.last_name,
-        is_active=True,
-    )
+    get_context(message)
     keyboard = types.InlineKeyboardMarkup(row_width=2)
     logger.info(f"User {message.from_user.id} selected a language.")
 
@@ -36,15 +28,14 @@ def handle_language(message: Message, bot: TeleBot):
 
 
 def handle_language_selection(call: CallbackQuery, bot: TeleBot):
-    activate(set_language_code(call.from_user.id))
-    user = BotUsers.objects.get(telegram_id=call.from_user.id)
+    user = get_context(call).user
     logger.info(f"User {user.telegram_id} selected a language.")
     if call.data == "lang_ru":
         user.language_code = LanguageChoices.RU
     elif call.data == "lang_uz":
         user.language_code = LanguageChoices.UZ
     user.save()
-    activate(set_language_code(call.from_user.id))
+    activate(user.language_code)
     bot.send_message(
         call.message.chat.id,
         _("Language updated successfully!"),
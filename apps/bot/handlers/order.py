@@ -1,10 +1,5 @@
-import json
-import os
-import uuid
-
-import redis
 from click_up import ClickUp
-from django.utils.translation import activate, gettext as _
+from django.utils.translation import gettext as _
 from payme import Payme
 from telebot import TeleBot
 from telebot.types import (
@@ -19,18 +14,13 @@ from telebot.types import (
 
 from apps.bot.keyboard import get_main_buttons
 from apps.bot.logger import logger
-from apps.bot.utils import update_or_create_user
-from apps.bot.utils.language import set_language_code
-from apps.shop.models.cart import Cart, CartItem
-from apps.shop.models.order import Order, PaymentMethodChoices, OrderItem
-from apps.shop.models.users import BotUsers
+from apps.bot.states import OrderStates, clear_state, set_state
+from apps.bot.utils.bot_url import payment_success_link
+from apps.bot.utils.context import get_context
+from apps.shop.models.order import PaymentMethodChoices
+from apps.shop.services.checkout import checkout
 from core import settings
 
-# Initialize Redis instance
-redis_instance = redis.StrictRedis.from_url(
-    os.getenv("REDIS_CACHE_URL"), decode_responses=True
-)
-
 # Initialize Payment Services
 click_service = ClickUp(
     service_id=settings.CLICK_SERVICE_ID, merchant_id=settings.CLICK_MERCHANT_ID
@@ -38,41 +28,15 @@ click_service = ClickUp(
 payme_service = Payme(payme_id=settings.PAYME_ID, is_test_mode=settings.PAYME_TEST_MODE)
 
 
-def set_user_data(user_id: int, data: dict) -> None:
-    key = f"user_data:{user_id}"
-    redis_instance.set(key, json.dumps(data))
-
-
-def get_user_data(user_id: int) -> dict:
-    key = f"user_data:{user_id}"
-    data = redis_instance.get(key)
-    return json.loads(data) if data else {}
-
-
-def delete_user_data(user_id: int) -> None:
-    key = f"user_data:{user_id}"
-    redis_instance.delete(key)
-
-
 def send_reply(bot: TeleBot, user_id: int, text: str, reply_markup) -> None:
     bot.send_message(chat_id=user_id, text=text, reply_markup=reply_markup)
 
 
 def handle_order(message: Message, bot: TeleBot) -> None:
     user_id = message.from_user.id
-    activate(set_language_code(user_id))
-    update_or_create_user(
-        telegram_id=user_id,
-        username=message.from_user.username,
-        first_name=message.from_user.first_name,
-        last_name=message.from_user.last_name,
-        is_active=True,
-    )
+    get_context(message)
     logger.info(f"User {user_id} selected to start an order.")
 
-    # Initialize empty session data in Redis
-    set_user_data(user_id, {})
-
     markup = ReplyKeyboardMarkup(
         row_width=2, resize_keyboard=True, one_time_keyboard=True
     )
@@ -83,11 +47,12 @@ def handle_order(message: Message, bot: TeleBot) -> None:
     )
 
     send_reply(bot, user_id, _("Please, send your location."), markup)
-    bot.register_next_step_handler(message, handle_location, bot=bot)
+    set_state(user_id, OrderStates.location)
 
 
 def handle_location(message: Message, bot: TeleBot) -> None:
     user_id = message.from_user.id
+    get_context(message)
     try:
         latitude = message.location.latitude
         longitude = message.location.longitude
@@ -98,21 +63,20 @@ def handle_location(message: Message, bot: TeleBot) -> None:
 
     logger.info(f"User {user_id} location: lat={latitude}, lon={longitude}")
 
-    user_data = get_user_data(user_id)
-    user_data.update({"latitude": latitude, "longitude": longitude})
-    set_user_data(user_id, user_data)
-
     markup = ReplyKeyboardMarkup(
         row_width=1, resize_keyboard=True, one_time_keyboard=True
     )
     markup.add(KeyboardButton(text=_("Send your phone"), request_contact=True))
 
     send_reply(bot, user_id, _("Please, send your phone number."), markup)
-    bot.register_next_step_handler(message, handle_contact, bot=bot)
+    set_state(user_id, OrderStates.contact, latitude=latitude, longitude=longitude)
 
 
-def handle_contact(message: Message, bot: TeleBot) -> None:
+def handle_contact(
+    message: Message, bot: TeleBot, latitude: float = None, longitude: float = None
+) -> None:
     user_id = message.from_user.id
+    get_context(message)
     try:
         contact = message.contact.phone_number
     except AttributeError:
@@ -121,9 +85,13 @@ def handle_contact(message: Message, bot: TeleBot) -> None:
         return
 
     logger.info(f"User {user_id} phone: {contact}")
-    user_data = get_user_data(user_id)
-    user_data["contact"] = contact
-    set_user_data(user_id, user_data)
+    set_state(
+        user_id,
+        OrderStates.payment,
+        latitude=latitude,
+        longitude=longitude,
+        contact=contact,
+    )
 
     bot.send_message(
         user_id, _("I've saved your phone number."), reply_markup=ReplyKeyboardRemove()
@@ -140,14 +108,15 @@ def handle_contact(message: Message, bot: TeleBot) -> None:
 
 def handle_payment(call: CallbackQuery, bot: TeleBot) -> None:
     user_id = call.from_user.id
-    try:
-        user = BotUsers.objects.get(telegram_id=user_id)
-    except BotUsers.DoesNotExist:
+    context = get_context(call)
+    user = context.user
+    if user is None:
         logger.error(f"User {user_id} not found.")
         bot.answer_callback_query(call.id, text=_("User not found."))
         return
 
-    user_data = get_user_data(user_id)
+    state = context.state
+    user_data = state.data if state and state.name == OrderStates.payment.name else {}
     if call.data == "click":
         payment_method = PaymentMethodChoices.CLICK
     elif call.data == "payme":
@@ -157,37 +126,18 @@ def handle_payment(call: CallbackQuery, bot: TeleBot) -> None:
         bot.answer_callback_query(call.id, text=_("Invalid payment method selected."))
         return
 
-    try:
-        cart = Cart.objects.get(user=user)
-        cart_items = CartItem.objects.filter(cart=cart)
-    except Exception as e:
-        logger.error(f"Error retrieving cart for user {user_id}: {e}")
+    order = checkout(
+        user.pk,
+        payment_method,
+        latitude=user_data.get("latitude"),
+        longitude=user_data.get("longitude"),
+        phone=user_data.get("contact"),
+    )
+    if order is None:
+        logger.error(f"Cart not found for user {user_id}.")
         bot.answer_callback_query(call.id, text=_("Error retrieving your cart."))
         return
-
-    order_identifier = f"order_{uuid.uuid4()}"
-    order, created = Order.objects.update_or_create(
-        order_id=order_identifier,
-        user=user,
-        order_type=Order.OrderType.PRODUCT,
-        defaults={
-            "latitude": user_data.get("latitude"),
-            "longitude": user_data.get("longitude"),
-            "phone": user_data.get("contact"),
-            "payment_method": payment_method,
-        },
-    )
-
-    for cart_item in cart_items:
-        OrderItem.objects.create(
-            order=order,
-            product=cart_item.product,
-            quantity=cart_item.quantity,
-            price=cart_item.product.price,
-        )
-    logger.info(
-        f"Order for user {user_id} {'created' if created else 'updated'} with data: {user_data}"
-    )
+    logger.info(f"Order {order.pk} created for user {user_id} with data: {user_data}")
 
     if call.data == "click":
         response_text = _(
@@ -196,7 +146,7 @@ def handle_payment(call: CallbackQuery, bot: TeleBot) -> None:
         payment_link = click_service.initializer.generate_pay_link(
             id=order.id,
             amount=int(float(order.amount)),
-            return_url=str(settings.CLICK_SUCCESS_URL),
+            return_url=payment_success_link("click"),
         )
     else:  # payme
         response_text = _(
@@ -205,14 +155,14 @@ def handle_payment(call: CallbackQuery, bot: TeleBot) -> None:
         payment_link = payme_service.initializer.generate_pay_link(
             id=order.id,
             amount=int(float(order.amount)),
-            return_url=str(settings.PAYME_SUCCESS_URL),
+            return_url=payment_success_link("payme"),
         )
 
     keyboard = InlineKeyboardMarkup()
     keyboard.add(InlineKeyboardButton(text=_("Pay"), url=payment_link))
 
-    # Clean up temporary user data
-    delete_user_data(user_id)
+    # The order is placed, the conversation is over
+    clear_state(user_id)
 
     # your_cart_text = _("Products")
     # total_text = _("Total")
@@ -1,6 +1,6 @@
-import re
+import functools
 
-from django.utils.translation import activate, gettext as _
+from django.utils.translation import gettext as _
 from telebot import TeleBot
 from telebot.types import Message, CallbackQuery
 
@@ -21,80 +21,140 @@ from apps.bot.handlers.donate import (
 from apps.bot.handlers.help import handle_help
 from apps.bot.handlers.info import handle_info
 from apps.bot.handlers.language import handle_language, handle_language_selection
-from apps.bot.handlers.order import handle_order, handle_payment
+from apps.bot.handlers.order import (
+    handle_order,
+    handle_payment,
+    handle_location,
+    handle_contact,
+)
 from apps.bot.handlers.privacy import handle_privacy
-from apps.bot.handlers.products import handle_category
+from apps.bot.handlers.products import (
+    handle_category,
+    handle_product,
+    handle_product_count,
+    create_cart_item,
+)
 from apps.bot.handlers.user import start_handler
 from apps.bot.keyboard import get_main_buttons
 from apps.bot.logger import logger
-from apps.bot.utils import update_or_create_user
-from apps.bot.utils.language import set_language_code
+from apps.bot.states import OrderStates, ProductStates, clear_state
+from apps.bot.utils import callbacks
+from apps.bot.utils.callbacks import Action
+from apps.bot.utils.context import get_context
+from apps.bot.utils.router import Router
+
+# Conversation step waiting for the next message, by state name
+STATE_HANDLERS = {
+    ProductStates.category.name: handle_product,
+    ProductStates.product.name: handle_product_count,
+    ProductStates.quantity.name: create_cart_item,
+    OrderStates.location.name: handle_location,
+    OrderStates.contact.name: handle_contact,
+}
+
+
+def handle_state(message: Message, bot: TeleBot) -> bool:
+    """
+    Pass the message to the step the user's conversation is waiting for.
+    The state is consumed like a next-step handler; the step sets the next one.
+    """
+    state = get_context(message).state
+    handler = STATE_HANDLERS.get(state.name) if state else None
+    if handler is None:
+        return False
+
+    clear_state(message.from_user.id)
+    handler(message, bot, **state.data)
+    return True
+
+
+# Handlers of signed callbacks, called with the ids the callback carries
+ACTION_HANDLERS = {
+    Action.CART_PLUS: plus_handler,
+    Action.CART_MINUS: minus_handler,
+    Action.CART_CLEAR: clear_handler,
+    Action.CART_SAVE: save_handler,
+    Action.DONATE_AMOUNT: handle_donate_selection,
+    Action.DONATE_PAYME: functools.partial(handle_send_donate_link, method="payme"),
+    Action.DONATE_CLICK: functools.partial(handle_send_donate_link, method="click"),
+    Action.DONATE_METHODS: handle_send_donate_link,
+}
+
+
+def build_message_router() -> Router:
+    router = Router()
+    router.add_label("Language", handle_language)
+    router.add("/language", handle_language)
+    router.add_label("Cart", handle_cart)
+    router.add_label("Order", handle_order)
+    router.add_label("Clear", handle_clear)
+    router.add_label("Products", handle_category)
+    router.add_label("Info", handle_info)
+    router.add("/info", handle_info)
+    router.add_label("Donate", handle_donate)
+    router.add_label("Home", start_handler)
+    router.add("/help", handle_help)
+    router.add("/privacy", handle_privacy)
+    # Cart item buttons look like "№3 - <title>"
+    router.add_prefix("№", handle_cart_selection)
+    return router
+
+
+def build_callback_router() -> Router:
+    router = Router()
+    router.add("lang_ru", handle_language_selection)
+    router.add("lang_uz", handle_language_selection)
+    router.add("donate_cancel", handle_donate_selection)
+    router.add("back_to_amount_selection", handle_donate_selection)
+    router.add("payme", handle_payment)
+    router.add("click", handle_payment)
+    return router
+
+
+@functools.cache
+def get_message_router() -> Router:
+    return build_message_router()
+
+
+@functools.cache
+def get_callback_router() -> Router:
+    return build_callback_router()
 
 
 def handle_message(message: Message, bot: TeleBot):
-    activate(set_language_code(message.from_user.id))
-    if message.text == _("Language") or message.text == "/language":
-        handle_language(message, bot)
-    elif message.text == _("Cart"):
-        handle_cart(message, bot)
-    elif message.text == _("Order"):
-        handle_order(message, bot)
-    elif message.text == _("Clear"):
-        handle_clear(message, bot)
-    elif message.text == _("Products"):
-        handle_category(message, bot)
-    elif message.text == _("Info") or message.text == "/info":
-        handle_info(message, bot)
-    elif message.text == _("Donate"):
-        handle_donate(message, bot)
-    elif message.text == _("Home"):
-        start_handler(message, bot)
-    elif message.text == "/help":
-        handle_help(message, bot)
-    elif re.match(r"№\d+ -", message.text):
-        handle_cart_selection(message, bot)
-    elif message.text == "/privacy":
-        handle_privacy(message, bot)
-    else:
+    if handle_state(message, bot):
+        return
+
+    route = get_message_router().resolve(message.text)
+    if route is None:
         logger.info(f"User {message.from_user.id} sent a message.")
         logger.info(f"User {message.text} sent a message.")
         bot.send_message(
             message.chat.id, _("Unknown command."), reply_markup=get_main_buttons()
         )
-        update_or_create_user(
-            telegram_id=message.from_user.id,
-            username=message.from_user.username,
-            first_name=message.from_user.first_name,
-            last_name=message.from_user.last_name,
-            is_active=True,
-        )
+        return
+    handler, args = route
+    handler(message, bot, *args)
+
+
+def resolve_callback(call: CallbackQuery):
+    if not call.data or not call.data.startswith(callbacks.PREFIX):
+        return get_callback_router().resolve(call.data)
+    # Signed callbacks are verified before anything touches the database
+    callback = callbacks.decode(call.data, call.from_user.id)
+    if callback is None:
+        logger.warning(f"User {call.from_user.id} sent an invalid callback.")
+        return None
+    return ACTION_HANDLERS[callback.action], callback.ids
 
 
 def handle_callback_query(call: CallbackQuery, bot: TeleBot):
-    activate(set_language_code(call.from_user.id))
-    logger.info(f"User {call.data} ====================================")
-    if call.data == "lang_ru" or call.data == "lang_uz":
-        handle_language_selection(call, bot)
-        logger.info(f"User {call.from_user.id} selected a language.")
-    elif call.data.startswith("donate_") or call.data == "back_to_amount_selection":
-        handle_donate_selection(call, bot)
-        logger.info(f"User {call.from_user.id} selected a donate.")
-    elif (
-        call.data.startswith("select_donate_payme_")
-        or call.data.startswith("select_donate_click_")
-        or call.data.startswith("back_to_payment_method_")
-    ):
-        handle_send_donate_link(call, bot)
-    elif call.data.startswith("plus_"):
-        plus_handler(call, bot)
-    elif call.data.startswith("minus_"):
-        minus_handler(call, bot)
-    elif call.data.startswith("clear_"):
-        clear_handler(call, bot)
-    elif call.data.startswith("save_"):
-        save_handler(call, bot)
-    elif call.data == "payme" or call.data == "click":
-        handle_payment(call, bot)
-    else:
-        bot.answer_callback_query(call.id, _("Unknown action."))
+    route = resolve_callback(call)
+    if route is None:
+        # Acknowledge without text: it would need the user's language
+        bot.answer_callback_query(call.id)
         logger.info(f"User {call.from_user.id} performed an unknown action.")
+        return
+    get_context(call)
+    handler, args = route
+    handler(call, bot, *args)
@@ -1,27 +1,22 @@
 import re
 
-from django.utils.translation import activate, gettext as _
+from django.utils.translation import gettext as _
 from telebot import TeleBot
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
 from telebot.types import Message
 
 from apps.bot.keyboard import get_main_buttons
 from apps.bot.logger import logger
-from apps.bot.utils import update_or_create_user
-from apps.bot.utils.language import set_language_code
+from apps.bot.states import clear_state
+from apps.bot.utils.context import get_context
+from apps.bot.utils.media import send_photo
 from apps.shop.models.products import Product
 
 
 def start_handler(message: Message, bot: TeleBot):
     try:
-        activate(set_language_code(message.from_user.id))
-        update_or_create_user(
-            telegram_id=message.from_user.id,
-            username=message.from_user.username,
-            first_name=message.from_user.first_name,
-            last_name=message.from_user.last_name,
-            is_active=True,
-        )
+        get_context(message)
+        clear_state(message.from_user.id)
         logger.info(f"User {message.from_user.id} started the bot.")
 
         inline_keyboard = InlineKeyboardMarkup()
@@ -37,9 +32,10 @@ def start_handler(message: Message, bot: TeleBot):
             except Product.DoesNotExist:
                 bot.send_message(message.chat.id, _("Product not found."))
                 return
-            bot.send_photo(
+            send_photo(
+                bot,
                 message.chat.id,
-                photo=product.image,
+                product.image,
                 caption=f"{product.title}\n\n\t\t{product.description}\n\n{int(float(product.price)):,} UZS".replace(
                     ",", " "
                 ),
@@ -0,0 +1,47 @@
+from apps.bot.filters import AdminFilter
+from apps.bot.handlers.register import handle_message, handle_callback_query
+from apps.bot.handlers.user import start_handler
+from apps.bot.logger import logger
+from apps.bot.middlewares import antispam_func, context_func
+from apps.bot.query.inlinequery import query_text
+
+
+def register_handlers(bot):
+    """
+    Register every handler, middleware and custom filter on ``bot``.
+
+    Works for both the threaded ``TeleBot`` (apps/bot/main.py) and the
+    asyncio runtime (apps/bot/async_main.py), which adapts the same
+    synchronous callables.
+    """
+    bot.register_message_handler(
+        start_handler, commands=["start"], admin=False, pass_bot=True
+    )
+    # Locations and contacts are answers to conversation steps (see STATE_HANDLERS)
+    bot.register_message_handler(
+        handle_message, content_types=["text", "location", "contact"], pass_bot=True
+    )
+    bot.register_callback_query_handler(
+        handle_callback_query, func=lambda call: True, pass_bot=True
+    )
+    logger.info("Handlers registered")
+
+    # Inline query
+    bot.register_inline_handler(
+        lambda query, bot: query_text(bot, query),
+        func=lambda query: True,
+        pass_bot=True,
+    )
+    logger.info("Inline query handler registered")
+
+    # Middlewares
+    bot.register_middleware_handler(
+        context_func, update_types=["message", "callback_query", "inline_query"]
+    )
+    # Runs on the whole update so it can drop throttled ones
+    bot.register_middleware_handler(antispam_func)
+    logger.info("Middlewares registered")
+
+    # Custom filters
+    bot.add_custom_filter(AdminFilter())
+    logger.info("Custom filters registered")
@@ -17,13 +17,11 @@ import time
 
 import requests
 from apps.bot.conf import TOKEN
-from apps.bot.filters import AdminFilter
-from apps.bot.handlers.user import start_handler
-from apps.bot.middlewares import antispam_func
-from apps.bot.handlers.register import handle_message, handle_callback_query
-from telebot import TeleBot, apihelper
-from apps.bot.query.inlinequery import query_text
+from apps.bot.loader import register_handlers
+from telebot import apihelper
 from apps.bot.logger import logger
+from apps.bot.utils.identity import start_identity_refresh
+from apps.bot.utils.sender import ShapedTeleBot
 
 
 # Log a message to indicate the bot is starting
@@ -35,38 +33,10 @@ apihelper.ENABLE_MIDDLEWARE = True
 logger.info("Middlewares enabled")
 
 # I recommend increasing num_threads
-bot = TeleBot(TOKEN, num_threads=17)
+bot = ShapedTeleBot(TOKEN, num_threads=17)
 logger.info("Bot created")
 
-
-def register_handlers(bot: TeleBot):
-    bot.register_message_handler(
-        start_handler, commands=["start"], admin=False, pass_bot=True
-    )
-    bot.register_message_handler(handle_message, content_types=["text"], pass_bot=True)
-    bot.register_callback_query_handler(
-        lambda call: handle_callback_query(call, bot), lambda call: True
-    )
-
-
 register_handlers(bot)
-logger.info("Handlers registered")
-
-
-# Inline query
-bot.register_inline_handler(
-    callback=lambda query: query_text(bot, query), func=lambda query: True
-)
-logger.info("Inline query handler registered")
-
-
-# Middlewares
-bot.register_middleware_handler(antispam_func, update_types=["message"])
-logger.info("Middlewares registered")
-
-# Custom filters
-bot.add_custom_filter(AdminFilter())
-logger.info("Custom filters registered")
 
 
 def run():
@@ -99,5 +69,6 @@ def run():
 if __name__ == "__main__":
     logger.info("Bot is running...")
     logger.info("Press Ctrl + C to stop the bot")
+    start_identity_refresh(bot)
     run()
     logger.info("Bot stopped")
@@ -1,2 +1,3 @@
 # Create files for your middleware in this folder.
 from .antiflood_middleware import *  # noqa
+from .context_middleware import *  # noqa
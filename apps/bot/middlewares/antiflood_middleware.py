@@ -1,19 +1,47 @@
-import time
-
+from django.conf import settings
+from django.utils import translation
+from django.utils.translation import gettext as _
 from telebot import TeleBot
-from telebot.types import Message
-from django.utils.translation import activate, gettext as _
+from telebot.types import Update
+
+from apps.bot.logger import logger
+from apps.bot.utils.context import attach_context
+from apps.bot.utils.ratelimit import TokenBucket
+
+# Update parts a user can flood the bot with
+THROTTLED_PARTS = ("message", "callback_query")
+
+antiflood = TokenBucket(
+    "antiflood",
+    rate=settings.BOT_ANTIFLOOD_RATE,
+    burst=settings.BOT_ANTIFLOOD_BURST,
+    local_size=settings.BOT_ANTIFLOOD_LOCAL_SIZE,
+)
+
+
+def antispam_func(bot: TeleBot, update: Update):
+    for part_name in THROTTLED_PARTS:
+        part = getattr(update, part_name)
+        if part is not None:
+            break
+    else:
+        return
 
-from apps.bot.utils.language import set_language_code
+    user_id = part.from_user.id
+    if antiflood.is_blocked(user_id):
+        # Already warned, drop silently until the bucket refills
+        setattr(update, part_name, None)
+        return
 
-DATA = {}
+    if antiflood.allow(user_id):
+        return
 
+    logger.info(f"User {user_id} is throttled.")
+    setattr(update, part_name, None)
 
-def antispam_func(bot: TeleBot, message: Message):
-    activate(set_language_code(message.from_user.id))
-    bot.temp_data = {message.from_user.id: "OK"}
-    if DATA.get(message.from_user.id):
-        if int(time.time()) - DATA[message.from_user.id] < 2:
-            bot.temp_data = {message.from_user.id: "FAIL"}
-            bot.send_message(message.chat.id, _("You are making request too often"))
-    DATA[message.from_user.id] = message.date
+    with translation.override(attach_context(part).lang):
+        text = _("You are making request too often")
+    if part_name == "message":
+        bot.send_message(part.chat.id, text)
+    else:
+        bot.answer_callback_query(part.id, text)
@@ -0,0 +1,9 @@
+from telebot import TeleBot
+
+from apps.bot.utils.context import attach_context
+
+
+def context_func(bot: TeleBot, update):
+    # Runs in the polling thread, so only attach the lazy context here and
+    # leave every lookup to the handler thread.
+    attach_context(update)
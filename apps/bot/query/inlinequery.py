@@ -1,89 +1,70 @@
-import re
+from django.conf import settings
+from django.db.models import Q
 
-from django.contrib.sites.models import Site
-from django.utils.translation import activate, gettext as _
-from telebot.types import (
-    InlineQueryResultArticle,
-    InputTextMessageContent,
-    InlineKeyboardMarkup,
-    InlineKeyboardButton,
-    LinkPreviewOptions,
+from apps.bot.logger import logger
+from apps.bot.query.results import (
+    PrebuiltResult,
+    build_results_for,
+    get_inline_results,
 )
+from apps.bot.query.search import search_products
+from apps.bot.utils.context import get_context
+from apps.shop.models.category import Category
 
-from apps.bot.logger import logger
-from apps.bot.utils import update_or_create_user
-from apps.bot.utils.bot_url import get_bot_url
-from apps.bot.utils.language import set_language_code
-from apps.shop.models.products import Product
+# Telegram accepts at most 50 results per answer
+PAGE_SIZE = 25
 
 
-def escape_markdown(text):
+def parse_query(text: str):
     """
-    Escapes Telegram Markdown special characters.
-    Special characters: '_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!'
+    Split "<category>: <words>" into a category id and the words to search.
     """
-    escape_chars = r'_*[\]()~`>#+-=|{}.!'
-    return re.sub(r'([{}])'.format(re.escape(escape_chars)), r'\\\1', text)
+    category_id = None
+    if ":" in text:
+        name, rest = text.split(":", 1)
+        category_id = (
+            Category.objects.filter(
+                Q(name_uz__iexact=name.strip()) | Q(name_ru__iexact=name.strip()),
+                is_active=True,
+            )
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if category_id is not None:
+            text = rest
+    return category_id, text.strip()
 
 
 def query_text(bot, query):
     try:
-        update_or_create_user(
-            telegram_id=query.from_user.id,
-            username=query.from_user.username,
-            first_name=query.from_user.first_name,
-            last_name=query.from_user.last_name,
-            is_active=True,
-        )
-        activate(set_language_code(query.from_user.id))
+        context = get_context(query)
         logger.info(f"User {query.from_user.id} selected a product category.")
 
-        results = []
-        products = Product.objects.filter(is_active=True, quantity__gt=0).order_by("-created_at")[:25]
-        for product in products:
-            # Construct thumbnail URL using current site domain
-            get_current = Site.objects.get_current().domain
-            thumbnail_url = f"https://{get_current}{product.image.url}"
-
-            # Prepare bot URL and inline keyboard button
-            bot_url = get_bot_url(bot)
-            keyboard = InlineKeyboardMarkup()
-            button = InlineKeyboardButton(
-                text=_("Ko'rish"),
-                url=f"{bot_url}?start={product.id}",
-            )
-            keyboard.add(button)
-
-            # Escape dynamic content to prevent Markdown issues
-            escaped_title = escape_markdown(product.title)
-            escaped_description = escape_markdown(product.description)
-            escaped_thumbnail = escape_markdown(thumbnail_url)
-            formatted_price = f"{int(float(product.price)):,} UZS".replace(",", " ")
-
-            # Compose the message text using Markdown
-            message_text = (
-                f"*{escaped_title}*\n\n"
-                f"{escaped_description}\n\n"
-                f"*{formatted_price}* [ ]({thumbnail_url})"
-            )
-
-            link_preview_options = LinkPreviewOptions(show_above_text=True)
+        try:
+            offset = int(query.offset or 0)
+        except ValueError:
+            offset = 0
 
-            article_result = InlineQueryResultArticle(
-                id=str(product.id),
-                title=product.title,
-                description=formatted_price,
-                thumbnail_url=thumbnail_url,
-                input_message_content=InputTextMessageContent(
-                    message_text=message_text,
-                    parse_mode="Markdown",
-                    link_preview_options=link_preview_options,
-                ),
-                reply_markup=keyboard,
+        category_id, text = parse_query(query.query or "")
+        if text or category_id is not None:
+            ids = search_products(
+                text or "", category_id, limit=PAGE_SIZE + 1, offset=offset
             )
-            results.append(article_result)
+            page = build_results_for(bot, ids[:PAGE_SIZE], context.lang)
+            has_more = len(ids) > PAGE_SIZE
+        else:
+            results = get_inline_results(bot, context.lang)
+            page = results[offset : offset + PAGE_SIZE]
+            has_more = offset + PAGE_SIZE < len(results)
 
-        bot.answer_inline_query(query.id, results)
+        bot.answer_inline_query(
+            query.id,
+            [PrebuiltResult(result) for result in page],
+            cache_time=settings.BOT_INLINE_CACHE_TIME,
+            # Results depend on the user's language
+            is_personal=True,
+            next_offset=str(offset + PAGE_SIZE) if has_more else "",
+        )
         logger.info(f"Inline query results sent to {query.from_user.id}")
 
     except Exception as e:
@@ -0,0 +1,138 @@
+import re
+from typing import List
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.utils import translation
+from django.utils.translation import gettext as _
+from telebot import TeleBot
+from telebot.types import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+    JsonSerializable,
+    LinkPreviewOptions,
+)
+
+from apps.bot.logger import logger
+from apps.bot.utils.bot_url import product_link
+from apps.bot.utils.cache import SharedVersion, TTLCache
+from apps.shop.models.products import Product
+
+RESULTS_KEY = "inline_results:{}:{}"
+
+_version = SharedVersion("inline_results:version", settings.BOT_INLINE_VERSION_TTL)
+_local_results = TTLCache(maxsize=8, ttl=settings.BOT_INLINE_RESULTS_TTL)
+
+
+class PrebuiltResult(JsonSerializable):
+    """
+    Inline query result already serialized to JSON.
+    """
+
+    def __init__(self, json_string: str):
+        self.json_string = json_string
+
+    def to_json(self):
+        return self.json_string
+
+
+def escape_markdown(text):
+    """
+    Escapes Telegram Markdown special characters.
+    Special characters: '_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!'
+    """
+    escape_chars = r"_*[\]()~`>#+-=|{}.!"
+    return re.sub(r"([{}])".format(re.escape(escape_chars)), r"\\\1", text)
+
+
+def build_result(product: Product, domain: str, bot: TeleBot) -> str:
+    """
+    JSON of the inline result for a product, in the active language.
+    """
+    thumbnail_url = f"https://{domain}{product.image.url}"
+
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(
+        InlineKeyboardButton(
+            text=_("Ko'rish"),
+            url=product_link(product.id, bot),
+        )
+    )
+
+    # Escape dynamic content to prevent Markdown issues
+    escaped_title = escape_markdown(product.title)
+    escaped_description = escape_markdown(product.description)
+    formatted_price = f"{int(float(product.price)):,} UZS".replace(",", " ")
+
+    # Compose the message text using Markdown
+    message_text = (
+        f"*{escaped_title}*\n\n"
+        f"{escaped_description}\n\n"
+        f"*{formatted_price}* [ ]({thumbnail_url})"
+    )
+
+    return InlineQueryResultArticle(
+        id=str(product.id),
+        title=product.title,
+        description=formatted_price,
+        thumbnail_url=thumbnail_url,
+        input_message_content=InputTextMessageContent(
+            message_text=message_text,
+            parse_mode="Markdown",
+            link_preview_options=LinkPreviewOptions(show_above_text=True),
+        ),
+        reply_markup=keyboard,
+    ).to_json()
+
+
+def build_results(bot: TeleBot, language: str) -> List[str]:
+    domain = Site.objects.get_current().domain
+    products = Product.objects.filter(is_active=True, quantity__gt=0).order_by(
+        "-created_at"
+    )[: settings.BOT_INLINE_RESULTS_LIMIT]
+    with translation.override(language):
+        return [build_result(product, domain, bot) for product in products]
+
+
+def build_results_for(bot: TeleBot, product_ids: List[int], language: str) -> List[str]:
+    """
+    Results for the given products, in the given order (search hits).
+    """
+    if not product_ids:
+        return []
+    domain = Site.objects.get_current().domain
+    products = Product.objects.in_bulk(product_ids)
+    with translation.override(language):
+        return [
+            build_result(products[pk], domain, bot)
+            for pk in product_ids
+            if pk in products
+        ]
+
+
+def get_version() -> int:
+    return _version.get()
+
+
+def get_inline_results(bot: TeleBot, language: str) -> List[str]:
+    """
+    Prebuilt inline results of the catalog for ``language``. Built once per
+    catalog version and shared by every process through the cache.
+    """
+    key = RESULTS_KEY.format(get_version(), language)
+    results = _local_results.get(key)
+    if results is None:
+        results = cache.get(key)
+        if results is None:
+            logger.info(f"Building inline results for {language}")
+            results = build_results(bot, language)
+            cache.set(key, results, settings.BOT_INLINE_RESULTS_TTL)
+        _local_results.set(key, results)
+    return results
+
+
+def invalidate_inline_results() -> None:
+    _version.bump()
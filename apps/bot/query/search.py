@@ -0,0 +1,238 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+from typing import List, Optional
+
+from django.db import connection, transaction
+
+from apps.bot.query.results import get_version
+from apps.shop.models.products import Product
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Must match the expression indexes of migration 0004_product_search_indexes
+DOCUMENT_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title_uz, '') || ' ' || "
+    "coalesce(title_ru, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description_uz, '') || ' ' || "
+    "coalesce(description_ru, '')), 'B')"
+)
+TITLE_SQL = "(coalesce(title_uz, '') || ' ' || coalesce(title_ru, ''))"
+WORD_SIMILARITY_THRESHOLD = 0.3
+
+SEARCH_SQL = f"""
+SELECT id
+FROM products
+WHERE is_active AND quantity > 0 {{category}}
+  AND ({DOCUMENT_SQL} @@ to_tsquery('simple', %(tsquery)s)
+       OR %(text)s <%% {TITLE_SQL})
+ORDER BY ts_rank({DOCUMENT_SQL}, to_tsquery('simple', %(tsquery)s))
+         + word_similarity(%(text)s, {TITLE_SQL}) DESC,
+         created_at DESC
+LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.lower() for token in TOKEN_RE.findall(text or "")]
+
+
+def trigrams(token: str) -> set:
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """
+    True if ``b`` is ``a`` with at most one letter inserted, removed,
+    replaced or two neighbours swapped.
+    """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    return a[i + 1 :] == b[i + 1 :] or (
+        a[i : i + 2] == b[i : i + 2][::-1] and a[i + 2 :] == b[i + 2 :]
+    )
+
+
+def search_postgres(
+    text: str, category_id: Optional[int], limit: int, offset: int
+) -> List[int]:
+    tokens = tokenize(text)
+    if not tokens:
+        return []
+    params = {
+        # Prefix match on every word, so results follow the user's typing
+        "tsquery": " & ".join(f"{token}:*" for token in tokens),
+        "text": " ".join(tokens),
+        "limit": limit,
+        "offset": offset,
+    }
+    category = ""
+    if category_id is not None:
+        category = "AND category_id = %(category_id)s"
+        params["category_id"] = category_id
+    with transaction.atomic(), connection.cursor() as cursor:
+        # The default of 0.6 misses most one-letter typos in short words.
+        # Local to the transaction: the connection is reused by later queries.
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+            [str(WORD_SIMILARITY_THRESHOLD)],
+        )
+        cursor.execute(SEARCH_SQL.format(category=category), params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+class ProductIndex:
+    """
+    In-memory search index for databases without full-text search (SQLite,
+    tests). Prefix and trigram matching over the same fields and weights as
+    the Postgres index.
+    """
+
+    TITLE_WEIGHT = 1.0
+    DESCRIPTION_WEIGHT = 0.4
+    FUZZY_THRESHOLD = 0.3
+
+    def __init__(self, products):
+        self.postings = defaultdict(dict)  # token -> {product id: weight}
+        self.categories = {}
+        self.order = {}
+        grams = defaultdict(set)
+        for position, product in enumerate(products):
+            self.categories[product["id"]] = product["category_id"]
+            self.order[product["id"]] = position
+            for field, weight in (
+                ("title_uz", self.TITLE_WEIGHT),
+                ("title_ru", self.TITLE_WEIGHT),
+                ("description_uz", self.DESCRIPTION_WEIGHT),
+                ("description_ru", self.DESCRIPTION_WEIGHT),
+            ):
+                for token in tokenize(product[field]):
+                    postings = self.postings[token]
+                    postings[product["id"]] = max(
+                        postings.get(product["id"], 0), weight
+                    )
+        self.tokens = sorted(self.postings)
+        for token in self.tokens:
+            for gram in trigrams(token):
+                grams[gram].add(token)
+        self.grams = grams
+
+    @classmethod
+    def build(cls) -> "ProductIndex":
+        products = (
+            Product.objects.filter(is_active=True, quantity__gt=0)
+            .order_by("-created_at")
+            .values(
+                "id",
+                "category_id",
+                "title_uz",
+                "title_ru",
+                "description_uz",
+                "description_ru",
+            )
+        )
+        return cls(products)
+
+    def _matches(self, token: str) -> dict:
+        """
+        Scores of products matching one query token: prefix matches count
+        fully, otherwise the closest words by trigram similarity or with a
+        single typo.
+        """
+        scores = {}
+        start = bisect.bisect_left(self.tokens, token)
+        for word in self.tokens[start:]:
+            if not word.startswith(token):
+                break
+            for product_id, weight in self.postings[word].items():
+                scores[product_id] = max(scores.get(product_id, 0), weight)
+        if scores:
+            return scores
+
+        query_grams = trigrams(token)
+        candidates = set()
+        for gram in query_grams:
+            candidates |= self.grams.get(gram, set())
+        for word in candidates:
+            word_grams = trigrams(word)
+            similarity = len(query_grams & word_grams) / len(query_grams | word_grams)
+            if similarity < self.FUZZY_THRESHOLD:
+                # Short words share few trigrams, allow a single typo instead
+                if len(token) < 4 or not within_one_edit(token, word[: len(token)]):
+                    continue
+                similarity = self.FUZZY_THRESHOLD
+            for product_id, weight in self.postings[word].items():
+                score = weight * similarity
+                scores[product_id] = max(scores.get(product_id, 0), score)
+        return scores
+
+    def search(
+        self, text: str, category_id: Optional[int], limit: int, offset: int
+    ) -> List[int]:
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+        totals = None
+        for token in tokens:
+            scores = self._matches(token)
+            if totals is None:
+                totals = scores
+            else:
+                # Every word has to match, as with the Postgres tsquery
+                totals = {
+                    product_id: totals[product_id] + score
+                    for product_id, score in scores.items()
+                    if product_id in totals
+                }
+        if category_id is not None:
+            totals = {
+                product_id: score
+                for product_id, score in totals.items()
+                if self.categories[product_id] == category_id
+            }
+        ranked = sorted(totals, key=lambda pk: (-totals[pk], self.order[pk]))
+        return ranked[offset : offset + limit]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> ProductIndex:
+    """
+    The in-memory index, rebuilt when the catalog version changes.
+    """
+    global _index, _index_version
+    version = get_version()
+    with _index_lock:
+        if _index is None or _index_version != version:
+            _index = ProductIndex.build()
+            _index_version = version
+        return _index
+
+
+def search_products(
+    text: str, category_id: Optional[int] = None, limit: int = 25, offset: int = 0
+) -> List[int]:
+    """
+    Ids of active, in-stock products matching ``text``, best match first.
+    Without words, the newest products of the category.
+    """
+    if not tokenize(text) and category_id is not None:
+        products = Product.objects.filter(
+            is_active=True, quantity__gt=0, category_id=category_id
+        ).order_by("-created_at")
+        return list(products.values_list("pk", flat=True)[offset : offset + limit])
+    if connection.vendor == "postgresql":
+        return search_postgres(text, category_id, limit, offset)
+    return get_index().search(text, category_id, limit, offset)
@@ -1,2 +1,3 @@
 # register states in this folder.
 from .register_state import *  # noqa
+from .storage import *  # noqa
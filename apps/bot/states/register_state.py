@@ -11,3 +11,23 @@ class Register(StatesGroup):
 
     name = State()
     surname = State()
+
+
+class ProductStates(StatesGroup):
+    """
+    Category -> product -> quantity -> cart
+    """
+
+    category = State()  # waiting for a category name
+    product = State()  # waiting for a product title
+    quantity = State()  # waiting for a quantity; data: product_id, category_id
+
+
+class OrderStates(StatesGroup):
+    """
+    Location -> contact -> payment method
+    """
+
+    location = State()  # waiting for a location
+    contact = State()  # waiting for a phone number; data: latitude, longitude
+    payment = State()  # waiting for the payment callback; data: + contact
@@ -0,0 +1,40 @@
+import json
+from typing import NamedTuple, Optional, Union
+
+from django.conf import settings
+from django.core.cache import cache
+from telebot.handler_backends import State
+
+__all__ = ["ConversationState", "get_state", "set_state", "clear_state"]
+
+STATE_KEY = "bot_state:{}"
+
+
+class ConversationState(NamedTuple):
+    name: str
+    data: dict
+
+
+def get_state(user_id: int) -> Optional[ConversationState]:
+    raw = cache.get(STATE_KEY.format(user_id))
+    if raw is None:
+        return None
+    stored = json.loads(raw)
+    return ConversationState(stored["state"], stored["data"])
+
+
+def set_state(user_id: int, state: Union[State, str], **data) -> None:
+    """
+    Move the user to ``state``. ``data`` must be JSON serializable (ids, not
+    model instances) and replaces the data of the previous state.
+    """
+    name = state.name if isinstance(state, State) else state
+    cache.set(
+        STATE_KEY.format(user_id),
+        json.dumps({"state": name, "data": data}),
+        timeout=settings.BOT_STATE_TTL,
+    )
+
+
+def clear_state(user_id: int) -> None:
+    cache.delete(STATE_KEY.format(user_id))
@@ -0,0 +1,177 @@
+import itertools
+import time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import translation
+from telebot.types import CallbackQuery, Message
+
+from apps.bot.handlers.cart import (
+    clear_handler,
+    handle_cart,
+    minus_handler,
+    plus_handler,
+)
+from apps.bot.handlers.clear import handle_clear
+from apps.bot.utils import profile
+from apps.bot.utils.catalog import get_catalog
+from apps.shop.models.category import Category
+from apps.shop.models.products import Product
+from apps.shop.models.users import BotUsers
+from apps.shop.services import cart as cart_service
+
+TELEGRAM_ID = 100
+
+_ids = itertools.count(1)
+
+
+class FakeBot:
+    """
+    Records the bot API calls made by a handler.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return method
+
+
+def sender():
+    return {
+        "id": TELEGRAM_ID,
+        "is_bot": False,
+        "first_name": "Test",
+        "username": "test",
+    }
+
+
+def message(text: str) -> Message:
+    return Message.de_json(
+        {
+            "message_id": next(_ids),
+            "date": int(time.time()),
+            "chat": {"id": TELEGRAM_ID, "type": "private"},
+            "from": sender(),
+            "text": text,
+        }
+    )
+
+
+def callback(data: str) -> CallbackQuery:
+    return CallbackQuery.de_json(
+        {
+            "id": str(next(_ids)),
+            "from": sender(),
+            "chat_instance": "test",
+            "data": data,
+            "message": {
+                "message_id": next(_ids),
+                "date": int(time.time()),
+                "chat": {"id": TELEGRAM_ID, "type": "private"},
+                "caption": "",
+            },
+        }
+    )
+
+
+class CartHandlerQueryTests(TestCase):
+    """
+    A handler loads the user profile and the cart once per update.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Category")
+        cls.products = [
+            Product.objects.create(
+                category=category,
+                title=f"Product {i}",
+                description="Description",
+                price=Decimal("10.00"),
+                quantity=100,
+            )
+            for i in range(5)
+        ]
+        cls.user = BotUsers.objects.create(
+            telegram_id=TELEGRAM_ID,
+            username="test",
+            first_name="Test",
+            is_active=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        profile._local_profiles.clear()
+        get_catalog()
+        for product in self.products:
+            cart_service.add(self.user.pk, product, 2)
+        self.bot = FakeBot()
+
+    def test_handle_cart(self):
+        # The profile, then the cart lines; products come from the catalog
+        with self.assertNumQueries(2):
+            handle_cart(message("Cart"), self.bot)
+        self.assertEqual(self.bot.calls[-1][0], "send_message")
+
+    def test_handlers_share_the_update(self):
+        update = message("Cart")
+        handle_cart(update, self.bot)
+        with self.assertNumQueries(0):
+            handle_cart(update, self.bot)
+
+    def test_plus_handler(self):
+        # The profile, then the quantity and total updates in one transaction
+        with self.assertNumQueries(5):
+            plus_handler(callback("plus"), self.bot, self.products[0].pk)
+        self.assertEqual(self.bot.calls[-1][0], "edit_message_caption")
+
+    def test_minus_handler_at_one(self):
+        cart_service.add(self.user.pk, self.products[0], 1)
+        # The profile, the refused decrement, then the cart lines to tell
+        # "at least 1" from "not found"
+        with self.assertNumQueries(5):
+            minus_handler(callback("minus"), self.bot, self.products[0].pk)
+        self.assertEqual(self.bot.calls[-1][0], "answer_callback_query")
+        self.assertEqual(self.line(self.products[0].pk).quantity, 1)
+
+    def test_minus_handler(self):
+        # The profile, then the quantity and total updates in one transaction
+        with self.assertNumQueries(5):
+            minus_handler(callback("minus"), self.bot, self.products[0].pk)
+        self.assertEqual(self.bot.calls[-1][0], "edit_message_caption")
+        self.assertEqual(self.line(self.products[0].pk).quantity, 1)
+
+    def test_clear_handler(self):
+        # The profile, then the line delete and total update in one transaction
+        with self.assertNumQueries(5):
+            clear_handler(callback("clear"), self.bot, self.products[0].pk)
+        self.assertEqual(
+            [call[0] for call in self.bot.calls], ["delete_message", "send_message"]
+        )
+        lines = cart_service.lines(self.user.pk)
+        self.assertNotIn(self.products[0].pk, [line.product_id for line in lines])
+        self.assertEqual(lines[0].cart_amount, Decimal("80.00"))
+
+    def test_handle_clear(self):
+        # The profile, then the cart and its items deleted
+        with self.assertNumQueries(4):
+            handle_clear(message("Clear"), self.bot)
+        self.assertEqual(cart_service.lines(self.user.pk), [])
+
+        handle_clear(message("Clear"), self.bot)
+        with translation.override(self.user.language_code):
+            self.assertEqual(
+                self.bot.calls[-1][1][1], translation.gettext("Cart is empty.")
+            )
+
+    def line(self, product_id: int):
+        return next(
+            line
+            for line in cart_service.lines(self.user.pk)
+            if line.product_id == product_id
+        )
@@ -1,8 +1,33 @@
+from typing import Optional
+
 import telebot
+from django.conf import settings
+
+from apps.bot.utils.identity import get_identity
+
+
+def get_bot_url(bot: Optional[telebot.TeleBot] = None) -> str:
+    return f"https://t.me/{get_identity(bot).username}"
+
+
+def start_link(payload, bot: Optional[telebot.TeleBot] = None) -> str:
+    """
+    Deep link that opens the bot with ``/start <payload>``.
+    """
+    return f"{get_bot_url(bot)}?start={payload}"
+
+
+def product_link(product_id: int, bot: Optional[telebot.TeleBot] = None) -> str:
+    return start_link(product_id, bot)
 
 
-def get_bot_url(bot: telebot.TeleBot) -> str:
-    bot_info = bot.get_me()
-    bot_username = bot_info.username
-    bot_url = f"https://t.me/{bot_username}"
-    return bot_url
+def payment_success_link(method: str) -> str:
+    """
+    Where Payme/Click send the user back after paying ("payme" or "click").
+    The configured success URL wins over the deep link.
+    """
+    configured = {
+        "payme": settings.PAYME_SUCCESS_URL,
+        "click": settings.CLICK_SUCCESS_URL,
+    }.get(method)
+    return str(configured) if configured else start_link(f"success-{method}")
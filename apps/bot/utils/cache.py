@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry TTL and LRU eviction.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SharedVersion:
+    """
+    Version stamp kept in the shared cache. Bumping it invalidates whatever
+    every process derived from the previous version; each process re-reads
+    it at most once per ``ttl`` seconds.
+    """
+
+    def __init__(self, key: str, ttl: float):
+        self.key = key
+        self._local = TTLCache(maxsize=1, ttl=ttl)
+
+    def get(self) -> int:
+        version = self._local.get(self.key)
+        if version is None:
+            version = cache.get(self.key)
+            if version is None:
+                cache.add(self.key, time.time_ns(), None)
+                version = cache.get(self.key)
+            self._local.set(self.key, version)
+        return version
+
+    def bump(self) -> None:
+        cache.set(self.key, time.time_ns(), None)
+        self._local.clear()
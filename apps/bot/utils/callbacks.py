@@ -0,0 +1,102 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import struct
+from enum import IntEnum
+from typing import NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+# Signed callbacks start with this marker, which base64url never produces
+PREFIX = "~"
+VERSION = 1
+TAG_SIZE = 8
+
+_HEADER = struct.Struct(">BB")  # version, action
+_ID = struct.Struct(">Q")
+# Keyed once; every tag starts from a copy of it
+_MAC = hmac.new(
+    hashlib.sha256(f"bot-callback:{settings.SECRET_KEY}".encode()).digest(),
+    digestmod=hashlib.sha256,
+)
+
+
+class Action(IntEnum):
+    CART_PLUS = 1
+    CART_MINUS = 2
+    CART_CLEAR = 3
+    CART_SAVE = 4
+    DONATE_AMOUNT = 10
+    DONATE_PAYME = 11
+    DONATE_CLICK = 12
+    DONATE_METHODS = 13
+
+
+# Number of ids each action carries
+ARITY = {
+    Action.CART_PLUS: 1,
+    Action.CART_MINUS: 1,
+    Action.CART_CLEAR: 1,
+    Action.CART_SAVE: 1,
+    Action.DONATE_AMOUNT: 1,
+    Action.DONATE_PAYME: 1,
+    Action.DONATE_CLICK: 1,
+    Action.DONATE_METHODS: 1,
+}
+
+_ACTIONS = {action.value: action for action in Action}
+
+
+class Callback(NamedTuple):
+    action: Action
+    ids: Tuple[int, ...]
+
+
+def _tag(body: bytes, user_id: int) -> bytes:
+    mac = _MAC.copy()
+    mac.update(body + _ID.pack(user_id))
+    return mac.digest()[:TAG_SIZE]
+
+
+def encode(action: Action, *ids: int, user_id: int) -> str:
+    """
+    callback_data for ``action`` on ``ids`` that only ``user_id`` can send
+    back. 1-3 ids fit well within Telegram's 64 bytes.
+    """
+    if len(ids) != ARITY[action]:
+        raise ValueError(f"{action.name} takes {ARITY[action]} ids, got {len(ids)}")
+    body = _HEADER.pack(VERSION, action) + b"".join(_ID.pack(i) for i in ids)
+    data = body + _tag(body, user_id)
+    return PREFIX + base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode(data: str, user_id: int) -> Optional[Callback]:
+    """
+    The callback packed in ``data``, or None if it is malformed, of an
+    unknown version or action, or was not issued to ``user_id``.
+    """
+    if not data or not data.startswith(PREFIX):
+        return None
+    encoded = data[len(PREFIX) :]
+    try:
+        raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+    except (binascii.Error, ValueError):
+        return None
+    if len(raw) < _HEADER.size + TAG_SIZE:
+        return None
+
+    body, tag = raw[:-TAG_SIZE], raw[-TAG_SIZE:]
+    version, action = _HEADER.unpack_from(body)
+    action = _ACTIONS.get(action)
+    if version != VERSION or action is None:
+        return None
+    if len(body) != _HEADER.size + ARITY[action] * _ID.size:
+        return None
+    if not hmac.compare_digest(tag, _tag(body, user_id)):
+        return None
+    ids = tuple(
+        _ID.unpack_from(body, _HEADER.size + i * _ID.size)[0]
+        for i in range(ARITY[action])
+    )
+    return Callback(action, ids)
@@ -0,0 +1,157 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.translation import gettext as _
+from telebot.types import KeyboardButton, ReplyKeyboardMarkup
+
+from apps.bot.logger import logger
+from apps.bot.utils.cache import SharedVersion
+from apps.shop.models.category import Category
+from apps.shop.models.products import Product
+
+_version = SharedVersion("catalog:version", settings.BOT_CATALOG_VERSION_TTL)
+
+
+def _rows(keyboard: ReplyKeyboardMarkup, labels: List[str]) -> None:
+    for index in range(0, len(labels), 2):
+        keyboard.add(
+            *(KeyboardButton(text=label) for label in labels[index : index + 2])
+        )
+
+
+class CatalogSnapshot:
+    """
+    Active categories with stock, their products and the reply keyboards
+    built from them, for every language. Read-only once built.
+    """
+
+    def __init__(self, categories: List[Category], products: List[Product]):
+        self.products = defaultdict(list)  # category id -> products
+        self.products_by_id = {}
+        for product in products:
+            self.products[product.category_id].append(product)
+            self.products_by_id[product.pk] = product
+        self.categories = [c for c in categories if self.products[c.pk]]
+
+        languages = settings.MODELTRANSLATION_LANGUAGES
+        # Buttons carry names, so replies are looked up by name in any language
+        self.category_ids: Dict[str, int] = {}
+        self.products_by_title: Dict[str, Product] = {}
+        for language in languages:
+            for category in self.categories:
+                name = getattr(category, f"name_{language}")
+                self.category_ids.setdefault(name, category.pk)
+            for product in products:
+                title = getattr(product, f"title_{language}")
+                self.products_by_title.setdefault(title, product)
+
+        self.category_keyboards = {}
+        self.product_keyboards = defaultdict(dict)
+        for language in languages:
+            with translation.override(language):
+                self.category_keyboards[language] = self._category_keyboard()
+                for category in self.categories:
+                    self.product_keyboards[language][category.pk] = (
+                        self._product_keyboard(self.products[category.pk])
+                    )
+
+    @classmethod
+    def build(cls) -> "CatalogSnapshot":
+        categories = list(Category.objects.filter(is_active=True))
+        products = list(
+            Product.objects.filter(
+                is_active=True, quantity__gt=0, category__is_active=True
+            )
+        )
+        return cls(categories, products)
+
+    def _category_keyboard(self) -> ReplyKeyboardMarkup:
+        keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
+        keyboard.add(KeyboardButton(text=_("Cart")))
+        _rows(keyboard, [category.name for category in self.categories])
+        keyboard.add(KeyboardButton(text=_("Home")))
+        return keyboard
+
+    def _product_keyboard(self, products: List[Product]) -> ReplyKeyboardMarkup:
+        keyboard = ReplyKeyboardMarkup(resize_keyboard=True)
+        keyboard.add(KeyboardButton(text=_("Home")), KeyboardButton(text=_("Cart")))
+        _rows(keyboard, [product.title for product in products])
+        keyboard.add(KeyboardButton(text=_("Back")))
+        return keyboard
+
+    @staticmethod
+    def _language() -> str:
+        language = translation.get_language()
+        if language not in settings.MODELTRANSLATION_LANGUAGES:
+            language = settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+        return language
+
+    def category_keyboard(self) -> Optional[ReplyKeyboardMarkup]:
+        """
+        Keyboard of categories in the active language, None if nothing is in
+        stock.
+        """
+        if not self.categories:
+            return None
+        return self.category_keyboards[self._language()]
+
+    def product_keyboard(self, category_id: int) -> ReplyKeyboardMarkup:
+        keyboards = self.product_keyboards[self._language()]
+        if category_id not in keyboards:
+            with translation.override(self._language()):
+                return self._product_keyboard([])
+        return keyboards[category_id]
+
+    def category_id(self, name: str) -> Optional[int]:
+        return self.category_ids.get(name)
+
+    def product(self, title: str) -> Optional[Product]:
+        return self.products_by_title.get(title)
+
+    def product_by_id(self, product_id: int) -> Optional[Product]:
+        return self.products_by_id.get(product_id)
+
+
+_snapshot = None
+_snapshot_version = None
+_snapshot_lock = threading.Lock()
+
+
+def get_catalog() -> CatalogSnapshot:
+    """
+    The catalog snapshot, rebuilt when the catalog version changes.
+    """
+    global _snapshot, _snapshot_version
+    version = _version.get()
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot_version != version:
+            logger.info("Building catalog snapshot")
+            _snapshot = CatalogSnapshot.build()
+            _snapshot_version = version
+        return _snapshot
+
+
+def invalidate_catalog() -> None:
+    _version.bump()
+
+
+def get_products(product_ids: Iterable[int]) -> Dict[int, Product]:
+    """
+    Products by id, from the snapshot when it has them and from the
+    database for the rest (inactive or out of stock).
+    """
+    catalog = get_catalog()
+    products = {}
+    missing = []
+    for product_id in product_ids:
+        product = catalog.product_by_id(product_id)
+        if product is None:
+            missing.append(product_id)
+        else:
+            products[product_id] = product
+    if missing:
+        products.update(Product.objects.in_bulk(missing))
+    return products
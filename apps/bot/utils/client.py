@@ -0,0 +1,85 @@
+import os
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from telebot import apihelper
+from urllib3.util.retry import Retry
+
+from apps.bot.conf import TOKEN
+from apps.bot.utils.sender import ShapedTeleBot
+
+_lock = threading.Lock()
+_pid = None
+_session = None
+_bot = None
+
+
+def build_session() -> requests.Session:
+    """
+    HTTP session for the Bot API: one keep-alive pool sized for the send
+    queue workers, retrying only connections that could not be made, with
+    backoff. Anything past that may have been delivered and is not retried;
+    429 answers are left to the SendQueue, which reschedules the chat
+    without holding a worker.
+    """
+    retry = Retry(
+        total=settings.BOT_HTTP_RETRIES,
+        connect=settings.BOT_HTTP_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        redirect=0,
+        backoff_factor=settings.BOT_HTTP_BACKOFF,
+        # Hand every answer to telebot, which raises ApiTelegramException
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=settings.BOT_HTTP_POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _ensure_process() -> None:
+    """
+    Start over in a forked child (prefork Celery workers): it must not share
+    the parent's pooled sockets.
+    """
+    global _pid, _session, _bot
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        _session = None
+        _bot = None
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _lock:
+        _ensure_process()
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def _send_request(method, url, **kwargs):
+    return get_session().request(method, url, **kwargs)
+
+
+def get_bot() -> ShapedTeleBot:
+    """
+    The bot of this worker process. Built on first use after the fork, and
+    routes every Bot API request of the process through the pooled session.
+    """
+    global _bot
+    with _lock:
+        _ensure_process()
+        if _bot is None:
+            apihelper.CUSTOM_REQUEST_SENDER = _send_request
+            _bot = ShapedTeleBot(TOKEN)
+        return _bot
@@ -0,0 +1,14 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Process-wide Redis client for bot coordination (rate limits, queues).
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.BOT_REDIS_URL)
+    return _client
@@ -0,0 +1,96 @@
+import threading
+from typing import Callable
+
+import redis
+from django.conf import settings
+from redis.exceptions import LockError
+
+from apps.bot.logger import logger
+from apps.bot.utils.streams import ensure_group, shard_stream
+
+
+class ShardConsumer(threading.Thread):
+    """
+    Consumes one shard stream, one entry at a time.
+
+    A shard has a single owner at any moment (a Redis lease), which keeps the
+    updates of each chat in order while the other shards run in parallel in
+    other threads or processes. The consumer name is fixed per shard, so
+    whoever takes the shard over first replays what the previous owner left
+    unacknowledged.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        shard: int,
+        handle: Callable[[bytes, dict], None],
+        prefix: str | None = None,
+    ):
+        super().__init__(name=f"bot-shard-{shard}", daemon=True)
+        self.client = client
+        self.shard = shard
+        self.handle = handle
+        self.stream = shard_stream(shard, prefix)
+        self.group = settings.BOT_UPDATES_GROUP
+        self.consumer = f"shard-{shard}"
+        self.lease = client.lock(
+            f"{self.stream}:owner", timeout=settings.BOT_UPDATES_LEASE
+        )
+        self.stopped = threading.Event()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                if not self.lease.acquire(blocking=True, blocking_timeout=5):
+                    continue
+                logger.info(f"Consuming {self.stream}")
+                try:
+                    self.consume()
+                finally:
+                    try:
+                        self.lease.release()
+                    except LockError:
+                        pass
+            except LockError:
+                logger.error(f"Lease of {self.stream} lost, re-acquiring")
+            except redis.ConnectionError as e:
+                logger.error(f"Redis is unreachable: {e}. Retrying in 5 seconds...")
+                self.stopped.wait(5)
+
+    def consume(self) -> None:
+        ensure_group(self.client, self.stream, self.group)
+        # "0" re-reads our own unacknowledged entries first, then ">" new ones
+        last_id = "0"
+        while not self.stopped.is_set():
+            response = self.client.xreadgroup(
+                self.group,
+                self.consumer,
+                {self.stream: last_id},
+                count=settings.BOT_UPDATES_READ_COUNT,
+                block=None if last_id == "0" else 1000,
+            )
+            entries = response[0][1] if response else []
+            if not entries and last_id == "0":
+                last_id = ">"
+
+            for entry_id, fields in entries:
+                # Renewed before every entry, as a batch of handlers waiting on
+                # the send queue can outlast the lease. Raises LockError once
+                # the lease has expired: the shard may have a new owner by now
+                # and the rest of the batch is theirs to replay.
+                self.lease.reacquire()
+                if fields:
+                    try:
+                        self.handle(entry_id, fields)
+                    except Exception as e:
+                        # Acknowledged anyway: a failing update would fail again
+                        logger.error(
+                            f"Error while processing {self.stream} {entry_id}: {e}"
+                        )
+                self.client.xack(self.stream, self.group, entry_id)
+
+            self.lease.reacquire()
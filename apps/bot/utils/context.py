@@ -0,0 +1,92 @@
+from functools import cached_property
+from typing import List, Optional
+
+from django.utils.translation import activate
+
+from apps.bot.states import ConversationState, get_state
+from apps.bot.utils.profile import UserProfile, get_profile
+from apps.bot.utils.update_user import update_or_create_user
+from apps.shop.models.users import BotUsers
+from apps.shop.services import cart as cart_service
+from apps.shop.services.cart import CartLine
+
+
+class UpdateContext:
+    """
+    Per-update state shared by the middleware and every handler that touches
+    the same update. Everything is resolved lazily and memoized, so a handler
+    chain pays for the user, cart and language lookups at most once.
+    """
+
+    def __init__(self, from_user):
+        self.from_user = from_user
+        self._touched = False
+
+    @property
+    def telegram_id(self) -> int:
+        return self.from_user.id
+
+    def prepare(self) -> None:
+        """
+        Register the user (once per update) and activate their language in
+        the calling thread.
+        """
+        if not self._touched:
+            update_or_create_user(
+                telegram_id=self.from_user.id,
+                username=self.from_user.username,
+                first_name=self.from_user.first_name,
+                last_name=self.from_user.last_name,
+                is_active=True,
+            )
+            self._touched = True
+            self.__dict__.pop("profile", None)
+        activate(self.lang)
+
+    @cached_property
+    def profile(self) -> Optional[UserProfile]:
+        return get_profile(self.telegram_id)
+
+    @property
+    def lang(self) -> str:
+        return self.profile.language_code if self.profile else "uz"
+
+    @cached_property
+    def state(self) -> Optional[ConversationState]:
+        return get_state(self.telegram_id)
+
+    @cached_property
+    def user(self) -> Optional[BotUsers]:
+        if self.profile is None:
+            return None
+        return BotUsers.objects.filter(pk=self.profile.pk).first()
+
+    @cached_property
+    def cart_lines(self) -> List[CartLine]:
+        if self.profile is None:
+            return []
+        return cart_service.lines(self.profile.pk)
+
+    def reset_cart(self) -> None:
+        """
+        Forget the memoized cart after it was changed by the current handler.
+        """
+        self.__dict__.pop("cart_lines", None)
+
+
+def attach_context(update) -> UpdateContext:
+    """
+    Return the context attached to a Message/CallbackQuery/InlineQuery,
+    creating it if the update did not pass through the context middleware.
+    """
+    context = getattr(update, "context", None)
+    if context is None:
+        context = UpdateContext(update.from_user)
+        update.context = context
+    return context
+
+
+def get_context(update) -> UpdateContext:
+    context = attach_context(update)
+    context.prepare()
+    return context
@@ -0,0 +1,85 @@
+import threading
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from telebot import TeleBot
+
+from apps.bot.conf import TOKEN
+from apps.bot.logger import logger
+from apps.bot.utils.cache import TTLCache
+
+IDENTITY_KEY = "bot_identity"
+
+
+class BotIdentity(NamedTuple):
+    id: int
+    username: str
+    first_name: str
+
+
+# Re-read from the shared cache at most once per refresh interval, so
+# processes that never call getMe (Celery) follow the bot process.
+_local_identity = TTLCache(maxsize=1, ttl=settings.BOT_IDENTITY_REFRESH)
+_fetch_lock = threading.Lock()
+
+
+def fetch_identity(bot: Optional[TeleBot] = None) -> BotIdentity:
+    """
+    Calls getMe and publishes the result to every process.
+    """
+    me = (bot or TeleBot(TOKEN)).get_me()
+    identity = BotIdentity(me.id, me.username, me.first_name)
+    try:
+        cache.set(IDENTITY_KEY, tuple(identity), settings.BOT_IDENTITY_TTL)
+    except Exception as e:
+        logger.error(f"Error writing bot identity to cache: {e}")
+    _local_identity.set(IDENTITY_KEY, identity)
+    return identity
+
+
+def get_identity(bot: Optional[TeleBot] = None) -> BotIdentity:
+    """
+    The bot's own user. Calls getMe only if no process has done it recently.
+    """
+    identity = _local_identity.get(IDENTITY_KEY)
+    if identity is not None:
+        return identity
+    try:
+        data = cache.get(IDENTITY_KEY)
+    except Exception as e:
+        logger.error(f"Error reading bot identity from cache: {e}")
+        data = None
+    if data and len(data) == len(BotIdentity._fields):
+        identity = BotIdentity(*data)
+        _local_identity.set(IDENTITY_KEY, identity)
+        return identity
+    with _fetch_lock:
+        identity = _local_identity.get(IDENTITY_KEY)
+        if identity is None:
+            identity = fetch_identity(bot)
+        return identity
+
+
+def start_identity_refresh(bot: TeleBot) -> threading.Thread:
+    """
+    Fetches the identity and keeps it fresh from a daemon thread, so a
+    renamed bot is picked up without a restart.
+    """
+    stopped = threading.Event()
+
+    def refresh():
+        try:
+            fetch_identity(bot)
+        except Exception as e:
+            # get_identity() retries on first use
+            logger.error(f"Error fetching bot identity: {e}")
+        while not stopped.wait(settings.BOT_IDENTITY_REFRESH):
+            try:
+                fetch_identity(bot)
+            except Exception as e:
+                logger.error(f"Error refreshing bot identity: {e}")
+
+    thread = threading.Thread(target=refresh, name="bot-identity", daemon=True)
+    thread.start()
+    return thread
@@ -1,12 +1,10 @@
-from apps.shop.models.users import BotUsers
-from django.utils.translation import activate, gettext as _
+from django.utils.translation import activate
+
+from apps.bot.utils.profile import get_profile
 
 
 def set_language_code(telegram_id):
-    if BotUsers.objects.filter(telegram_id=telegram_id).exists():
-        user = BotUsers.objects.get(telegram_id=telegram_id)
-        activate(user.language_code)
-        return user.language_code
-    else:
-        activate("uz")
-        return "uz"
+    profile = get_profile(telegram_id)
+    language_code = profile.language_code if profile else "uz"
+    activate(language_code)
+    return language_code
@@ -0,0 +1,89 @@
+import hashlib
+import io
+import os
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models.fields.files import FieldFile
+from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
+from telebot.types import InputFile, Message
+
+from apps.bot.logger import logger
+from apps.shop.models.media import MediaFile
+
+MEDIA_KEY = "media:{}"
+MEDIA_TTL = 24 * 3600
+
+
+def get_file_id(path: str) -> Optional[str]:
+    key = MEDIA_KEY.format(path)
+    file_id = cache.get(key)
+    if file_id is None:
+        file_id = (
+            MediaFile.objects.filter(path=path)
+            .values_list("file_id", flat=True)
+            .first()
+        )
+        if file_id is not None:
+            cache.set(key, file_id, MEDIA_TTL)
+    return file_id
+
+
+def invalidate_media(path: str) -> None:
+    MediaFile.objects.filter(path=path).delete()
+    cache.delete(MEDIA_KEY.format(path))
+
+
+def _remember(path: str, content_hash: str, file_id: str) -> None:
+    MediaFile.objects.update_or_create(
+        path=path, defaults={"content_hash": content_hash, "file_id": file_id}
+    )
+    cache.set(MEDIA_KEY.format(path), file_id, MEDIA_TTL)
+
+
+def send_photo(bot: TeleBot, chat_id: int, image: FieldFile, **kwargs) -> Message:
+    """
+    ``bot.send_photo`` for an ImageField value that uploads the bytes only
+    the first time. Later sends (and other paths with the same content) reuse
+    the Telegram file_id. Without an image the caption is sent as text.
+    """
+    if not image:
+        caption = kwargs.pop("caption", None) or ""
+        return bot.send_message(chat_id, caption, **kwargs)
+
+    path = image.name
+    file_id = get_file_id(path)
+    if file_id is not None:
+        try:
+            return bot.send_photo(chat_id, file_id, **kwargs)
+        except ApiTelegramException as e:
+            if e.error_code != 400:
+                raise
+            # The file_id is no longer valid for this bot, upload again
+            logger.error(f"Cached file_id of {path} was rejected: {e}")
+            invalidate_media(path)
+
+    with image.open("rb") as file:
+        data = file.read()
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    same_content = (
+        MediaFile.objects.filter(content_hash=content_hash)
+        .values_list("file_id", flat=True)
+        .first()
+    )
+    if same_content is not None:
+        try:
+            message = bot.send_photo(chat_id, same_content, **kwargs)
+            _remember(path, content_hash, same_content)
+            return message
+        except ApiTelegramException as e:
+            if e.error_code != 400:
+                raise
+            MediaFile.objects.filter(content_hash=content_hash).delete()
+
+    photo = InputFile(io.BytesIO(data), file_name=os.path.basename(path))
+    message = bot.send_photo(chat_id, photo, **kwargs)
+    _remember(path, content_hash, message.photo[-1].file_id)
+    return message
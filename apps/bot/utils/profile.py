@@ -0,0 +1,103 @@
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.bot.logger import logger
+from apps.bot.utils.cache import TTLCache
+from apps.shop.models.users import BotUsers
+
+
+class UserProfile(NamedTuple):
+    pk: int
+    language_code: str
+    role: str
+    is_active: bool
+    username: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+
+
+PROFILE_FIELDS = (
+    "pk",
+    "language_code",
+    "role",
+    "is_active",
+    "username",
+    "first_name",
+    "last_name",
+)
+
+# First tier: process-local, short TTL so changes made by other processes
+# are picked up quickly even if their invalidation is missed.
+_local_profiles = TTLCache(
+    maxsize=settings.BOT_PROFILE_CACHE_SIZE, ttl=settings.BOT_PROFILE_LOCAL_TTL
+)
+
+
+def _shared_key(telegram_id) -> str:
+    return f"bot_profile:{telegram_id}"
+
+
+def _get_shared(telegram_id) -> Optional[UserProfile]:
+    try:
+        data = cache.get(_shared_key(telegram_id))
+    except Exception as e:
+        logger.error(f"Error reading profile {telegram_id} from cache: {e}")
+        return None
+    if not data or len(data) != len(UserProfile._fields):
+        return None
+    return UserProfile(*data)
+
+
+def _set_shared(telegram_id, profile: UserProfile) -> None:
+    try:
+        cache.set(
+            _shared_key(telegram_id),
+            tuple(profile),
+            timeout=settings.BOT_PROFILE_SHARED_TTL,
+        )
+    except Exception as e:
+        logger.error(f"Error writing profile {telegram_id} to cache: {e}")
+
+
+def get_profile(telegram_id) -> Optional[UserProfile]:
+    """
+    Return the cached profile of a bot user, loading it from the database on a miss.
+
+    :param telegram_id: User's Telegram ID
+    :return: UserProfile or None if the user is not registered yet
+    """
+    profile = _local_profiles.get(telegram_id)
+    if profile is not None:
+        return profile
+
+    profile = _get_shared(telegram_id)
+    if profile is None:
+        row = (
+            BotUsers.objects.filter(telegram_id=telegram_id)
+            .values_list(*PROFILE_FIELDS)
+            .first()
+        )
+        if row is None:
+            return None
+        profile = UserProfile(*row)
+        _set_shared(telegram_id, profile)
+
+    _local_profiles.set(telegram_id, profile)
+    return profile
+
+
+def cache_profile(telegram_id, profile: UserProfile) -> None:
+    """
+    Replace the process-local profile, e.g. after a change is buffered for writing.
+    """
+    _local_profiles.set(telegram_id, profile)
+
+
+def invalidate_profile(telegram_id) -> None:
+    _local_profiles.delete(telegram_id)
+    try:
+        cache.delete(_shared_key(telegram_id))
+    except Exception as e:
+        logger.error(f"Error deleting profile {telegram_id} from cache: {e}")
@@ -0,0 +1,94 @@
+import time
+
+import redis
+
+from apps.bot.logger import logger
+from apps.bot.utils.cache import TTLCache
+from apps.bot.utils.connections import get_redis
+
+# Refills the bucket for the time elapsed since the last call, then takes
+# ``cost`` tokens if there are enough. Returns 0 when allowed, otherwise the
+# milliseconds until enough tokens are available. Uses the Redis clock so
+# every process agrees on the time.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call("TIME")
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = math.ceil((cost - tokens) * 1000 / rate)
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+
+class TokenBucket:
+    """
+    Distributed token bucket: ``rate`` tokens per second, up to ``burst``.
+
+    Buckets live in Redis, so every bot process and Celery worker shares them.
+    Once a key is refused, the refusal is remembered in-process until its
+    wait is over, so a client hammering a limit costs no Redis round trips.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, local_size: int = 10000):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self._blocked = TTLCache(maxsize=local_size, ttl=1)
+        self._script = None
+
+    def _key(self, key) -> str:
+        return f"bucket:{self.name}:{key}"
+
+    def acquire(self, key, cost: int = 1) -> float:
+        """
+        Take ``cost`` tokens for ``key``. Returns 0 if they were taken,
+        otherwise the number of seconds to wait before trying again.
+        """
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None:
+            return max(blocked_until - time.monotonic(), 0.001)
+
+        if self._script is None:
+            self._script = get_redis().register_script(TOKEN_BUCKET_LUA)
+        try:
+            wait_ms = int(
+                self._script(keys=[self._key(key)], args=[self.rate, self.burst, cost])
+            )
+        except redis.RedisError as e:
+            # Fail open: losing the limiter must not take the bot down
+            logger.error(f"Rate limiter {self.name} unavailable: {e}")
+            return 0
+
+        if wait_ms:
+            wait = wait_ms / 1000
+            self._blocked.set(key, time.monotonic() + wait, ttl=wait)
+            return wait
+        return 0
+
+    def allow(self, key, cost: int = 1) -> bool:
+        return self.acquire(key, cost) == 0
+
+    def is_blocked(self, key) -> bool:
+        """
+        Whether ``key`` is known to be refused, without asking Redis.
+        """
+        return self._blocked.get(key) is not None
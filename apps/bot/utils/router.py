@@ -0,0 +1,50 @@
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.utils import translation
+
+
+class Router:
+    """
+    Exact-match table plus a prefix table keyed by prefix length: one dict
+    lookup for exact keys, one per distinct prefix length otherwise (longest
+    first). Compile it once and reuse it for every update.
+    """
+
+    def __init__(self):
+        self.exact = {}
+        self.prefixes = {}
+        self.lengths = ()
+
+    def add(self, key: str, handler: Callable) -> None:
+        self.exact[key] = handler
+
+    def add_label(self, label: str, handler: Callable) -> None:
+        """
+        Route a translatable label in every language, so buttons of any
+        language reach the handler without a gettext call per update.
+        """
+        for language, _name in settings.LANGUAGES:
+            with translation.override(language):
+                self.add(translation.gettext(label), handler)
+
+    def add_prefix(self, prefix: str, handler: Callable) -> None:
+        self.prefixes[prefix] = handler
+        self.lengths = tuple(sorted({len(p) for p in self.prefixes}, reverse=True))
+
+    def resolve(self, key: Optional[str]) -> Optional[Tuple[Callable, tuple]]:
+        """
+        The handler for ``key`` and the extra arguments to call it with (none
+        here; signed callbacks carry theirs), or None if no route matches.
+        """
+        if key is None:
+            return None
+        handler = self.exact.get(key)
+        if handler is not None:
+            return handler, ()
+
+        for length in self.lengths:
+            handler = self.prefixes.get(key[:length])
+            if handler is not None:
+                return handler, ()
+        return None
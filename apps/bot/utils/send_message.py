@@ -1,11 +1,10 @@
-import pathlib
-from typing import Optional, Union
+from typing import Optional
 
-from django.utils.translation import activate
+from django.db.models.fields.files import FieldFile
 from telebot import TeleBot
-from telebot.types import InlineKeyboardMarkup, InputFile
+from telebot.types import InlineKeyboardMarkup
 
-from apps.bot.utils.language import set_language_code
+from apps.bot.utils.media import send_photo
 
 
 def send_reply(
@@ -13,28 +12,16 @@ def send_reply(
     user_id: int,
     text: str,
     reply_markup: Optional[InlineKeyboardMarkup] = None,
-    image: Optional[Union[str, InputFile]] = None,
+    image: Optional[FieldFile] = None,
 ) -> None:
 
     common_args = {
-        "chat_id": user_id,
         "parse_mode": "Markdown",
     }
     if reply_markup:
         common_args["reply_markup"] = reply_markup
 
-    valid_image = None
     if image:
-        if isinstance(image, str) and image.strip():
-            valid_image = image
-        elif not isinstance(image, str):
-            valid_image = image
-
-    if image:
-        bot.send_photo(
-            photo=InputFile(pathlib.Path(f"/app/assets{valid_image}")),
-            caption=text,
-            **common_args,
-        )
+        send_photo(bot, user_id, image, caption=text, **common_args)
     else:
-        bot.send_message(text=text, **common_args)
+        bot.send_message(user_id, text=text, **common_args)
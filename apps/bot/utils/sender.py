@@ -0,0 +1,199 @@
+import functools
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from django.conf import settings
+from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
+
+from apps.bot.logger import logger
+from apps.bot.utils.ratelimit import TokenBucket
+
+__all__ = ["SendQueue", "ShapedTeleBot", "get_send_queue"]
+
+# TeleBot methods that deliver something to a chat and count against limits
+SHAPED_METHODS = (
+    "send_message",
+    "send_photo",
+    "send_document",
+    "send_video",
+    "send_animation",
+    "send_audio",
+    "send_voice",
+    "send_location",
+    "send_contact",
+    "send_invoice",
+    "send_media_group",
+    "copy_message",
+    "forward_message",
+)
+
+
+class _Job:
+    __slots__ = ("func", "args", "kwargs", "future", "chat_token", "retries")
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.chat_token = False
+        self.retries = 0
+
+
+def _retry_after(e: ApiTelegramException) -> float:
+    parameters = (e.result_json or {}).get("parameters") or {}
+    return float(parameters.get("retry_after", 1))
+
+
+class SendQueue:
+    """
+    Outbound Telegram API calls shaped to the global and per-chat limits.
+
+    Both limits are Redis token buckets, so the bot process and every Celery
+    worker draw from the same budget. Calls to one chat run one at a time and
+    in submission order; a chat waiting for its bucket (or a 429
+    ``retry_after``) does not hold up other chats. ``submit`` returns a
+    Future: ignore it to fire and forget, or wait on it for the result.
+    """
+
+    def __init__(self, workers: int):
+        self.global_bucket = TokenBucket(
+            "send", rate=settings.BOT_SEND_RATE, burst=settings.BOT_SEND_BURST
+        )
+        self.chat_bucket = TokenBucket(
+            "send-chat",
+            rate=settings.BOT_SEND_CHAT_RATE,
+            burst=settings.BOT_SEND_CHAT_BURST,
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bot-send"
+        )
+        self._cond = threading.Condition()
+        self._chats = {}  # chat_id -> deque of jobs, head is next to send
+        self._ready = []  # heap of (ready_at, seq, chat_id)
+        self._seq = itertools.count()
+        self._thread = None
+
+    def submit(self, chat_id: int, func: Callable, *args, **kwargs) -> Future:
+        job = _Job(func, args, kwargs)
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._schedule, name="bot-send-scheduler", daemon=True
+                )
+                self._thread.start()
+            queue = self._chats.get(chat_id)
+            if queue is None:
+                self._chats[chat_id] = deque([job])
+                self._push(chat_id, 0)
+            else:
+                queue.append(job)
+        return job.future
+
+    def _push(self, chat_id: int, ready_at: float) -> None:
+        heapq.heappush(self._ready, (ready_at, next(self._seq), chat_id))
+        self._cond.notify()
+
+    def _schedule(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if self._ready and self._ready[0][0] <= now:
+                        break
+                    timeout = self._ready[0][0] - now if self._ready else None
+                    self._cond.wait(timeout)
+                _, _, chat_id = heapq.heappop(self._ready)
+                job = self._chats[chat_id][0]
+
+            wait = self._acquire(chat_id, job)
+            if wait:
+                with self._cond:
+                    self._push(chat_id, time.monotonic() + wait)
+                continue
+            self.executor.submit(self._send, chat_id, job)
+
+    def _acquire(self, chat_id: int, job: _Job) -> float:
+        # The chat token is kept across global waits so it is paid only once
+        if not job.chat_token:
+            wait = self.chat_bucket.acquire(chat_id)
+            if wait:
+                return wait
+            job.chat_token = True
+        return self.global_bucket.acquire("global")
+
+    def _send(self, chat_id: int, job: _Job) -> None:
+        try:
+            result = job.func(*job.args, **job.kwargs)
+        except ApiTelegramException as e:
+            if e.error_code == 429 and job.retries < settings.BOT_SEND_MAX_RETRIES:
+                job.retries += 1
+                job.chat_token = False
+                retry_after = _retry_after(e)
+                logger.error(f"Chat {chat_id} is flood limited for {retry_after}s")
+                with self._cond:
+                    self._push(chat_id, time.monotonic() + retry_after)
+                return
+            job.future.set_exception(e)
+        except Exception as e:
+            job.future.set_exception(e)
+        else:
+            job.future.set_result(result)
+
+        with self._cond:
+            queue = self._chats[chat_id]
+            queue.popleft()
+            if queue:
+                self._push(chat_id, 0)
+            else:
+                del self._chats[chat_id]
+
+
+_send_queue = None
+_send_queue_pid = None
+_send_queue_lock = threading.Lock()
+
+
+def get_send_queue() -> SendQueue:
+    """
+    The process-wide queue, shared by every bot instance in the process.
+    A forked child builds its own: the parent's threads are not copied.
+    """
+    global _send_queue, _send_queue_pid
+    with _send_queue_lock:
+        if _send_queue is None or _send_queue_pid != os.getpid():
+            _send_queue = SendQueue(workers=settings.BOT_SEND_WORKERS)
+            _send_queue_pid = os.getpid()
+        return _send_queue
+
+
+def _shaped(method):
+    @functools.wraps(method)
+    def wrapper(self, chat_id, *args, **kwargs):
+        return self.submit(method.__name__, chat_id, *args, **kwargs).result()
+
+    return wrapper
+
+
+class ShapedTeleBot(TeleBot):
+    """
+    TeleBot whose sending methods go through the shared SendQueue.
+
+    ``bot.send_message(...)`` keeps its blocking signature and return value;
+    ``bot.submit("send_message", chat_id, ...)`` returns a Future instead.
+    """
+
+    def submit(self, method_name: str, chat_id: int, *args, **kwargs) -> Future:
+        method = getattr(TeleBot, method_name)
+        return get_send_queue().submit(chat_id, method, self, chat_id, *args, **kwargs)
+
+
+for _name in SHAPED_METHODS:
+    setattr(ShapedTeleBot, _name, _shaped(getattr(TeleBot, _name)))
@@ -0,0 +1,107 @@
+import json
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+UPDATE_FIELD = "update"
+
+# Update parts that carry a chat, and parts that only carry the sender
+CHAT_PARTS = (
+    "message",
+    "edited_message",
+    "channel_post",
+    "edited_channel_post",
+    "business_message",
+    "edited_business_message",
+    "message_reaction",
+    "chat_member",
+    "my_chat_member",
+    "chat_join_request",
+)
+USER_PARTS = (
+    "callback_query",
+    "inline_query",
+    "chosen_inline_result",
+    "shipping_query",
+    "pre_checkout_query",
+    "poll_answer",
+)
+
+_client = None
+_async_client = None
+
+
+def get_client() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.BOT_UPDATES_REDIS_URL)
+    return _client
+
+
+def get_async_client() -> redis.asyncio.Redis:
+    global _async_client
+    if _async_client is None:
+        _async_client = redis.asyncio.Redis.from_url(settings.BOT_UPDATES_REDIS_URL)
+    return _async_client
+
+
+def update_chat_id(data: dict) -> int:
+    """
+    Chat an update belongs to: the chat for message-like updates, otherwise
+    the sender (callback and inline queries of a private chat share its id).
+    """
+    for part in CHAT_PARTS:
+        if part in data:
+            chat = data[part].get("chat") or {}
+            if "id" in chat:
+                return chat["id"]
+    for part in USER_PARTS:
+        if part in data:
+            message = data[part].get("message") or {}
+            if "chat" in message:
+                return message["chat"]["id"]
+            user = data[part].get("from") or data[part].get("user") or {}
+            if "id" in user:
+                return user["id"]
+    return 0
+
+
+def shard_for(chat_id: int, shards: int | None = None) -> int:
+    return chat_id % (shards or settings.BOT_UPDATES_SHARDS)
+
+
+def shard_stream(shard: int, prefix: str | None = None) -> str:
+    return f"{prefix or settings.BOT_UPDATES_STREAM}:{shard}"
+
+
+def route_update(raw_update: bytes, prefix: str | None = None) -> str:
+    """
+    Stream a raw update goes to. Every update of a chat lands on the same
+    shard, so the shard's single consumer sees them in order.
+    """
+    try:
+        chat_id = update_chat_id(json.loads(raw_update))
+    except (ValueError, AttributeError):
+        chat_id = 0
+    return shard_stream(shard_for(chat_id), prefix)
+
+
+async def enqueue_update(raw_update: bytes) -> None:
+    """
+    Append a raw Telegram update (JSON body) to its shard stream.
+    """
+    await get_async_client().xadd(
+        route_update(raw_update),
+        {UPDATE_FIELD: raw_update},
+        maxlen=settings.BOT_UPDATES_STREAM_MAXLEN,
+        approximate=True,
+    )
+
+
+def ensure_group(client: redis.Redis, stream: str, group: str) -> None:
+    try:
+        client.xgroup_create(stream, group, id="0", mkstream=True)
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
@@ -1,5 +1,25 @@
+import atexit
+import os
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from apps.bot.logger import logger
+from apps.bot.utils.profile import cache_profile, get_profile, invalidate_profile
 from apps.shop.models.users import BotUsers
 
+__all__ = ["update_or_create_user", "flush_pending_users"]
+
+WRITE_BEHIND_FIELDS = ["username", "first_name", "last_name", "is_active"]
+
+_pending = {}
+_pending_lock = threading.Lock()
+_flush_event = threading.Event()
+_flusher = None
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
 
 def update_or_create_user(
     telegram_id,
@@ -11,18 +31,100 @@ def update_or_create_user(
     """
     Update or create a user in the BotUsers model.
 
+    New users are written immediately so that handlers can rely on the row
+    existing. Changes to known users are compared against the cached profile,
+    no-op writes are skipped and real changes are buffered and flushed in
+    batches by a background thread.
+
     :param telegram_id: User's Telegram ID
     :param username: User's username
     :param first_name: User's first name
     :param last_name: User's last name
     :param is_active: User's activity status
     """
-    BotUsers.objects.update_or_create(
-        telegram_id=telegram_id,
-        defaults={
-            "username": username,
-            "first_name": first_name,
-            "last_name": last_name,
-            "is_active": is_active,
-        },
-    )
+    fields = {
+        "username": username,
+        "first_name": first_name,
+        "last_name": last_name,
+        "is_active": is_active,
+    }
+
+    profile = get_profile(telegram_id)
+    if profile is None:
+        BotUsers.objects.update_or_create(telegram_id=telegram_id, defaults=fields)
+        return
+
+    if all(getattr(profile, name) == value for name, value in fields.items()):
+        return
+
+    with _pending_lock:
+        _pending[telegram_id] = fields
+        pending_count = len(_pending)
+    cache_profile(telegram_id, profile._replace(**fields))
+
+    _ensure_flusher()
+    if pending_count >= settings.BOT_USER_FLUSH_BATCH_SIZE:
+        _flush_event.set()
+
+
+def flush_pending_users():
+    """
+    Write all buffered user changes with a single upsert.
+    """
+    global _pending
+
+    with _pending_lock:
+        batch, _pending = _pending, {}
+    if not batch:
+        return
+
+    try:
+        BotUsers.objects.bulk_create(
+            [
+                BotUsers(telegram_id=telegram_id, **fields)
+                for telegram_id, fields in batch.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["telegram_id"],
+            update_fields=[*WRITE_BEHIND_FIELDS, "updated_at"],
+        )
+    except Exception as e:
+        logger.error(f"Error flushing {len(batch)} bot users: {e}")
+        connection.close_if_unusable_or_obsolete()
+        # Put the batch back unless a newer change arrived in the meantime.
+        with _pending_lock:
+            for telegram_id, fields in batch.items():
+                _pending.setdefault(telegram_id, fields)
+        return
+
+    for telegram_id in batch:
+        invalidate_profile(telegram_id)
+
+
+def _flush_loop():
+    interval = settings.BOT_USER_FLUSH_INTERVAL / 1000
+    while True:
+        _flush_event.wait(interval)
+        _flush_event.clear()
+        flush_pending_users()
+
+
+def _ensure_flusher():
+    """
+    Start the flusher thread once per process. A forked child starts its
+    own: the parent's threads are not copied.
+    """
+    global _flusher, _flusher_pid
+
+    if _flusher is not None and _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher is None or _flusher_pid != os.getpid():
+            _flusher = threading.Thread(
+                target=_flush_loop, name="bot-users-flusher", daemon=True
+            )
+            _flusher.start()
+            _flusher_pid = os.getpid()
+
+
+atexit.register(flush_pending_users)
@@ -0,0 +1,41 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from apps.bot.logger import logger
+from apps.bot.utils.streams import enqueue_update
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class TelegramWebhookView(View):
+    """
+    Accepts updates pushed by Telegram and hands them to the bot workers
+    through a Redis stream. Nothing is processed inline, so the response
+    goes back as soon as the update is stored.
+    """
+
+    http_method_names = ["post"]
+
+    async def post(self, request, *args, **kwargs):
+        secret = request.headers.get(SECRET_HEADER, "")
+        if not settings.BOT_WEBHOOK_SECRET or not hmac.compare_digest(
+            secret, settings.BOT_WEBHOOK_SECRET
+        ):
+            return HttpResponseForbidden()
+
+        if not request.body:
+            return HttpResponseBadRequest()
+
+        try:
+            await enqueue_update(request.body)
+        except Exception as e:
+            # A non-2xx response makes Telegram redeliver the update later.
+            logger.error(f"Error while enqueuing update: {e}")
+            return HttpResponse(status=503)
+        return HttpResponse()
@@ -0,0 +1,90 @@
+import os
+import sys
+
+
+# Add the project directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set the DJANGO_SETTINGS_MODULE environment variable
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")  # noqa
+
+# Initialize Django
+import django
+
+django.setup()
+
+import argparse
+import signal
+
+from django.conf import settings
+from django.db import close_old_connections
+from telebot import apihelper, types
+
+from apps.bot.conf import TOKEN
+from apps.bot.loader import register_handlers
+from apps.bot.logger import logger
+from apps.bot.utils.consumer import ShardConsumer
+from apps.bot.utils.identity import start_identity_refresh
+from apps.bot.utils.sender import ShapedTeleBot
+from apps.bot.utils.streams import UPDATE_FIELD, get_client
+
+
+# Log a message to indicate the worker is starting
+logger.info("Starting bot worker...")
+
+# Enable middleware
+apihelper.ENABLE_MIDDLEWARE = True
+
+# Every shard thread dispatches its updates inline, one after another
+bot = ShapedTeleBot(TOKEN, threaded=False)
+register_handlers(bot)
+
+
+def handle_entry(entry_id, fields) -> None:
+    close_old_connections()
+    update = types.Update.de_json(fields[UPDATE_FIELD.encode()].decode())
+    bot.process_new_updates([update])
+
+
+def owned_shards(index: int, count: int) -> list[int]:
+    return [s for s in range(settings.BOT_UPDATES_SHARDS) if s % count == index]
+
+
+def run(index: int, count: int):
+    client = get_client()
+    consumers = [
+        ShardConsumer(client, shard, handle_entry)
+        for shard in owned_shards(index, count)
+    ]
+    logger.info(f"Worker {index}/{count} owns shards {[c.shard for c in consumers]}")
+
+    # Stop on SIGTERM (docker stop) the same way as on Ctrl + C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    for consumer in consumers:
+        consumer.start()
+    try:
+        signal.pause()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for consumer in consumers:
+            consumer.stop()
+        for consumer in consumers:
+            consumer.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bot update stream worker")
+    parser.add_argument(
+        "--index", type=int, default=int(os.getenv("BOT_WORKER_INDEX", 0))
+    )
+    parser.add_argument(
+        "--count", type=int, default=int(os.getenv("BOT_WORKER_COUNT", 1))
+    )
+    args = parser.parse_args()
+
+    logger.info("Bot worker is running...")
+    logger.info("Press Ctrl + C to stop the worker")
+    start_identity_refresh(bot)
+    run(args.index, args.count)
+    logger.info("Bot worker stopped")
@@ -1,58 +1,31 @@
-import random
-from functools import lru_cache
+from collections import defaultdict
 
-from django.utils.timezone import now, timedelta
+from django.utils import timezone
+from django.utils.formats import date_format
+from django.utils.translation import gettext as _
 from unfold.components import BaseComponent, register_component
 
+from apps.shop.services import analytics
 
-@lru_cache
-def tracker_random_data():
-    data = []
 
-    for _i in range(1, 64):
-        has_value = random.choice([True, True, True, True, False])
-        color = None
-        tooltip = None
+def cohort_data():
+    """
+    Weekly cohorts of new users and how many of them paid for an order in
+    each following week.
+    """
+    cohorts = defaultdict(list)
+    for row in analytics.cohorts(timezone.localdate()):
+        cohorts[row.cohort].append(row)
 
-        if has_value:
-            value = random.randint(2, 6)
-            color = "bg-primary-500"
-            tooltip = f"Value {value}"
-
-        data.append(
-            {
-                "color": color,
-                "tooltip": tooltip,
-            }
-        )
-
-    return data
-
-
-@register_component
-class TrackerComponent(BaseComponent):
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["data"] = tracker_random_data()
-        return context
-
-
-@lru_cache
-def cohort_random_data():
     rows = []
-    headers = []
-    cols = []
-
-    dates = reversed(
-        [(now() - timedelta(days=x)).strftime("%B %d, %Y") for x in range(8)]
-    )
-    groups = range(1, 10)
-
-    for row_index, date in enumerate(dates):
+    periods = 0
+    for cohort, retention in cohorts.items():
+        size = retention[0].cohort_size
+        periods = max(periods, len(retention))
         cols = []
-
-        for col_index, _col in enumerate(groups):
-            color_index = 8 - row_index - col_index
+        for row in retention:
+            percent = row.users * 100 / size if size else 0
+            color_index = min(8, int(percent // 12.5) + 1) if row.users else 0
             col_classes = []
 
             if color_index > 0:
@@ -63,42 +36,33 @@ def cohort_random_data():
             if color_index >= 4:
                 col_classes.append("text-white dark:text-base-600")
 
-            value = random.randint(
-                4000 - (col_index * row_index * 225),
-                5000 - (col_index * row_index * 225),
-            )
-
-            subtitle = f"{random.randint(10, 100)}%"
-
-            if value <= 0:
-                value = 0
-                subtitle = None
-
             cols.append(
                 {
-                    "value": value,
+                    "value": row.users,
                     "color": " ".join(col_classes),
-                    "subtitle": subtitle,
+                    "subtitle": f"{percent:.0f}%" if row.users else None,
                 }
             )
 
         rows.append(
             {
                 "header": {
-                    "title": date,
-                    "subtitle": f"Total {sum(col['value'] for col in cols):,}",
+                    "title": date_format(cohort, "j E Y"),
+                    "subtitle": _("%(count)s new users") % {"count": size},
                 },
                 "cols": cols,
             }
         )
 
-    for index, group in enumerate(groups):
-        total = sum(row["cols"][index]["value"] for row in rows)
-
+    headers = []
+    for period in range(periods):
+        total = sum(
+            row["cols"][period]["value"] for row in rows if len(row["cols"]) > period
+        )
         headers.append(
             {
-                "title": f"Group #{group}",
-                "subtitle": f"Total {total:,}",
+                "title": _("Week %(number)s") % {"number": period},
+                "subtitle": _("Total %(count)s") % {"count": total},
             }
         )
 
@@ -112,5 +76,5 @@ def cohort_random_data():
 class CohortComponent(BaseComponent):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["data"] = cohort_random_data()
+        context["data"] = cohort_data()
         return context
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.shop.services.analytics import refresh
+
+
+class Command(BaseCommand):
+    help = "Recomputes the sales analytics rollups of the last days"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.ANALYTICS_DAYS,
+            help="Number of days to recompute, ending today",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        days = refresh(today - timedelta(days=n) for n in range(options["days"]))
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {len(days)} days"))
@@ -0,0 +1,134 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from telebot import types
+
+from apps.bot.utils.consumer import ShardConsumer
+from apps.bot.utils.streams import UPDATE_FIELD, get_client, route_update, shard_stream
+from apps.shared.utils.stats import percentiles
+
+
+def synthetic_update(update_id: int, chat_id: int, seq: int) -> bytes:
+    return json.dumps(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": seq,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+                "text": str(seq),
+            },
+        }
+    ).encode()
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays synthetic updates through the sharded update streams and "
+        "reports per-shard latency percentiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--updates", type=int, default=10000)
+        parser.add_argument("--chats", type=int, default=500)
+        parser.add_argument(
+            "--work-ms",
+            type=float,
+            default=1.0,
+            help="Simulated handler time per update",
+        )
+        parser.add_argument("--timeout", type=int, default=300)
+
+    def handle(self, *args, **options):
+        client = get_client()
+        prefix = f"{settings.BOT_UPDATES_STREAM}:loadtest"
+        shards = range(settings.BOT_UPDATES_SHARDS)
+        streams = [shard_stream(shard, prefix) for shard in shards]
+        client.delete(*streams)
+
+        total = options["updates"]
+        work = options["work_ms"] / 1000
+        lock = threading.Lock()
+        latencies = defaultdict(list)
+        last_seq = {}
+        out_of_order = 0
+        done = threading.Event()
+
+        def make_handler(shard):
+            def handle_entry(entry_id, fields):
+                nonlocal out_of_order
+                update = types.Update.de_json(fields[UPDATE_FIELD.encode()].decode())
+                time.sleep(work)
+                chat_id = update.message.chat.id
+                seq = update.message.message_id
+                enqueued_ms = int(entry_id.split(b"-")[0])
+                with lock:
+                    if last_seq.get(chat_id, 0) > seq:
+                        out_of_order += 1
+                    last_seq[chat_id] = seq
+                    latencies[shard].append(time.time() * 1000 - enqueued_ms)
+                    if sum(map(len, latencies.values())) == total:
+                        done.set()
+
+            return handle_entry
+
+        consumers = [
+            ShardConsumer(client, shard, make_handler(shard), prefix)
+            for shard in shards
+        ]
+        for consumer in consumers:
+            consumer.start()
+
+        started = time.monotonic()
+        seqs = defaultdict(int)
+        pipe = client.pipeline(transaction=False)
+        for update_id in range(1, total + 1):
+            chat_id = random.randint(1, options["chats"])
+            seqs[chat_id] += 1
+            raw = synthetic_update(update_id, chat_id, seqs[chat_id])
+            pipe.xadd(route_update(raw, prefix), {UPDATE_FIELD: raw})
+            if update_id % 500 == 0:
+                pipe.execute()
+        pipe.execute()
+
+        finished = done.wait(options["timeout"])
+        elapsed = time.monotonic() - started
+        for consumer in consumers:
+            consumer.stop()
+        for consumer in consumers:
+            consumer.join()
+        client.delete(*streams)
+
+        self.stdout.write(
+            f"{'shard':>5} {'updates':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for shard in shards:
+            p50, p95, p99 = percentiles(latencies[shard])
+            self.stdout.write(
+                f"{shard:>5} {len(latencies[shard]):>8} "
+                f"{p50:>9.1f} {p95:>9.1f} {p99:>9.1f}"
+            )
+
+        processed = sum(map(len, latencies.values()))
+        p50, p95, p99 = percentiles([v for s in latencies.values() for v in s])
+        self.stdout.write(
+            f"{'all':>5} {processed:>8} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}"
+        )
+        self.stdout.write(f"{processed / elapsed:.0f} updates/s")
+
+        if not finished:
+            self.stdout.write(
+                self.style.WARNING(f"Timed out: {processed}/{total} updates processed")
+            )
+        if out_of_order:
+            self.stdout.write(
+                self.style.ERROR(f"{out_of_order} updates processed out of order")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("Per-chat order preserved"))
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from apps.bot.logger import logger
+from apps.shop.services.outbox import prune, relay
+
+
+class Command(BaseCommand):
+    help = "Publishes committed outbox messages to Celery"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Publish what is pending and exit",
+        )
+
+    def handle(self, *args, **options):
+        pruned_at = None
+        while True:
+            # Drop connections the database closed or that outlived CONN_MAX_AGE
+            close_old_connections()
+            try:
+                now = time.monotonic()
+                if (
+                    pruned_at is None
+                    or now - pruned_at >= settings.OUTBOX_PRUNE_INTERVAL
+                ):
+                    prune(settings.OUTBOX_RETENTION_DAYS)
+                    pruned_at = now
+                sent = relay(settings.OUTBOX_RELAY_BATCH)
+            except DatabaseError as e:
+                # OperationalError included: wait for the database and retry
+                logger.error(f"Outbox relay failed: {e}")
+                time.sleep(settings.OUTBOX_RELAY_INTERVAL)
+                continue
+            if options["once"] and sent < settings.OUTBOX_RELAY_BATCH:
+                return
+            if not sent:
+                time.sleep(settings.OUTBOX_RELAY_INTERVAL)
@@ -0,0 +1,126 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.utils import translation
+from django.utils.translation import gettext as _
+
+from apps.bot.handlers.register import (
+    build_callback_router,
+    build_message_router,
+    resolve_callback,
+)
+from apps.bot.utils import callbacks
+from apps.bot.utils.callbacks import Action
+
+MESSAGES = [
+    "Products",
+    "Cart",
+    "Info",
+    "/help",
+    "№2 - Coca cola",
+    "hello",
+]
+USER_ID = 123456789
+CALLBACKS = [
+    callbacks.encode(Action.CART_PLUS, 125, user_id=USER_ID),
+    callbacks.encode(Action.CART_MINUS, 125, user_id=USER_ID),
+    callbacks.encode(Action.CART_SAVE, 125, user_id=USER_ID),
+    callbacks.encode(Action.DONATE_CLICK, 42, user_id=USER_ID),
+    "payme",
+    "lang_uz",
+    "unknown_1",
+]
+LABELS = ["Language", "Cart", "Order", "Clear", "Products", "Info", "Donate", "Home"]
+PREFIXES = [
+    "donate_",
+    "select_donate_payme_",
+    "select_donate_click_",
+    "back_to_payment_method_",
+    "plus_",
+    "minus_",
+    "clear_",
+    "save_",
+]
+
+
+def linear_message(text):
+    """
+    The if/elif chain the router replaced: a gettext call per branch.
+    """
+    for label in LABELS:
+        if text == _(label):
+            return label
+    return text.startswith("№") or None
+
+
+LEGACY_CALLBACKS = [
+    "plus_125",
+    "minus_125",
+    "save_125",
+    "select_donate_click_42",
+    "payme",
+    "lang_uz",
+    "unknown_1",
+]
+
+
+def linear_callback(data):
+    """
+    The if/elif chain over the unsigned "<action>_<id>" callbacks.
+    """
+    if data in ("lang_ru", "lang_uz", "payme", "click"):
+        return data
+    for prefix in PREFIXES:
+        if data.startswith(prefix):
+            return int(data.rsplit("_", 1)[1])
+    return None
+
+
+def dispatch_callback(data):
+    call = SimpleNamespace(data=data, from_user=SimpleNamespace(id=USER_ID))
+    return resolve_callback(call)
+
+
+def measure(func, keys, rounds: int) -> float:
+    """
+    Nanoseconds per call.
+    """
+    started = time.perf_counter_ns()
+    for _round in range(rounds):
+        for key in keys:
+            func(key)
+    return (time.perf_counter_ns() - started) / (rounds * len(keys))
+
+
+class Command(BaseCommand):
+    help = "Measures the cost of routing a message or callback to its handler"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        rounds = options["rounds"]
+        with translation.override("ru"):
+            messages = [_(text) for text in MESSAGES]
+
+            started = time.perf_counter()
+            message_router = build_message_router()
+            build_callback_router()
+            build_ms = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"Routers compiled in {build_ms:.1f} ms")
+
+            rows = [
+                ("messages, router", measure(message_router.resolve, messages, rounds)),
+                ("messages, if/elif", measure(linear_message, messages, rounds)),
+                (
+                    "callbacks, signed",
+                    measure(dispatch_callback, CALLBACKS, rounds),
+                ),
+                (
+                    "callbacks, if/elif",
+                    measure(linear_callback, LEGACY_CALLBACKS, rounds),
+                ),
+            ]
+        for name, ns in rows:
+            self.stdout.write(f"{name:<20} {ns:>8.0f} ns/dispatch")
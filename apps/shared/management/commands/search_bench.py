@@ -0,0 +1,135 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.bot.query import search
+from apps.bot.query.search import ProductIndex, tokenize
+from apps.shared.utils.stats import percentiles
+from apps.shop.models.category import Category
+from apps.shop.models.products import Product
+
+
+def random_word() -> str:
+    return "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 9)))
+
+
+def with_typo(word: str) -> str:
+    if len(word) < 4:
+        return word
+    i = random.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2 :]
+
+
+class Command(BaseCommand):
+    help = "Measures product search latency (p50/p95/p99) on the current database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Add this many synthetic products for the run (rolled back after)",
+        )
+        parser.add_argument("--queries", type=int, default=1000)
+        parser.add_argument(
+            "--typos",
+            type=float,
+            default=0.2,
+            help="Share of queries with a transposed letter",
+        )
+        parser.add_argument(
+            "--python",
+            action="store_true",
+            help="Use the in-memory fallback index even on Postgres",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"]:
+                self.seed(options["seed"])
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def seed(self, count: int) -> None:
+        category = Category.objects.create(name="Benchmark")
+        vocabulary = [random_word() for _ in range(5000)]
+        batch = []
+        for i in range(count):
+            title = " ".join(random.choices(vocabulary, k=3))
+            description = " ".join(random.choices(vocabulary, k=20))
+            batch.append(
+                Product(
+                    category=category,
+                    title=title,
+                    title_uz=title,
+                    title_ru=title.upper(),
+                    description=description,
+                    description_uz=description,
+                    description_ru=description,
+                    price=1000,
+                    image="products/benchmark.jpg",
+                    quantity=1,
+                )
+            )
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+        self.stdout.write(f"Seeded {count} products")
+
+    def make_queries(self, count: int, typos: float) -> list:
+        titles = list(
+            Product.objects.filter(is_active=True, quantity__gt=0).values_list(
+                "title_uz", flat=True
+            )[:10000]
+        )
+        queries = []
+        for _ in range(count):
+            words = tokenize(random.choice(titles)) if titles else []
+            if not words:
+                queries.append(random_word())
+                continue
+            word = random.choice(words)
+            if random.random() < typos:
+                word = with_typo(word)
+            else:
+                # As typed so far: a prefix of the word
+                word = word[: random.randint(min(3, len(word)), len(word))]
+            queries.append(word)
+        return queries
+
+    def run(self, options) -> None:
+        queries = self.make_queries(options["queries"], options["typos"])
+        use_python = options["python"] or connection.vendor != "postgresql"
+
+        if use_python:
+            started = time.perf_counter()
+            index = ProductIndex.build()
+            build_ms = (time.perf_counter() - started) * 1000
+            self.stdout.write(f"Built the in-memory index in {build_ms:.0f} ms")
+
+            def run_query(text):
+                return index.search(text, None, 25, 0)
+
+        else:
+
+            def run_query(text):
+                return search.search_postgres(text, None, 25, 0)
+
+        timings = []
+        empty = 0
+        for text in queries:
+            started = time.perf_counter()
+            if not run_query(text):
+                empty += 1
+            timings.append((time.perf_counter() - started) * 1000)
+
+        p50, p95, p99 = percentiles(timings)
+        backend = "in-memory" if use_python else "postgres"
+        self.stdout.write(
+            f"{backend}: {len(timings)} queries, p50 {p50:.2f} ms, "
+            f"p95 {p95:.2f} ms, p99 {p99:.2f} ms, {empty} without results"
+        )
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from telebot import TeleBot
+
+from apps.bot.conf import TOKEN
+
+
+class Command(BaseCommand):
+    help = "Sets or deletes the Telegram webhook of the bot"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Delete the webhook and go back to long polling",
+        )
+        parser.add_argument(
+            "--drop-pending",
+            action="store_true",
+            help="Drop updates Telegram has queued for the bot",
+        )
+
+    def handle(self, *args, **options):
+        bot = TeleBot(TOKEN)
+
+        if options["delete"]:
+            bot.delete_webhook(drop_pending_updates=options["drop_pending"])
+            self.stdout.write(self.style.SUCCESS("Webhook deleted"))
+            return
+
+        if not settings.BOT_WEBHOOK_URL or not settings.BOT_WEBHOOK_SECRET:
+            raise CommandError("BOT_WEBHOOK_URL and BOT_WEBHOOK_SECRET must be set")
+
+        bot.set_webhook(
+            url=settings.BOT_WEBHOOK_URL,
+            secret_token=settings.BOT_WEBHOOK_SECRET,
+            max_connections=100,
+            drop_pending_updates=options["drop_pending"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Webhook set to {settings.BOT_WEBHOOK_URL}")
+        )
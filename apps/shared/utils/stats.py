@@ -0,0 +1,13 @@
+import statistics
+from typing import List, Tuple
+
+
+def percentiles(values: List[float]) -> Tuple[float, float, float]:
+    """
+    p50, p95 and p99 of ``values`` (benchmarks and load tests).
+    """
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
@@ -1,196 +1,212 @@
 import json
-import random
-from functools import lru_cache
+from collections import Counter, defaultdict
+from datetime import timedelta
+from decimal import Decimal
 
-from django.contrib.humanize.templatetags.humanize import intcomma
+from django.utils import timezone
+from django.utils.formats import date_format
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import RedirectView
 
+from apps.shop.models.order import Order
+from apps.shop.services import analytics
+
+CHART_DAYS = 28
+TRACKER_DAYS = 63
+TOP_PRODUCTS_DAYS = 14
+TOP_PRODUCTS = 10
+
 
 class DashView(RedirectView):
     pattern_name = "admin:index"
 
 
+def money(value) -> str:
+    return f"{int(value):,} UZS".replace(",", " ")
+
+
+def change(current, previous) -> str:
+    if not previous:
+        return "—"
+    percent = (current - previous) * 100 / previous
+    if percent < 0:
+        return mark_safe(
+            f'<span class="text-red-700 font-semibold dark:text-red-400">{percent:.02f}%</span>'
+        )
+    return mark_safe(
+        f'<span class="text-green-700 font-semibold dark:text-green-400">+{percent:.02f}%</span>'
+    )
+
+
+def period(first, last) -> str:
+    return f"{date_format(first, 'j E')} - {date_format(last, 'j E')}"
+
+
 def dashboard_callback(request, context):
-    context.update(random_data())
-    return context
+    """
+    Dashboard figures, read from the analytics rollups kept up to date by
+    refresh_analytics_task.
+    """
+    today = timezone.localdate()
+    days = [today - timedelta(days=n) for n in reversed(range(TRACKER_DAYS))]
 
+    statuses = defaultdict(Counter)  # day -> status -> orders
+    paid = defaultdict(Counter)  # day -> orders/revenue/products
+    for row in analytics.sales(days[0], today):
+        statuses[row["date"]][row["status"]] += row["orders"]
+        if row["status"] == Order.Status.COMPLETED:
+            paid[row["date"]]["orders"] += row["orders"]
+            paid[row["date"]]["revenue"] += row["revenue"]
+            if row["order_type"] == Order.OrderType.PRODUCT:
+                paid[row["date"]]["products"] += row["revenue"]
 
-@lru_cache
-def random_data():
-    WEEKDAYS = [
-        "Mon",
-        "Tue",
-        "Wed",
-        "Thu",
-        "Fri",
-        "Sat",
-        "Sun",
-    ]
-
-    positive = [[1, random.randrange(8, 28)] for i in range(1, 28)]
-    negative = [[-1, -random.randrange(8, 28)] for i in range(1, 28)]
-    average = [r[1] - random.randint(3, 5) for r in positive]
-    performance_positive = [[1, random.randrange(8, 28)] for i in range(1, 28)]
-    performance_negative = [[-1, -random.randrange(8, 28)] for i in range(1, 28)]
-    random_value = random.uniform(1000, 9999)
-    formatted_value = f"{random_value:.02f}"
-    metric = f"${intcomma(formatted_value)}"
-
-    return {
-        "navigation": [
-            {"title": _("Dashboard"), "link": "/", "active": True},
-            {"title": _("Analytics"), "link": "#"},
-            {"title": _("Settings"), "link": "#"},
-        ],
-        "filters": [
-            {"title": _("All"), "link": "#", "active": True},
-            {
-                "title": _("New"),
-                "link": "#",
-            },
-        ],
-        "kpi": [
-            {
-                "title": "Product A Performance",
-                "metric": metric,
-                "footer": mark_safe(
-                    f'<strong class="text-green-700 font-semibold dark:text-green-400">+{intcomma(f"{random.uniform(1, 9):.02f}")}%</strong>&nbsp;progress from last week'
-                ),
-                "chart": json.dumps(
+    def total(key, last, length):
+        return sum(
+            (paid[last - timedelta(days=n)][key] for n in range(length)), Decimal(0)
+        )
+
+    week_ago = today - timedelta(days=7)
+    revenue, revenue_before = total("revenue", today, 7), total("revenue", week_ago, 7)
+    orders, orders_before = total("orders", today, 7), total("orders", week_ago, 7)
+    average = revenue / orders if orders else 0
+    average_before = revenue_before / orders_before if orders_before else 0
+
+    def footer(current, previous):
+        return mark_safe(f"{change(current, previous)}&nbsp;{_('from previous week')}")
+
+    chart_days = days[-CHART_DAYS:]
+    labels = [date_format(day, "d.m") for day in chart_days]
+
+    top_first = today - timedelta(days=TOP_PRODUCTS_DAYS - 1)
+    previous_last = top_first - timedelta(days=1)
+    previous_first = previous_last - timedelta(days=TOP_PRODUCTS_DAYS - 1)
+    products_revenue = total("products", today, TOP_PRODUCTS_DAYS)
+    products_revenue_before = total("products", previous_last, TOP_PRODUCTS_DAYS)
+
+    last_week = days[-7:]
+    tracked = sum(1 for day in days if paid[day]["orders"])
+
+    context.update(
+        {
+            "navigation": [
+                {"title": _("Dashboard"), "link": "/", "active": True},
+                {"title": _("Analytics"), "link": "#"},
+                {"title": _("Settings"), "link": "#"},
+            ],
+            "filters": [
+                {"title": _("All"), "link": "#", "active": True},
+                {
+                    "title": _("New"),
+                    "link": "#",
+                },
+            ],
+            "kpi": [
+                {
+                    "title": _("Revenue"),
+                    "metric": money(revenue),
+                    "footer": footer(revenue, revenue_before),
+                },
+                {
+                    "title": _("Paid orders"),
+                    "metric": orders,
+                    "footer": footer(orders, orders_before),
+                },
+                {
+                    "title": _("Average order value"),
+                    "metric": money(average),
+                    "footer": footer(average, average_before),
+                },
+            ],
+            "products": {
+                "revenue": money(products_revenue),
+                "change": change(products_revenue, products_revenue_before),
+                "period": period(top_first, today),
+                "previous_period": period(previous_first, previous_last),
+            },
+            "progress": [
+                {
+                    "title": product["product__title"],
+                    "description": f"{money(product['revenue'])} · {product['quantity']} {_('pieces')}",
+                    "value": min(100, int(product["revenue"] * 100 / products_revenue))
+                    if products_revenue
+                    else 0,
+                }
+                for product in analytics.top_products(top_first, today, TOP_PRODUCTS)
+            ],
+            "chart": json.dumps(
+                {
+                    "labels": labels,
+                    "datasets": [
+                        {
+                            "label": str(label),
+                            "data": [statuses[day][status] for day in chart_days],
+                            "backgroundColor": color,
+                        }
+                        for status, label, color in (
+                            (
+                                Order.Status.COMPLETED,
+                                _("Completed"),
+                                "var(--color-primary-700)",
+                            ),
+                            (
+                                Order.Status.PENDING,
+                                _("Pending"),
+                                "var(--color-primary-500)",
+                            ),
+                            (
+                                Order.Status.CANCELLED,
+                                _("Cancelled"),
+                                "var(--color-primary-300)",
+                            ),
+                        )
+                    ],
+                }
+            ),
+            "tracker": {
+                "value": f"{tracked}/{TRACKER_DAYS}",
+                "data": [
                     {
-                        "labels": [WEEKDAYS[day % 7] for day in range(1, 28)],
-                        "datasets": [{"data": average, "borderColor": "#9333ea"}],
+                        "color": "bg-primary-500" if paid[day]["orders"] else None,
+                        "tooltip": f"{date_format(day, 'j E')}: {paid[day]['orders']}",
                     }
-                ),
-            },
-            {
-                "title": "Product B Performance",
-                "metric": metric,
-                "footer": mark_safe(
-                    f'<strong class="text-green-700 font-semibold dark:text-green-400">+{intcomma(f"{random.uniform(1, 9):.02f}")}%</strong>&nbsp;progress from last week'
-                ),
-            },
-            {
-                "title": "Product C Performance",
-                "metric": metric,
-                "footer": mark_safe(
-                    f'<strong class="text-green-700 font-semibold dark:text-green-400">+{intcomma(f"{random.uniform(1, 9):.02f}")}%</strong>&nbsp;progress from last week'
-                ),
-            },
-        ],
-        "progress": [
-            {
-                "title": "🦆 Social marketing e-book",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🦍 Freelancing tasks",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🐋 Development coaching",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🦑 Product consulting",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🐨 Other income",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🐶 Course sales",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🐻‍❄️ Ads revenue",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🦩 Customer Retention Rate",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🦊 Marketing ROI",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-            {
-                "title": "🦁 Affiliate partnerships",
-                "description": metric,
-                "value": random.randint(10, 90),
-            },
-        ],
-        "chart": json.dumps(
-            {
-                "labels": [WEEKDAYS[day % 7] for day in range(1, 28)],
-                "datasets": [
-                    {
-                        "label": "Example 1",
-                        "type": "line",
-                        "data": average,
-                        "borderColor": "var(--color-primary-500)",
-                    },
-                    {
-                        "label": "Example 2",
-                        "data": positive,
-                        "backgroundColor": "var(--color-primary-700)",
-                    },
-                    {
-                        "label": "Example 3",
-                        "data": negative,
-                        "backgroundColor": "var(--color-primary-300)",
-                    },
+                    for day in days
                 ],
-            }
-        ),
-        "performance": [
-            {
-                "title": _("Last week revenue"),
-                "metric": "$1,234.56",
-                "footer": mark_safe(
-                    '<strong class="text-green-600 font-medium">+3.14%</strong>&nbsp;progress from last week'
-                ),
-                "chart": json.dumps(
-                    {
-                        "labels": [WEEKDAYS[day % 7] for day in range(1, 28)],
-                        "datasets": [
-                            {
-                                "data": performance_positive,
-                                "borderColor": "var(--color-primary-700)",
-                            }
-                        ],
-                    }
-                ),
             },
-            {
-                "title": _("Last week expenses"),
-                "metric": "$1,234.56",
-                "footer": mark_safe(
-                    '<strong class="text-green-600 font-medium">+3.14%</strong>&nbsp;progress from last week'
-                ),
-                "chart": json.dumps(
-                    {
-                        "labels": [WEEKDAYS[day % 7] for day in range(1, 28)],
-                        "datasets": [
-                            {
-                                "data": performance_negative,
-                                "borderColor": "var(--color-primary-300)",
-                            }
-                        ],
-                    }
-                ),
-            },
-        ],
-    }
+            "performance": [
+                {
+                    "title": _("Last week revenue"),
+                    "metric": money(revenue),
+                    "chart": json.dumps(
+                        {
+                            "labels": labels[-7:],
+                            "datasets": [
+                                {
+                                    "data": [
+                                        float(paid[day]["revenue"]) for day in last_week
+                                    ],
+                                    "borderColor": "var(--color-primary-700)",
+                                }
+                            ],
+                        }
+                    ),
+                },
+                {
+                    "title": _("Last week paid orders"),
+                    "metric": orders,
+                    "chart": json.dumps(
+                        {
+                            "labels": labels[-7:],
+                            "datasets": [
+                                {
+                                    "data": [paid[day]["orders"] for day in last_week],
+                                    "borderColor": "var(--color-primary-300)",
+                                }
+                            ],
+                        }
+                    ),
+                },
+            ],
+        }
+    )
+    return context
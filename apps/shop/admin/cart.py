@@ -2,6 +2,7 @@ from django.contrib import admin
 from unfold.admin import ModelAdmin, TabularInline
 
 from apps.shop.models.cart import Cart, CartItem
+from apps.shop.services.cart import recalculate
 
 
 class CartItemInline(TabularInline):
@@ -19,9 +20,27 @@ class CartAdmin(ModelAdmin):
     search_fields = ["user__telegram_id"]
     inlines = [CartItemInline]
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        recalculate(form.instance.pk)
+
 
 @admin.register(CartItem)
 class CartItemAdmin(ModelAdmin):
     list_display = ["id", "cart", "product", "quantity", "created_at", "updated_at"]
     list_per_page = 50
     autocomplete_fields = ["cart", "product"]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        recalculate(obj.cart_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recalculate(obj.cart_id)
+
+    def delete_queryset(self, request, queryset):
+        cart_ids = set(queryset.values_list("cart_id", flat=True))
+        super().delete_queryset(request, queryset)
+        for cart_id in cart_ids:
+            recalculate(cart_id)
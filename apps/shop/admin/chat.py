@@ -1,7 +1,7 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
 
-from apps.shop.models.chat import Chat
+from apps.shop.models.chat import Chat, OrderNotification
 
 
 @admin.register(Chat)
@@ -10,3 +10,12 @@ class ChatAdmin(ModelAdmin):
     list_per_page = 50
     search_fields = ["name", "chat_id"]
     list_filter = ["is_active"]
+
+
+@admin.register(OrderNotification)
+class OrderNotificationAdmin(ModelAdmin):
+    list_display = ["id", "order", "chat", "status", "updated_at"]
+    list_per_page = 50
+    search_fields = ["order__id", "chat__name", "chat__chat_id"]
+    list_filter = ["status"]
+    readonly_fields = ["order", "chat", "status", "error"]
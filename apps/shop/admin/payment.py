@@ -0,0 +1,20 @@
+from django.contrib import admin
+from unfold.admin import ModelAdmin
+
+from apps.shop.models.payment import PaymentEvent
+
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(ModelAdmin):
+    list_display = [
+        "id",
+        "provider",
+        "transaction_id",
+        "outcome",
+        "order",
+        "created_at",
+    ]
+    list_per_page = 50
+    search_fields = ["transaction_id", "order__id"]
+    list_filter = ["provider", "outcome"]
+    readonly_fields = ["provider", "transaction_id", "outcome", "order"]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.5 on 2026-10-18 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0002_chat"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "path",
+                    models.CharField(max_length=255, unique=True, verbose_name="Path"),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        db_index=True, max_length=64, verbose_name="Content hash"
+                    ),
+                ),
+                ("file_id", models.CharField(max_length=255, verbose_name="File ID")),
+            ],
+            options={
+                "verbose_name": "Media file",
+                "verbose_name_plural": "Media files",
+                "db_table": "media_files",
+            },
+        ),
+    ]
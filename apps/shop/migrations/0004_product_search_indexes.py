@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Full-text and trigram indexes used by apps/bot/query/search.py. Postgres
+# only; other databases use the in-memory fallback index.
+DOCUMENT_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title_uz, '') || ' ' || "
+    "coalesce(title_ru, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description_uz, '') || ' ' || "
+    "coalesce(description_ru, '')), 'B')"
+)
+TITLE_SQL = "(coalesce(title_uz, '') || ' ' || coalesce(title_ru, ''))"
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS products_search_idx "
+        f"ON products USING GIN (({DOCUMENT_SQL}))"
+    )
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS products_title_trgm_idx "
+        f"ON products USING GIN ({TITLE_SQL} gin_trgm_ops)"
+    )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS products_search_idx")
+    schema_editor.execute("DROP INDEX IF EXISTS products_title_trgm_idx")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shop", "0003_media_file"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0004_product_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "provider",
+                    models.CharField(
+                        choices=[
+                            ("PAYNET", "Paynet"),
+                            ("PAYME", "Payme"),
+                            ("CLICK", "Click"),
+                        ],
+                        max_length=100,
+                        verbose_name="Provider",
+                    ),
+                ),
+                (
+                    "transaction_id",
+                    models.CharField(max_length=255, verbose_name="Transaction ID"),
+                ),
+                (
+                    "outcome",
+                    models.CharField(
+                        choices=[("PAID", "Paid"), ("CANCELLED", "Cancelled")],
+                        max_length=20,
+                        verbose_name="Outcome",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payment_events",
+                        to="shop.order",
+                        verbose_name="Order",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Payment event",
+                "verbose_name_plural": "Payment events",
+                "db_table": "payment_events",
+                "ordering": ("-created_at",),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("provider", "transaction_id", "outcome"),
+                        name="unique_payment_event",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0005_payment_events"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxMessage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                ("task", models.CharField(max_length=255, verbose_name="Task")),
+                ("kwargs", models.JSONField(default=dict, verbose_name="Arguments")),
+                (
+                    "published_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Published at"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Outbox message",
+                "verbose_name_plural": "Outbox messages",
+                "db_table": "outbox_messages",
+                "ordering": ("id",),
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("published_at__isnull", True)),
+                        fields=["id"],
+                        name="outbox_messages_unpublished",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0006_outbox_messages"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("SENT", "Sent"),
+                            ("FAILED", "Failed"),
+                            ("BLOCKED", "Blocked"),
+                        ],
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "error",
+                    models.TextField(blank=True, null=True, verbose_name="Error"),
+                ),
+                (
+                    "chat",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notifications",
+                        to="shop.chat",
+                        verbose_name="Chat",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notifications",
+                        to="shop.order",
+                        verbose_name="Order",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Order notification",
+                "verbose_name_plural": "Order notifications",
+                "db_table": "order_notifications",
+                "ordering": ("-created_at",),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("order", "chat"), name="unique_order_notification"
+                    )
+                ],
+            },
+        ),
+    ]
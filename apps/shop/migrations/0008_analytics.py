@@ -0,0 +1,198 @@
+# Generated by Django 5.1.5 on 2026-10-18 20:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0007_order_notifications"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CohortRetention",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                ("cohort", models.DateField(verbose_name="Cohort")),
+                ("period", models.PositiveSmallIntegerField(verbose_name="Period")),
+                (
+                    "cohort_size",
+                    models.PositiveIntegerField(default=0, verbose_name="Cohort size"),
+                ),
+                ("users", models.PositiveIntegerField(default=0, verbose_name="Users")),
+            ],
+            options={
+                "verbose_name": "Cohort retention",
+                "verbose_name_plural": "Cohort retention",
+                "db_table": "analytics_cohort_retention",
+                "ordering": ("-cohort", "period"),
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyProductSales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(default=0, verbose_name="Quantity"),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=100,
+                        verbose_name="Revenue",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily product sales",
+                "verbose_name_plural": "Daily product sales",
+                "db_table": "analytics_daily_product_sales",
+                "ordering": ("-date",),
+            },
+        ),
+        migrations.CreateModel(
+            name="DailySales",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "Pending"),
+                            ("COMPLETED", "Completed"),
+                            ("CANCELLED", "Cancelled"),
+                        ],
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "payment_method",
+                    models.CharField(
+                        choices=[
+                            ("PAYNET", "Paynet"),
+                            ("PAYME", "Payme"),
+                            ("CLICK", "Click"),
+                        ],
+                        max_length=100,
+                        verbose_name="Payment method",
+                    ),
+                ),
+                (
+                    "order_type",
+                    models.CharField(
+                        choices=[("DONATE", "Donate"), ("PRODUCT", "Product")],
+                        max_length=20,
+                        verbose_name="Order type",
+                    ),
+                ),
+                (
+                    "orders",
+                    models.PositiveIntegerField(default=0, verbose_name="Orders"),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=100,
+                        verbose_name="Revenue",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily sales",
+                "verbose_name_plural": "Daily sales",
+                "db_table": "analytics_daily_sales",
+                "ordering": ("-date",),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["updated_at"], name="order_updated_at_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="cohortretention",
+            constraint=models.UniqueConstraint(
+                fields=("cohort", "period"), name="unique_cohort_retention"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailyproductsales",
+            name="product",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="daily_sales",
+                to="shop.product",
+                verbose_name="Product",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailysales",
+            constraint=models.UniqueConstraint(
+                fields=("date", "status", "payment_method", "order_type"),
+                name="unique_daily_sales",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyproductsales",
+            constraint=models.UniqueConstraint(
+                fields=("date", "product"), name="unique_daily_product_sales"
+            ),
+        ),
+    ]
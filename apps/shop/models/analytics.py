@@ -0,0 +1,99 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.shared.models.base import AbstractBaseModel
+from apps.shop.models.order import Order, PaymentMethodChoices
+
+
+class DailySales(AbstractBaseModel):
+    """
+    Orders created on a day, per status, payment method and order type.
+    """
+
+    date = models.DateField(verbose_name=_("Date"))
+    status = models.CharField(
+        max_length=20, choices=Order.Status, verbose_name=_("Status")
+    )
+    payment_method = models.CharField(
+        max_length=100, choices=PaymentMethodChoices, verbose_name=_("Payment method")
+    )
+    order_type = models.CharField(
+        max_length=20, choices=Order.OrderType, verbose_name=_("Order type")
+    )
+    orders = models.PositiveIntegerField(default=0, verbose_name=_("Orders"))
+    revenue = models.DecimalField(
+        max_digits=100, decimal_places=2, default=0, verbose_name=_("Revenue")
+    )
+
+    class Meta:
+        verbose_name = _("Daily sales")
+        verbose_name_plural = _("Daily sales")
+        ordering = ("-date",)
+        db_table = "analytics_daily_sales"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "status", "payment_method", "order_type"],
+                name="unique_daily_sales",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.status} {self.payment_method}: {self.orders}"
+
+
+class DailyProductSales(AbstractBaseModel):
+    """
+    Quantity and revenue of a product in the paid orders created on a day.
+    """
+
+    date = models.DateField(verbose_name=_("Date"))
+    product = models.ForeignKey(
+        "Product",
+        on_delete=models.CASCADE,
+        related_name="daily_sales",
+        verbose_name=_("Product"),
+    )
+    quantity = models.PositiveIntegerField(default=0, verbose_name=_("Quantity"))
+    revenue = models.DecimalField(
+        max_digits=100, decimal_places=2, default=0, verbose_name=_("Revenue")
+    )
+
+    class Meta:
+        verbose_name = _("Daily product sales")
+        verbose_name_plural = _("Daily product sales")
+        ordering = ("-date",)
+        db_table = "analytics_daily_product_sales"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "product"], name="unique_daily_product_sales"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.product_id}: {self.quantity}"
+
+
+class CohortRetention(AbstractBaseModel):
+    """
+    Of the users who joined in the week starting ``cohort``, how many paid
+    for an order ``period`` weeks later.
+    """
+
+    cohort = models.DateField(verbose_name=_("Cohort"))
+    period = models.PositiveSmallIntegerField(verbose_name=_("Period"))
+    cohort_size = models.PositiveIntegerField(default=0, verbose_name=_("Cohort size"))
+    users = models.PositiveIntegerField(default=0, verbose_name=_("Users"))
+
+    class Meta:
+        verbose_name = _("Cohort retention")
+        verbose_name_plural = _("Cohort retention")
+        ordering = ("-cohort", "period")
+        db_table = "analytics_cohort_retention"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cohort", "period"], name="unique_cohort_retention"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.cohort} +{self.period}w: {self.users}/{self.cohort_size}"
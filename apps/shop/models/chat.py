@@ -22,3 +22,43 @@ class Chat(AbstractBaseModel):
 
     def __str__(self):
         return self.name
+
+
+class OrderNotification(AbstractBaseModel):
+    """
+    Delivery of an order notification to one admin chat.
+    """
+
+    class Status(models.TextChoices):
+        SENT = "SENT", _("Sent")
+        FAILED = "FAILED", _("Failed")
+        BLOCKED = "BLOCKED", _("Blocked")
+
+    order = models.ForeignKey(
+        "Order",
+        on_delete=models.CASCADE,
+        related_name="notifications",
+        verbose_name=_("Order"),
+    )
+    chat = models.ForeignKey(
+        "Chat",
+        on_delete=models.CASCADE,
+        related_name="notifications",
+        verbose_name=_("Chat"),
+    )
+    status = models.CharField(max_length=20, choices=Status, verbose_name=_("Status"))
+    error = models.TextField(null=True, blank=True, verbose_name=_("Error"))
+
+    class Meta:
+        verbose_name = _("Order notification")
+        verbose_name_plural = _("Order notifications")
+        ordering = ("-created_at",)
+        db_table = "order_notifications"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["order", "chat"], name="unique_order_notification"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.order_id} -> {self.chat_id}: {self.status}"
@@ -0,0 +1,24 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.shared.models.base import AbstractBaseModel
+
+
+class MediaFile(AbstractBaseModel):
+    """
+    Telegram file_id of a stored image, so it is uploaded only once.
+    """
+
+    path = models.CharField(max_length=255, unique=True, verbose_name=_("Path"))
+    content_hash = models.CharField(
+        max_length=64, db_index=True, verbose_name=_("Content hash")
+    )
+    file_id = models.CharField(max_length=255, verbose_name=_("File ID"))
+
+    class Meta:
+        verbose_name = _("Media file")
+        verbose_name_plural = _("Media files")
+        db_table = "media_files"
+
+    def __str__(self):
+        return str(self.path)
@@ -54,6 +54,10 @@ class Order(AbstractBaseModel):
         ordering = ["-created_at"]
         verbose_name = _("Order")
         verbose_name_plural = _("Orders")
+        indexes = [
+            # Analytics refresh looks up the orders changed since its last run
+            models.Index(fields=["updated_at"], name="order_updated_at_idx"),
+        ]
 
     @classmethod
     def pending_orders(cls):
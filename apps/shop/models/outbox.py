@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.shared.models.base import AbstractBaseModel
+
+
+class OutboxMessage(AbstractBaseModel):
+    """
+    A Celery task call written in the same transaction as the change that
+    causes it, and sent by the outbox relay once that transaction commits.
+    """
+
+    task = models.CharField(max_length=255, verbose_name=_("Task"))
+    kwargs = models.JSONField(default=dict, verbose_name=_("Arguments"))
+    published_at = models.DateTimeField(
+        null=True, blank=True, verbose_name=_("Published at")
+    )
+
+    class Meta:
+        verbose_name = _("Outbox message")
+        verbose_name_plural = _("Outbox messages")
+        ordering = ("id",)
+        db_table = "outbox_messages"
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(published_at__isnull=True),
+                name="outbox_messages_unpublished",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.task} {self.kwargs}"
@@ -0,0 +1,45 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from apps.shared.models.base import AbstractBaseModel
+from apps.shop.models.order import Order, PaymentMethodChoices
+
+
+class PaymentEvent(AbstractBaseModel):
+    """
+    One provider callback applied to an order, keyed by the provider's
+    transaction id and outcome, so retried callbacks are applied once.
+    """
+
+    class Outcome(models.TextChoices):
+        PAID = "PAID", _("Paid")
+        CANCELLED = "CANCELLED", _("Cancelled")
+
+    provider = models.CharField(
+        max_length=100, choices=PaymentMethodChoices, verbose_name=_("Provider")
+    )
+    transaction_id = models.CharField(max_length=255, verbose_name=_("Transaction ID"))
+    outcome = models.CharField(
+        max_length=20, choices=Outcome, verbose_name=_("Outcome")
+    )
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="payment_events",
+        verbose_name=_("Order"),
+    )
+
+    class Meta:
+        verbose_name = _("Payment event")
+        verbose_name_plural = _("Payment events")
+        ordering = ("-created_at",)
+        db_table = "payment_events"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["provider", "transaction_id", "outcome"],
+                name="unique_payment_event",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.transaction_id} {self.outcome}"
@@ -0,0 +1,228 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.bot.logger import logger
+from apps.shop.models.analytics import CohortRetention, DailyProductSales, DailySales
+from apps.shop.models.order import Order, OrderItem
+from apps.shop.models.users import BotUsers
+
+WATERMARK_KEY = "analytics:watermark"
+REFRESH_KEY = "analytics:refresh"
+
+# Orders committed while a refresh runs can carry an earlier updated_at
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+COHORT_WEEKS = 8
+
+MONEY = DecimalField(max_digits=100, decimal_places=2)
+
+
+def day_bounds(day: date):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, start + timedelta(days=1)
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def replace_rows(model, scope: Q, rows: list, key_fields: list, value_fields: list):
+    """
+    Make the rows of ``model`` within ``scope`` exactly ``rows``: upsert
+    them on their unique key, then delete the keys no longer produced.
+    Unlike delete-then-insert, two refreshes of the same scope running at
+    once do not collide on the unique key; the later one wins.
+    """
+    # One lock order for every refresh, so concurrent upserts cannot deadlock
+    rows = sorted(rows, key=lambda row: [getattr(row, field) for field in key_fields])
+    keep = Q(pk__in=[])
+    for row in rows:
+        keep |= Q(**{field: getattr(row, field) for field in key_fields})
+    with transaction.atomic():
+        model.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=key_fields,
+            update_fields=[*value_fields, "updated_at"],
+        )
+        model.objects.filter(scope).exclude(keep).delete()
+
+
+def refresh_day(day: date) -> None:
+    """
+    Recompute the sales rollups of one day from its orders.
+    """
+    start, end = day_bounds(day)
+    orders = Order.objects.filter(created_at__gte=start, created_at__lt=end)
+    sales = [
+        DailySales(date=day, **row)
+        for row in orders.values("status", "payment_method", "order_type")
+        .annotate(
+            orders=Count("id"),
+            revenue=Coalesce(Sum("amount"), Value(Decimal(0)), output_field=MONEY),
+        )
+        .order_by()
+    ]
+    paid = orders.filter(
+        status=Order.Status.COMPLETED, order_type=Order.OrderType.PRODUCT
+    )
+    products = [
+        DailyProductSales(
+            date=day,
+            product_id=row["product_id"],
+            quantity=row["sold"],
+            revenue=row["sold_amount"],
+        )
+        for row in OrderItem.objects.filter(order__in=paid)
+        .values("product_id")
+        .annotate(
+            sold=Sum("quantity"),
+            sold_amount=Sum(F("price") * F("quantity"), output_field=MONEY),
+        )
+        .order_by()
+    ]
+    with transaction.atomic():
+        replace_rows(
+            DailySales,
+            Q(date=day),
+            sales,
+            ["date", "status", "payment_method", "order_type"],
+            ["orders", "revenue"],
+        )
+        replace_rows(
+            DailyProductSales,
+            Q(date=day),
+            products,
+            ["date", "product_id"],
+            ["quantity", "revenue"],
+        )
+
+
+def refresh_cohorts(today: date) -> None:
+    """
+    Recompute the retention of the last COHORT_WEEKS weekly cohorts: users
+    who joined in a week, and which of them paid for an order in each week
+    since.
+    """
+    first = week_start(today) - timedelta(weeks=COHORT_WEEKS - 1)
+    start, _end = day_bounds(first)
+
+    cohort_of = {
+        user_id: week_start(timezone.localdate(created_at))
+        for user_id, created_at in BotUsers.objects.filter(
+            created_at__gte=start
+        ).values_list("pk", "created_at")
+    }
+    sizes = Counter(cohort_of.values())
+    active = defaultdict(set)
+    for user_id, created_at in Order.objects.filter(
+        status=Order.Status.COMPLETED,
+        created_at__gte=start,
+        user__created_at__gte=start,
+    ).values_list("user_id", "created_at"):
+        cohort = cohort_of.get(user_id)
+        if cohort is None:
+            continue
+        period = (week_start(timezone.localdate(created_at)) - cohort).days // 7
+        active[cohort, period].add(user_id)
+
+    rows = []
+    for week in range(COHORT_WEEKS):
+        cohort = first + timedelta(weeks=week)
+        for period in range(COHORT_WEEKS - week):
+            rows.append(
+                CohortRetention(
+                    cohort=cohort,
+                    period=period,
+                    cohort_size=sizes[cohort],
+                    users=len(active[cohort, period]),
+                )
+            )
+    replace_rows(
+        CohortRetention,
+        Q(cohort__gte=first),
+        rows,
+        ["cohort", "period"],
+        ["cohort_size", "users"],
+    )
+
+
+def refresh(days: Iterable[date] = ()) -> List[date]:
+    """
+    Bring the rollups up to date: the given days, the days of orders
+    changed since the last refresh (the last ANALYTICS_DAYS days on the
+    first run) and the cohorts. Returns the days recomputed.
+    """
+    started = timezone.now()
+    watermark = cache.get(WATERMARK_KEY)
+    days = set(days)
+    if watermark is None:
+        today = timezone.localdate()
+        days.update(today - timedelta(days=n) for n in range(settings.ANALYTICS_DAYS))
+    else:
+        days.update(
+            Order.objects.filter(updated_at__gte=watermark).dates("created_at", "day")
+        )
+
+    for day in sorted(days):
+        refresh_day(day)
+    refresh_cohorts(timezone.localdate())
+    cache.set(WATERMARK_KEY, started - WATERMARK_OVERLAP, None)
+    return sorted(days)
+
+
+def schedule_refresh(day: date = None) -> None:
+    """
+    Queue a refresh once the current transaction commits. Changes within
+    ANALYTICS_REFRESH_DELAY share one refresh. Deletions pass the ``day``
+    of the deleted order, as the watermark cannot see them.
+    """
+    from apps.shop.tasks.analytics import refresh_analytics_task
+
+    key = f"{REFRESH_KEY}:{day.isoformat()}" if day else REFRESH_KEY
+    if not cache.add(key, 1, settings.ANALYTICS_REFRESH_DELAY):
+        return
+    days = [day.isoformat()] if day else []
+
+    def send():
+        try:
+            refresh_analytics_task.apply_async(
+                (days,), countdown=settings.ANALYTICS_REFRESH_DELAY
+            )
+        except Exception as e:
+            logger.warning(f"Could not schedule analytics refresh: {e}")
+            cache.delete(key)
+
+    transaction.on_commit(send)
+
+
+def sales(first: date, last: date):
+    return DailySales.objects.filter(date__range=(first, last)).values(
+        "date", "status", "payment_method", "order_type", "orders", "revenue"
+    )
+
+
+def top_products(first: date, last: date, limit: int):
+    return (
+        DailyProductSales.objects.filter(date__range=(first, last))
+        .values("product_id", "product__title")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("revenue"))
+        .order_by("-revenue")[:limit]
+    )
+
+
+def cohorts(today: date):
+    first = week_start(today) - timedelta(weeks=COHORT_WEEKS - 1)
+    return CohortRetention.objects.filter(cohort__gte=first).order_by(
+        "cohort", "period"
+    )
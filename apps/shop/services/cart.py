@@ -0,0 +1,466 @@
+from datetime import timedelta
+from decimal import Decimal
+from typing import List, NamedTuple, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.bot.logger import logger
+from apps.bot.utils.connections import get_redis
+from apps.shop.models.cart import Cart, CartItem
+from apps.shop.models.products import Product
+
+
+class CartLine(NamedTuple):
+    product_id: int
+    quantity: int
+    amount: Decimal
+    cart_amount: Decimal
+
+
+# Line amounts and the cart total move by the same delta, so the total
+# always equals the sum of its lines without re-aggregating the cart.
+CHANGE_QUANTITY_SQL = """
+UPDATE cart_items
+SET quantity = quantity + %(delta)s,
+    amount = coalesce(amount, 0) + %(delta)s * (
+        SELECT price FROM products WHERE products.id = cart_items.product_id
+    ),
+    updated_at = %(now)s
+WHERE product_id = %(product_id)s
+  AND quantity + %(delta)s >= 1
+  AND cart_id IN (SELECT id FROM carts WHERE user_id = %(user_id)s)
+RETURNING cart_id, quantity, amount,
+    %(delta)s * (SELECT price FROM products WHERE products.id = cart_items.product_id)
+"""
+
+REMOVE_SQL = """
+DELETE FROM cart_items
+WHERE product_id = %(product_id)s
+  AND cart_id IN (SELECT id FROM carts WHERE user_id = %(user_id)s)
+RETURNING cart_id, amount
+"""
+
+ADD_TO_TOTAL_SQL = """
+UPDATE carts
+SET amount = coalesce(amount, 0) + %(delta)s, updated_at = %(now)s
+WHERE id = %(cart_id)s
+RETURNING amount
+"""
+
+
+class DatabaseCartStore:
+    """
+    Carts kept in the carts/cart_items tables, changed in place.
+    """
+
+    def _add_to_total(self, cursor, cart_id: int, delta, now) -> Decimal:
+        cursor.execute(
+            ADD_TO_TOTAL_SQL, {"delta": delta, "now": now, "cart_id": cart_id}
+        )
+        return Decimal(str(cursor.fetchone()[0]))
+
+    def _change_quantity(
+        self, user_id: int, product_id: int, delta: int
+    ) -> Optional[CartLine]:
+        now = timezone.now()
+        params = {
+            "delta": delta,
+            "now": now,
+            "product_id": product_id,
+            "user_id": user_id,
+        }
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(CHANGE_QUANTITY_SQL, params)
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cart_id, quantity, amount, amount_delta = row
+            cart_amount = self._add_to_total(cursor, cart_id, amount_delta, now)
+        return CartLine(product_id, quantity, Decimal(str(amount)), cart_amount)
+
+    def increment(self, user_id: int, product_id: int) -> Optional[CartLine]:
+        return self._change_quantity(user_id, product_id, 1)
+
+    def decrement(self, user_id: int, product_id: int) -> Optional[CartLine]:
+        return self._change_quantity(user_id, product_id, -1)
+
+    def remove(self, user_id: int, product_id: int) -> Optional[Decimal]:
+        now = timezone.now()
+        params = {"product_id": product_id, "user_id": user_id}
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(REMOVE_SQL, params)
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cart_id, amount = row
+            return self._add_to_total(cursor, cart_id, -(amount or 0), now)
+
+    def add(self, user_id: int, product: Product, quantity: int) -> CartLine:
+        amount = product.price * quantity
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().filter(user_id=user_id).first()
+            if cart is None:
+                cart = Cart.objects.create(user_id=user_id, amount=0)
+            item = CartItem.objects.filter(cart=cart, product=product).first()
+            if item is None:
+                delta = amount
+                CartItem.objects.create(
+                    cart=cart, product=product, quantity=quantity, amount=amount
+                )
+            else:
+                delta = amount - (item.amount or 0)
+                CartItem.objects.filter(pk=item.pk).update(
+                    quantity=quantity, amount=amount, updated_at=timezone.now()
+                )
+            with connection.cursor() as cursor:
+                cart_amount = self._add_to_total(cursor, cart.pk, delta, timezone.now())
+        return CartLine(product.pk, quantity, amount, cart_amount)
+
+    def lines(self, user_id: int) -> List[CartLine]:
+        rows = list(
+            CartItem.objects.filter(cart__user_id=user_id).values_list(
+                "product_id", "quantity", "amount"
+            )
+        )
+        total = sum((amount or 0 for _pid, _quantity, amount in rows), Decimal(0))
+        return [
+            CartLine(product_id, quantity, amount or Decimal(0), total)
+            for product_id, quantity, amount in rows
+        ]
+
+    def clear(self, user_id: int) -> bool:
+        deleted, _rows = Cart.objects.filter(user_id=user_id).delete()
+        return deleted > 0
+
+    def persist(self, user_id: int) -> None:
+        # Already in the database
+        pass
+
+
+# KEYS: cart hash, persist marker. ARGV: product id, delta, ttl, persist delay.
+# Returns -1 if the cart is not loaded, 0 if the line is missing or would
+# drop below 1, otherwise {scheduled persist (0/1), HGETALL...}.
+CHANGE_QUANTITY_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return -1
+end
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+local field = 'q:' .. ARGV[1]
+local quantity = redis.call('HGET', KEYS[1], field)
+if not quantity then
+    return 0
+end
+quantity = tonumber(quantity) + tonumber(ARGV[2])
+if quantity < 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], field, quantity)
+local scheduled = redis.call('SET', KEYS[2], 1, 'NX', 'EX', ARGV[4]) and 1 or 0
+local result = redis.call('HGETALL', KEYS[1])
+table.insert(result, 1, scheduled)
+return result
+"""
+
+# KEYS: cart hash. ARGV: ttl, then field/value pairs. Only fills a missing hash.
+LOAD_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Field marking a cart as loaded even when it has no lines
+LOADED = b"_"
+
+
+class RedisCartStore:
+    """
+    Carts kept in one Redis hash per user ("q:<product>" quantity and
+    "p:<product>" price fields) that expires after CART_TTL of inactivity.
+    Changes are written to the carts/cart_items tables CART_PERSIST_DELAY
+    seconds after the first change of a burst, and at checkout.
+    """
+
+    def __init__(self):
+        self._script = None
+        self._load_script = None
+
+    def _key(self, user_id: int) -> str:
+        return f"cart:{user_id}"
+
+    def _persist_key(self, user_id: int) -> str:
+        return f"cart:{user_id}:persist"
+
+    @staticmethod
+    def _parse(data: dict) -> List[CartLine]:
+        quantities = {}
+        prices = {}
+        for field, value in data.items():
+            kind, _sep, product_id = field.decode().partition(":")
+            if kind == "q":
+                quantities[int(product_id)] = int(value)
+            elif kind == "p":
+                prices[int(product_id)] = Decimal(value.decode())
+        amounts = {
+            product_id: prices.get(product_id, Decimal(0)) * quantity
+            for product_id, quantity in quantities.items()
+        }
+        total = sum(amounts.values(), Decimal(0))
+        return [
+            CartLine(product_id, quantity, amounts[product_id], total)
+            for product_id, quantity in quantities.items()
+        ]
+
+    def _load(self, user_id: int) -> None:
+        """
+        Fill the hash from the database unless it is already loaded.
+        Database carts older than CART_TTL count as expired.
+        """
+        client = get_redis()
+        key = self._key(user_id)
+        if client.exists(key):
+            return
+        fresh_since = timezone.now() - timedelta(seconds=settings.CART_TTL)
+        items = CartItem.objects.filter(
+            cart__user_id=user_id, cart__updated_at__gte=fresh_since
+        ).values_list("product_id", "quantity", "product__price")
+        fields = [LOADED, 1]
+        for product_id, quantity, price in items:
+            fields += [f"q:{product_id}", quantity, f"p:{product_id}", str(price)]
+        if self._load_script is None:
+            self._load_script = client.register_script(LOAD_LUA)
+        # A concurrent change may have loaded the cart meanwhile; keep it
+        self._load_script(keys=[key], args=[settings.CART_TTL, *fields])
+
+    def _schedule_persist(self, user_id: int) -> None:
+        from apps.shop.tasks.cart import persist_cart_task
+
+        try:
+            persist_cart_task.apply_async(
+                (user_id,), countdown=settings.CART_PERSIST_DELAY
+            )
+        except Exception as e:
+            # Checkout persists the cart anyway; let the next change retry
+            logger.warning(f"Could not schedule persisting cart of {user_id}: {e}")
+            get_redis().delete(self._persist_key(user_id))
+
+    def _commit(self, user_id: int, pipe):
+        """
+        Run a pipeline of writes to the hash, refresh the TTL and schedule
+        the persistence. Returns the write results and the lines after them.
+        """
+        pipe.expire(self._key(user_id), settings.CART_TTL)
+        pipe.set(self._persist_key(user_id), 1, nx=True, ex=settings.CART_PERSIST_DELAY)
+        pipe.hgetall(self._key(user_id))
+        *writes, _expired, scheduled, data = pipe.execute()
+        if scheduled:
+            self._schedule_persist(user_id)
+        return writes, self._parse(data)
+
+    def _change_quantity(
+        self, user_id: int, product_id: int, delta: int
+    ) -> Optional[CartLine]:
+        if self._script is None:
+            self._script = get_redis().register_script(CHANGE_QUANTITY_LUA)
+        keys = [self._key(user_id), self._persist_key(user_id)]
+        args = [product_id, delta, settings.CART_TTL, settings.CART_PERSIST_DELAY]
+        result = self._script(keys=keys, args=args)
+        if result == -1:
+            self._load(user_id)
+            result = self._script(keys=keys, args=args)
+        if not result or result == -1:
+            return None
+
+        scheduled, *flat = result
+        if scheduled:
+            self._schedule_persist(user_id)
+        lines = self._parse(dict(zip(flat[::2], flat[1::2])))
+        return next(line for line in lines if line.product_id == product_id)
+
+    def increment(self, user_id: int, product_id: int) -> Optional[CartLine]:
+        return self._change_quantity(user_id, product_id, 1)
+
+    def decrement(self, user_id: int, product_id: int) -> Optional[CartLine]:
+        return self._change_quantity(user_id, product_id, -1)
+
+    def remove(self, user_id: int, product_id: int) -> Optional[Decimal]:
+        self._load(user_id)
+        pipe = get_redis().pipeline()
+        pipe.hdel(self._key(user_id), f"q:{product_id}", f"p:{product_id}")
+        (removed,), lines = self._commit(user_id, pipe)
+        if not removed:
+            return None
+        return lines[0].cart_amount if lines else Decimal(0)
+
+    def add(self, user_id: int, product: Product, quantity: int) -> CartLine:
+        self._load(user_id)
+        pipe = get_redis().pipeline()
+        pipe.hset(
+            self._key(user_id),
+            mapping={
+                f"q:{product.pk}": quantity,
+                f"p:{product.pk}": str(product.price),
+            },
+        )
+        _writes, lines = self._commit(user_id, pipe)
+        return next(line for line in lines if line.product_id == product.pk)
+
+    def lines(self, user_id: int) -> List[CartLine]:
+        self._load(user_id)
+        return self._parse(get_redis().hgetall(self._key(user_id)))
+
+    def clear(self, user_id: int) -> bool:
+        client = get_redis()
+        had_lines = len(self.lines(user_id)) > 0
+        client.delete(self._key(user_id), self._persist_key(user_id))
+        Cart.objects.filter(user_id=user_id).delete()
+        return had_lines
+
+    def persist(self, user_id: int) -> None:
+        """
+        Write the cart hash to the carts/cart_items tables.
+        """
+        data = get_redis().hgetall(self._key(user_id))
+        if not data:
+            # Expired or never loaded: the database copy is all there is
+            return
+        lines = self._parse(data)
+        existing = set(
+            Product.objects.filter(
+                pk__in=[line.product_id for line in lines]
+            ).values_list("pk", flat=True)
+        )
+        lines = [line for line in lines if line.product_id in existing]
+        now = timezone.now()
+
+        with transaction.atomic():
+            if not lines:
+                Cart.objects.filter(user_id=user_id).delete()
+                return
+            cart = Cart.objects.select_for_update().filter(user_id=user_id).first()
+            if cart is None:
+                cart = Cart.objects.create(user_id=user_id)
+            items = {
+                item.product_id: item for item in CartItem.objects.filter(cart=cart)
+            }
+            wanted = {line.product_id: line for line in lines}
+            CartItem.objects.filter(cart=cart).exclude(product_id__in=wanted).delete()
+
+            to_create, to_update = [], []
+            for product_id, line in wanted.items():
+                item = items.get(product_id)
+                if item is None:
+                    to_create.append(
+                        CartItem(
+                            cart=cart,
+                            product_id=product_id,
+                            quantity=line.quantity,
+                            amount=line.amount,
+                        )
+                    )
+                else:
+                    item.quantity = line.quantity
+                    item.amount = line.amount
+                    item.updated_at = now
+                    to_update.append(item)
+            CartItem.objects.bulk_create(to_create)
+            CartItem.objects.bulk_update(
+                to_update, ["quantity", "amount", "updated_at"]
+            )
+            Cart.objects.filter(pk=cart.pk).update(
+                amount=lines[0].cart_amount, updated_at=now
+            )
+
+
+_store = None
+
+
+def get_store():
+    """
+    The cart store selected by CART_STORE ("database" or "redis").
+    """
+    global _store
+    if _store is None:
+        if settings.CART_STORE == "redis":
+            _store = RedisCartStore()
+        else:
+            _store = DatabaseCartStore()
+    return _store
+
+
+def add(user_id: int, product: Product, quantity: int) -> CartLine:
+    """
+    Put ``quantity`` of ``product`` in the cart of ``user_id`` (BotUsers pk),
+    replacing the quantity of an existing line.
+    """
+    return get_store().add(user_id, product, quantity)
+
+
+def increment(user_id: int, product_id: int) -> Optional[CartLine]:
+    """
+    One more of a product in the cart. None if the product is not in it.
+    """
+    return get_store().increment(user_id, product_id)
+
+
+def decrement(user_id: int, product_id: int) -> Optional[CartLine]:
+    """
+    One less of a product, never below 1. None if the product is not in
+    the cart or already has a quantity of 1.
+    """
+    return get_store().decrement(user_id, product_id)
+
+
+def remove(user_id: int, product_id: int) -> Optional[Decimal]:
+    """
+    Remove a product from the cart. Returns the new cart total, None if
+    the product was not in it.
+    """
+    return get_store().remove(user_id, product_id)
+
+
+def lines(user_id: int) -> List[CartLine]:
+    return get_store().lines(user_id)
+
+
+def discard(user_id: int, product_ids: List[int]) -> List[CartLine]:
+    """
+    Drop the lines of products deleted since they were added (the Redis
+    store keeps their ids until then). Returns the remaining lines, with
+    the total recomputed.
+    """
+    store = get_store()
+    for product_id in product_ids:
+        store.remove(user_id, product_id)
+    return store.lines(user_id)
+
+
+def clear(user_id: int) -> bool:
+    """
+    Empty the cart of ``user_id``. False if it had nothing.
+    """
+    return get_store().clear(user_id)
+
+
+def persist(user_id: int) -> None:
+    """
+    Make sure the carts/cart_items tables hold the current cart.
+    """
+    get_store().persist(user_id)
+
+
+def recalculate(cart_id: int) -> None:
+    """
+    Recompute the total of a cart from its lines, for edits made outside
+    this module (admin).
+    """
+    total = CartItem.objects.filter(cart_id=cart_id).aggregate(
+        total=Coalesce(Sum("amount"), Value(Decimal(0)))
+    )["total"]
+    Cart.objects.filter(pk=cart_id).update(amount=total, updated_at=timezone.now())
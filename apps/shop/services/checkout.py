@@ -0,0 +1,57 @@
+import uuid
+from decimal import Decimal
+from typing import Optional
+
+from django.db import transaction
+
+from apps.shop.models.cart import CartItem
+from apps.shop.models.order import Order, OrderItem
+from apps.shop.services import cart as cart_service
+
+
+def checkout(
+    user_id: int,
+    payment_method: str,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    phone: Optional[str] = None,
+) -> Optional[Order]:
+    """
+    Turn the cart of ``user_id`` (BotUsers pk) into a pending product order.
+    Runs in one transaction and a fixed number of queries whatever the cart
+    size. None if the cart is empty.
+    """
+    cart_service.persist(user_id)
+    with transaction.atomic():
+        items = list(
+            CartItem.objects.select_for_update(of=("self",))
+            .filter(cart__user_id=user_id)
+            .select_related("product")
+        )
+        if not items:
+            return None
+
+        amount = sum((item.product.price * item.quantity for item in items), Decimal(0))
+        order = Order.objects.create(
+            order_id=f"order_{uuid.uuid4()}",
+            user_id=user_id,
+            order_type=Order.OrderType.PRODUCT,
+            amount=amount,
+            latitude=latitude,
+            longitude=longitude,
+            phone=phone,
+            payment_method=payment_method,
+        )
+        # bulk_create skips the per-item post_save that re-aggregates the order
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    product=item.product,
+                    quantity=item.quantity,
+                    price=item.product.price,
+                )
+                for item in items
+            ]
+        )
+    return order
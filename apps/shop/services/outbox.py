@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from celery import current_app
+from django.db import transaction
+from django.utils import timezone
+
+from apps.bot.logger import logger
+from apps.shop.models.outbox import OutboxMessage
+
+
+def publish(task, **kwargs) -> OutboxMessage:
+    """
+    Queue ``task`` (a Celery task) with ``kwargs`` for the outbox relay.
+    Call it inside the transaction of the change the task reacts to: the
+    task is sent only if that transaction commits.
+    """
+    return OutboxMessage.objects.create(task=task.name, kwargs=kwargs)
+
+
+def relay(batch_size: int) -> int:
+    """
+    Send up to ``batch_size`` unpublished messages to Celery, oldest first.
+    Returns how many were sent. Several relays may run at once: each takes
+    the rows the others have not locked.
+    """
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                published_at__isnull=True
+            )[:batch_size]
+        )
+        sent = []
+        for message in messages:
+            try:
+                current_app.send_task(message.task, kwargs=message.kwargs)
+            except Exception as e:
+                # The rest stays in the outbox for the next round
+                logger.error(f"Could not publish outbox message {message.pk}: {e}")
+                break
+            sent.append(message.pk)
+        OutboxMessage.objects.filter(pk__in=sent).update(published_at=timezone.now())
+    return len(sent)
+
+
+def prune(retention_days: int) -> int:
+    """
+    Delete messages published more than ``retention_days`` ago so the
+    outbox does not grow without bound. Returns how many were deleted.
+    """
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = OutboxMessage.objects.filter(published_at__lt=cutoff).delete()
+    return deleted
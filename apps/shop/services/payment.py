@@ -0,0 +1,47 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.shop.models.order import Order
+from apps.shop.models.payment import PaymentEvent
+from apps.shop.services import outbox
+
+
+def record_payment(provider: str, transaction_id, order_id: int, success: bool) -> bool:
+    """
+    Apply a provider callback to its order, once per transaction and outcome,
+    and queue its side effects in the outbox. Returns False for a repeat or
+    a callback that leaves the order as it is.
+    """
+    from apps.shop.tasks.payment import order_status_task
+
+    key = {
+        "provider": provider,
+        "transaction_id": str(transaction_id),
+        "outcome": PaymentEvent.Outcome.PAID
+        if success
+        else PaymentEvent.Outcome.CANCELLED,
+    }
+    # Retries of an applied callback are answered without taking any lock
+    if PaymentEvent.objects.filter(**key).exists():
+        return False
+
+    status = Order.Status.COMPLETED if success else Order.Status.CANCELLED
+    with transaction.atomic():
+        try:
+            # A concurrent duplicate waits on the unique key, then fails here
+            with transaction.atomic():
+                PaymentEvent.objects.create(**key, order_id=order_id)
+        except IntegrityError:
+            return False
+
+        # The UPDATE locks the order row: callbacks of the same order apply
+        # their transitions one after another
+        changed = (
+            Order.objects.filter(pk=order_id)
+            .exclude(status=status, payment_status=success)
+            .update(status=status, payment_status=success, updated_at=timezone.now())
+        )
+        if not changed:
+            return False
+        outbox.publish(order_status_task, order_id=order_id, success=success)
+    return True
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.shop.models.order import Order, OrderItem
+from apps.shop.services.analytics import schedule_refresh
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_save, sender=OrderItem)
+def refresh_analytics(sender, **kwargs):
+    schedule_refresh()
+
+
+@receiver(post_delete, sender=Order)
+def refresh_analytics_of_deleted_order(sender, instance, **kwargs):
+    schedule_refresh(timezone.localdate(instance.created_at))
+
+
+@receiver(post_delete, sender=OrderItem)
+def refresh_analytics_of_deleted_item(sender, instance, **kwargs):
+    order = Order.objects.filter(pk=instance.order_id).only("created_at").first()
+    if order is not None:
+        schedule_refresh(timezone.localdate(order.created_at))
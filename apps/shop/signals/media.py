@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from apps.bot.utils.media import invalidate_media
+from apps.shop.models.info import Info
+from apps.shop.models.news import News
+from apps.shop.models.products import Product
+
+
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=Info)
+@receiver(pre_save, sender=News)
+def invalidate_changed_image(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields and "image" not in update_fields):
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list("image", flat=True).first()
+    # A new upload may reuse the old name, so a fresh file counts as a change
+    if old and (old != instance.image.name or not instance.image._committed):
+        invalidate_media(old)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Info)
+@receiver(post_delete, sender=News)
+def invalidate_deleted_image(sender, instance, **kwargs):
+    if instance.image:
+        invalidate_media(instance.image.name)
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -8,4 +9,5 @@ from apps.shop.tasks.news import send_news_update_task
 @receiver(post_save, sender=News)
 def send_news_update(sender, instance, created, **kwargs):
     if created:
-        send_news_update_task.delay(instance.id)
+        # After commit, so buttons saved with the news are part of it
+        transaction.on_commit(lambda: send_news_update_task.delay(instance.id))
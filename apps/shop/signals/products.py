@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.bot.query.results import invalidate_inline_results
+from apps.bot.utils.catalog import invalidate_catalog
+from apps.shop.models.category import Category
+from apps.shop.models.products import Product
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_results(sender, instance, **kwargs):
+    invalidate_inline_results()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_snapshot(sender, instance, **kwargs):
+    invalidate_catalog()
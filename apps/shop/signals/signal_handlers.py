@@ -8,4 +8,4 @@ from apps.shop.tasks.payment import notify_admin_task, notify_user_task
 def order_status_updated_handler(sender, order, success, **kwargs):
     # Trigger async notifications via Celery
     notify_admin_task.delay(order.id)
-    notify_user_task.delay(order.user.id, order.id, success)
+    notify_user_task.delay(order.user_id, order.id, success)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.bot.utils.profile import invalidate_profile
+from apps.shop.models.users import BotUsers
+
+
+@receiver(post_save, sender=BotUsers)
+@receiver(post_delete, sender=BotUsers)
+def invalidate_bot_user_profile(sender, instance, **kwargs):
+    invalidate_profile(instance.telegram_id)
@@ -0,0 +1,12 @@
+from datetime import date
+
+from celery import shared_task
+
+from apps.bot.logger import logger
+from apps.shop.services import analytics
+
+
+@shared_task
+def refresh_analytics_task(days=()):
+    refreshed = analytics.refresh(date.fromisoformat(day) for day in days)
+    logger.info(f"Analytics refreshed for {len(refreshed)} days")
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from apps.shop.services import cart as cart_service
+
+
+@shared_task
+def persist_cart_task(user_id):
+    cart_service.persist(user_id)
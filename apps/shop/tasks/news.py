@@ -1,68 +1,292 @@
+import json
 import os
-import time
+import uuid
 
 from celery import shared_task
 from django.conf import settings
-from django.utils.translation import activate
-from telebot import TeleBot
+from django.db.models import Max, Min
+from django.db.models.fields.files import FieldFile
+from django.utils import translation
 from telebot.apihelper import ApiTelegramException
-from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
+from telebot.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from apps.bot.logger import logger
-from apps.bot.utils.language import set_language_code
-from apps.bot.utils.send_message import send_reply
-from apps.shop.models.news import News, NewsButton
+from apps.bot.utils.connections import get_redis
+from apps.bot.utils.media import send_photo
+from apps.bot.utils.profile import invalidate_profile
+from apps.bot.utils.client import get_bot
+from apps.shop.models.news import News
 from apps.shop.models.users import BotUsers
 
-bot = TeleBot(os.getenv("BOT_TOKEN"))
+# Broadcast state, kept until BOT_BROADCAST_TTL so a re-run resumes:
+#   broadcast:{id}         payloads, photo file_id and chunk bounds
+#   broadcast:{id}:cursor  chunk start -> last pk handled in that chunk
+#   broadcast:{id}:claim:{start}  token of the task that owns the chunk
+BROADCAST_KEY = "broadcast:{}"
+CURSOR_KEY = "broadcast:{}:cursor"
+CLAIM_KEY = "broadcast:{}:claim:{}"
 
+# KEYS: claim. ARGV: token, ttl. Extends the claim if the token still holds it.
+RENEW_CLAIM_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
 
-@shared_task()
-def send_news_update_task(news_id):
-    time.sleep(1)
-    instance = News.objects.get(id=news_id)
-    buttons = NewsButton.objects.filter(news=instance)
+# Recipients to try before giving up on uploading the photo
+UPLOAD_ATTEMPTS = 10
 
-    image = None
-    if instance.image:
-        try:
-            image_url = instance.image.url
-            if image_url.strip():
-                image_path = os.path.join(settings.MEDIA_ROOT, instance.image.name)
-                if os.path.exists(image_path):
-                    image = image_url
-                    logger.info(f"Image URL: {image}")
-                else:
-                    logger.error(f"Image file does not exist: {image_path}")
-        except Exception as e:
-            logger.error(f"Error retrieving image URL: {e}")
-            image = None
 
-    user_ids = BotUsers.objects.values_list("telegram_id", flat=True)
-    for telegram_id in user_ids:
-        try:
-            activate(set_language_code(telegram_id))
-            text = f"*{instance.title}*\n\n{instance.description}"
+def render_payloads(news: News) -> dict:
+    """
+    Text and keyboard of the news in every bot language.
+    """
+    buttons = list(news.buttons.all())
+    payloads = {}
+    for language in settings.MODELTRANSLATION_LANGUAGES:
+        with translation.override(language):
             keyboard = None
-            if buttons.exists():
-                keyboard = InlineKeyboardMarkup(row_width=1)
+            if buttons:
+                markup = InlineKeyboardMarkup(row_width=1)
                 for button in buttons:
-                    keyboard.add(
-                        InlineKeyboardButton(text=button.title, url=button.url)
-                    )
-            send_reply(
-                bot=bot,
-                user_id=telegram_id,
-                text=text,
-                reply_markup=keyboard,
-                image=image,
+                    markup.add(InlineKeyboardButton(text=button.title, url=button.url))
+                keyboard = markup.to_json()
+            payloads[language] = {
+                "text": f"*{news.title}*\n\n{news.description}",
+                "reply_markup": keyboard,
+            }
+    return payloads
+
+
+def get_image_path(news: News):
+    if not news.image:
+        return None
+    try:
+        image_path = news.image.path
+    except Exception as e:
+        logger.error(f"Error retrieving image path: {e}")
+        return None
+    if not os.path.exists(image_path):
+        logger.error(f"Image file does not exist: {image_path}")
+        return None
+    return image_path
+
+
+def deactivate_users(telegram_ids: list) -> None:
+    BotUsers.objects.filter(telegram_id__in=telegram_ids).update(is_active=False)
+    for telegram_id in telegram_ids:
+        invalidate_profile(telegram_id)
+
+
+def payload_for(payloads: dict, language_code: str) -> dict:
+    return (
+        payloads.get(language_code)
+        or payloads[settings.MODELTRANSLATION_DEFAULT_LANGUAGE]
+    )
+
+
+def deliver(telegram_id: int, payload: dict, photo=None):
+    """
+    Queue the news for one user; returns the send Future.
+    """
+    if photo:
+        return get_bot().submit(
+            "send_photo",
+            telegram_id,
+            photo,
+            caption=payload["text"],
+            parse_mode="Markdown",
+            reply_markup=payload["reply_markup"],
+        )
+    return get_bot().submit(
+        "send_message",
+        telegram_id,
+        payload["text"],
+        parse_mode="Markdown",
+        reply_markup=payload["reply_markup"],
+    )
+
+
+def upload_photo(image: FieldFile, payloads: dict, min_pk: int):
+    """
+    Send the photo to the first reachable recipient (uploading it unless the
+    media cache knows it) and return its file_id with that recipient's pk;
+    every other recipient gets the file_id.
+    """
+    recipients = (
+        BotUsers.objects.filter(is_active=True, pk__gte=min_pk)
+        .order_by("pk")
+        .values_list("pk", "telegram_id", "language_code")[:UPLOAD_ATTEMPTS]
+    )
+    for pk, telegram_id, language_code in recipients:
+        payload = payload_for(payloads, language_code)
+        try:
+            message = send_photo(
+                get_bot(),
+                telegram_id,
+                image,
+                caption=payload["text"],
+                parse_mode="Markdown",
+                reply_markup=payload["reply_markup"],
             )
-            time.sleep(0.3)
         except ApiTelegramException as e:
             if e.error_code == 403:
                 logger.error(f"User {telegram_id} has blocked the bot.")
-                BotUsers.objects.filter(telegram_id=telegram_id).update(is_active=False)
-            else:
-                logger.error(f"An error occurred: {e}")
-        except Exception as e:
-            logger.error(f"Error while sending news to user {telegram_id}: {e}")
+                deactivate_users([telegram_id])
+                continue
+            logger.error(f"Error while uploading news photo: {e}")
+            return None, None
+        return message.photo[-1].file_id, pk
+    return None, None
+
+
+def prepare_broadcast(news: News):
+    """
+    Payloads, photo file_id and chunks of a broadcast. None if the news has
+    a photo that could not be uploaded: nobody has received it yet, and a
+    re-run tries again.
+    """
+    bounds = BotUsers.objects.filter(is_active=True).aggregate(
+        min_pk=Min("pk"), max_pk=Max("pk")
+    )
+    if bounds["min_pk"] is None:
+        return {"payloads": {}, "photo": None, "chunks": []}
+
+    size = settings.BOT_BROADCAST_CHUNK_SIZE
+    chunks = [
+        (start, min(start + size - 1, bounds["max_pk"]))
+        for start in range(bounds["min_pk"], bounds["max_pk"] + 1, size)
+    ]
+    state = {"payloads": render_payloads(news), "photo": None, "chunks": chunks}
+
+    if get_image_path(news):
+        state["photo"], uploaded_pk = upload_photo(
+            news.image, state["payloads"], bounds["min_pk"]
+        )
+        if uploaded_pk is None:
+            return None
+        # Users up to the uploader are done; the first chunk starts after
+        get_redis().hset(CURSOR_KEY.format(news.id), chunks[0][0], uploaded_pk)
+    return state
+
+
+@shared_task()
+def send_news_update_task(news_id):
+    """
+    Fan a news broadcast out to chunk tasks. Running it again for the same
+    news resumes the unfinished chunks instead of starting over; chunks
+    claimed by a queued or running task are left to it.
+    """
+    client = get_redis()
+    key = BROADCAST_KEY.format(news_id)
+
+    raw_state = client.get(key)
+    if raw_state is None:
+        news = News.objects.get(id=news_id)
+        state = prepare_broadcast(news)
+        if state is None:
+            logger.error(
+                f"Broadcast of news {news_id} aborted: its photo could not be uploaded"
+            )
+            return
+        client.set(key, json.dumps(state), ex=settings.BOT_BROADCAST_TTL)
+        client.expire(CURSOR_KEY.format(news_id), settings.BOT_BROADCAST_TTL)
+    else:
+        state = json.loads(raw_state)
+        logger.info(f"Resuming broadcast of news {news_id}")
+
+    cursors = client.hgetall(CURSOR_KEY.format(news_id))
+    pending = claimed = 0
+    for start, end in state["chunks"]:
+        if int(cursors.get(str(start).encode(), start - 1)) >= end:
+            continue
+        token = uuid.uuid4().hex
+        claim_key = CLAIM_KEY.format(news_id, start)
+        if not client.set(
+            claim_key, token, nx=True, ex=settings.BOT_BROADCAST_CLAIM_TTL
+        ):
+            claimed += 1
+            continue
+        send_news_chunk_task.delay(news_id, start, end, token)
+        pending += 1
+    logger.info(
+        f"Broadcast of news {news_id}: {pending} chunks queued, "
+        f"{claimed} still claimed by earlier tasks"
+    )
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def send_news_chunk_task(news_id, start, end, token):
+    """
+    Deliver a news to active users with start <= pk <= end, in pk order,
+    checkpointing after every batch. Stops as soon as ``token`` no longer
+    holds the chunk's claim: it expired and a re-run handed the chunk to
+    another task.
+    """
+    client = get_redis()
+    renew_claim = client.register_script(RENEW_CLAIM_LUA)
+    claim_key = CLAIM_KEY.format(news_id, start)
+    raw_state = client.get(BROADCAST_KEY.format(news_id))
+    if raw_state is None:
+        logger.error(f"Broadcast of news {news_id} has expired")
+        return
+    state = json.loads(raw_state)
+    cursor_key = CURSOR_KEY.format(news_id)
+    cursor = int(client.hget(cursor_key, start) or start - 1)
+
+    sent = blocked = 0
+    while cursor < end:
+        if not renew_claim(
+            keys=[claim_key], args=[token, settings.BOT_BROADCAST_CLAIM_TTL]
+        ):
+            logger.error(
+                f"News {news_id} chunk {start}-{end} was claimed by another task"
+            )
+            return
+        batch = list(
+            BotUsers.objects.filter(is_active=True, pk__gt=cursor, pk__lte=end)
+            .order_by("pk")
+            .values_list("pk", "telegram_id", "language_code")[
+                : settings.BOT_BROADCAST_BATCH_SIZE
+            ]
+        )
+        if not batch:
+            cursor = end
+            break
+
+        futures = [
+            (
+                telegram_id,
+                deliver(
+                    telegram_id,
+                    payload_for(state["payloads"], language_code),
+                    state["photo"],
+                ),
+            )
+            for _, telegram_id, language_code in batch
+        ]
+        blocked_ids = []
+        for telegram_id, future in futures:
+            try:
+                future.result()
+                sent += 1
+            except ApiTelegramException as e:
+                if e.error_code == 403:
+                    blocked_ids.append(telegram_id)
+                else:
+                    logger.error(f"Error while sending news to user {telegram_id}: {e}")
+            except Exception as e:
+                logger.error(f"Error while sending news to user {telegram_id}: {e}")
+
+        if blocked_ids:
+            deactivate_users(blocked_ids)
+            blocked += len(blocked_ids)
+        cursor = batch[-1][0]
+        client.hset(cursor_key, start, cursor)
+
+    client.hset(cursor_key, start, end)
+    client.expire(cursor_key, settings.BOT_BROADCAST_TTL)
+    logger.info(
+        f"News {news_id} chunk {start}-{end}: {sent} sent, {blocked} blocked the bot"
+    )
@@ -1,19 +1,20 @@
-import os
-
 from celery import shared_task
+from django.db.models import Prefetch
 from django.utils.translation import gettext as _
-from telebot import TeleBot
+from telebot.apihelper import ApiTelegramException
 
-bot = TeleBot(os.getenv("BOT_TOKEN"))
+from apps.bot.logger import logger
+from apps.bot.utils.client import get_bot
 
 
 @shared_task
 def send_telegram_notification(chat_id, text, parse_mode="Markdown"):
-    return bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+    return get_bot().send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
 
 
 @shared_task
 def send_telegram_location(chat_id, latitude, longitude, text):
+    bot = get_bot()
     location_message = bot.send_location(
         chat_id=chat_id, latitude=latitude, longitude=longitude
     )
@@ -25,39 +26,130 @@ def send_telegram_location(chat_id, latitude, longitude, text):
     )
 
 
-@shared_task
-def notify_admin_task(order_id):
-    from apps.shop.models.chat import Chat
-    from apps.shop.models.order import Order, OrderItem
-
-    chats = Chat.objects.filter(is_active=True)
-    if not chats.exists():
-        return
-
-    order = Order.objects.get(id=order_id)
-    order_items = OrderItem.objects.filter(order=order)
+def render_order(order) -> str:
+    """
+    Admin notification text of an order with its items (and their products)
+    prefetched.
+    """
     your_cart_text = _("Products")
     total_text = _("Total")
 
     items_text = []
-    for index, item in enumerate(order_items, start=1):
+    for index, item in enumerate(order.orderitem_set.all(), start=1):
         items_text.append(
             f"№{index} - *{item.product.title}*\n"
-            f"{item.quantity} x {int(float(item.product.price)):,} = *{int(float(item.amount)):,} UZS*".replace(
+            f"{item.quantity} x {int(float(item.price)):,} = *{int(float(item.price * item.quantity)):,} UZS*".replace(
                 ",", " "
             )
         )
-    text = (
+    return (
         f"{your_cart_text}:\n\n{'-' * 20}\n\n"
         f"{chr(10).join(items_text)}\n\n{'-' * 20}\n\n"
         f"{total_text}: *{int(float(order.amount)):,} UZS*".replace(",", " ")
     )
 
-    # Send location and then notification message to each active chat
+
+def deactivate_chats(chat_ids: list) -> None:
+    from apps.shop.models.chat import Chat
+
+    Chat.objects.filter(chat_id__in=chat_ids).update(is_active=False)
+
+
+@shared_task
+def notify_admin_task(order_id):
+    """
+    Send an order to every active admin chat it has not reached yet: the
+    location, then the order text as a reply to it. Chats are served in
+    parallel through the send queue; the outcome is recorded per chat and
+    chats that blocked or removed the bot are deactivated.
+    """
+    from apps.shop.models.chat import Chat, OrderNotification
+    from apps.shop.models.order import Order, OrderItem
+
+    delivered = OrderNotification.objects.filter(
+        order_id=order_id, status=OrderNotification.Status.SENT
+    ).values("chat_id")
+    chats = list(Chat.objects.filter(is_active=True).exclude(pk__in=delivered))
+    if not chats:
+        return
+
+    order = Order.objects.prefetch_related(
+        Prefetch("orderitem_set", queryset=OrderItem.objects.select_related("product"))
+    ).get(id=order_id)
+    text = render_order(order)
+    bot = get_bot()
+    has_location = order.latitude is not None and order.longitude is not None
+
+    # Locations to every chat first, then each text once its location is in
+    errors = {}
+    locations = [
+        (
+            chat,
+            bot.submit(
+                "send_location",
+                chat.chat_id,
+                latitude=order.latitude,
+                longitude=order.longitude,
+            )
+            if has_location
+            else None,
+        )
+        for chat in chats
+    ]
+    messages = []
+    for chat, future in locations:
+        try:
+            reply_to = future.result().message_id if future else None
+        except Exception as e:
+            errors[chat.pk] = e
+            continue
+        messages.append(
+            (
+                chat,
+                bot.submit(
+                    "send_message",
+                    chat.chat_id,
+                    text,
+                    parse_mode="Markdown",
+                    reply_to_message_id=reply_to,
+                ),
+            )
+        )
+    for chat, future in messages:
+        try:
+            future.result()
+        except Exception as e:
+            errors[chat.pk] = e
+
+    notifications = []
+    blocked = []
     for chat in chats:
-        send_telegram_location.delay(
-            chat.chat_id, order.latitude, order.longitude, text
+        error = errors.get(chat.pk)
+        if error is None:
+            status = OrderNotification.Status.SENT
+        elif isinstance(error, ApiTelegramException) and error.error_code == 403:
+            status = OrderNotification.Status.BLOCKED
+            blocked.append(chat.chat_id)
+        else:
+            status = OrderNotification.Status.FAILED
+            logger.error(f"Error while notifying chat {chat.chat_id}: {error}")
+        notifications.append(
+            OrderNotification(
+                order=order,
+                chat=chat,
+                status=status,
+                error=str(error) if error else None,
+            )
         )
+    OrderNotification.objects.bulk_create(
+        notifications,
+        update_conflicts=True,
+        unique_fields=["order", "chat"],
+        update_fields=["status", "error", "updated_at"],
+    )
+    if blocked:
+        logger.error(f"Chats {blocked} have blocked the bot.")
+        deactivate_chats(blocked)
 
 
 @shared_task
@@ -75,3 +167,20 @@ def notify_user_task(user_id, order_id, success):
         send_telegram_notification.delay(
             user.telegram_id, message.format(order_id=order.id)
         )
+
+
+@shared_task
+def order_status_task(order_id, success):
+    """
+    Side effects of a payment callback, published through the outbox.
+    """
+    from apps.shop.models.order import Order
+    from apps.shop.services import cart as cart_service
+    from apps.shop.services.analytics import schedule_refresh
+    from apps.shop.signals.signals import order_status_updated
+
+    order = Order.objects.get(id=order_id)
+    cart_service.clear(order.user_id)
+    # The status was changed with a queryset update, which sends no signals
+    schedule_refresh()
+    order_status_updated.send(sender=Order, order=order, success=success)
@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.shop.models.category import Category
+from apps.shop.models.order import Order, OrderItem
+from apps.shop.models.products import Product
+from apps.shop.models.users import BotUsers
+from apps.shop.services import cart as cart_service
+from apps.shop.services.checkout import checkout
+
+CHECKOUT_QUERIES = 5
+
+
+class CheckoutTests(TestCase):
+    """
+    Checkout runs the same queries whatever the cart size.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Category")
+        cls.products = [
+            Product.objects.create(
+                category=category,
+                title=f"Product {i}",
+                description="Description",
+                price=Decimal("10.50") + i,
+                quantity=100,
+            )
+            for i in range(20)
+        ]
+
+    def fill_cart(self, telegram_id: int, size: int) -> BotUsers:
+        user = BotUsers.objects.create(telegram_id=telegram_id, first_name="Test")
+        for product in self.products[:size]:
+            cart_service.add(user.pk, product, 2)
+        return user
+
+    def test_queries_do_not_grow_with_cart(self):
+        for telegram_id, size in ((1, 1), (2, len(self.products))):
+            with self.subTest(size=size):
+                user = self.fill_cart(telegram_id, size)
+                with self.assertNumQueries(CHECKOUT_QUERIES):
+                    order = checkout(user.pk, "PAYME", 41.3, 69.2, "+998901234567")
+
+                products = self.products[:size]
+                self.assertEqual(order.status, Order.Status.PENDING)
+                self.assertEqual(
+                    order.amount, sum((p.price * 2 for p in products), Decimal(0))
+                )
+                self.assertEqual(OrderItem.objects.filter(order=order).count(), size)
+
+    def test_empty_cart(self):
+        user = BotUsers.objects.create(telegram_id=3, first_name="Test")
+        self.assertIsNone(checkout(user.pk, "PAYME"))
@@ -0,0 +1,71 @@
+import threading
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TransactionTestCase
+from payme.models import PaymeTransactions
+
+from apps.shop.models.order import Order
+from apps.shop.models.outbox import OutboxMessage
+from apps.shop.models.payment import PaymentEvent
+from apps.shop.models.users import BotUsers
+from apps.shop.views.payment import PaymeCallBackAPIView
+
+THREADS = 8
+
+
+class PaymentCallbackTests(TransactionTestCase):
+    """
+    Provider retries of one callback, delivered in parallel, change the
+    order once.
+    """
+
+    def setUp(self):
+        user = BotUsers.objects.create(telegram_id=1, first_name="Test")
+        self.order = Order.objects.create(user=user, amount=Decimal("100.00"))
+        PaymeTransactions.objects.create(
+            transaction_id="tx-1", account_id=str(self.order.pk), amount=100
+        )
+
+    def fire(self, success: bool) -> list:
+        barrier = threading.Barrier(THREADS)
+        results, errors = [], []
+
+        def callback():
+            try:
+                barrier.wait()
+                results.append(
+                    PaymeCallBackAPIView().handle_payment({"id": "tx-1"}, success)
+                )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=callback) for _ in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        return results
+
+    def test_parallel_duplicates_apply_once(self):
+        results = self.fire(success=True)
+
+        self.assertEqual(results.count(True), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.Status.COMPLETED)
+        self.assertTrue(self.order.payment_status)
+        self.assertEqual(PaymentEvent.objects.count(), 1)
+        self.assertEqual(OutboxMessage.objects.count(), 1)
+
+    def test_cancel_after_payment_applies_once(self):
+        self.fire(success=True)
+        results = self.fire(success=False)
+
+        self.assertEqual(results.count(True), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.Status.CANCELLED)
+        self.assertEqual(OutboxMessage.objects.count(), 2)
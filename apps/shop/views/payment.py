@@ -4,16 +4,9 @@ from payme.models import PaymeTransactions
 from payme.views import PaymeWebHookAPIView
 from rest_framework.permissions import AllowAny
 
-from apps.shop.models.cart import Cart
-from apps.shop.models.order import Order
-from apps.shop.signals.signals import order_status_updated
-
-
-def update_order_status(order, status, is_completed=False):
-    order.payment_status = status
-    order.status = Order.Status.COMPLETED if is_completed else Order.Status.CANCELLED
-    order.save()
-    return order
+from apps.bot.logger import logger
+from apps.shop.models.order import PaymentMethodChoices
+from apps.shop.services.payment import record_payment
 
 
 class PaymeCallBackAPIView(PaymeWebHookAPIView):
@@ -26,14 +19,19 @@ class PaymeCallBackAPIView(PaymeWebHookAPIView):
 
     def handle_payment(self, params, success):
         transaction = PaymeTransactions.get_by_transaction_id(params["id"])
-        order = Order.objects.get(id=transaction.account_id)
-        order = update_order_status(order, success, success)
-        Cart.objects.filter(user=order.user).delete()
-
-        # Send signal for asynchronous notifications
-        order_status_updated.send(sender=self.__class__, order=order, success=success)
-        print(f"payment {'successful' if success else 'cancelled'} params: {params}")
-        return order
+        changed = record_payment(
+            PaymentMethodChoices.PAYME,
+            transaction.transaction_id,
+            transaction.account_id,
+            success,
+        )
+        if changed:
+            logger.info(
+                f"Payment {'successful' if success else 'cancelled'} params: {params}"
+            )
+        else:
+            logger.info(f"Payment callback already processed params: {params}")
+        return changed
 
     def handle_successfully_payment(self, params, result, *args, **kwargs):
         self.handle_payment(params, success=True)
@@ -45,14 +43,19 @@ class PaymeCallBackAPIView(PaymeWebHookAPIView):
 class ClickWebhookAPIView(ClickWebhook):
     def handle_payment(self, params, success):
         transaction = ClickTransaction.objects.get(transaction_id=params.click_trans_id)
-        order = Order.objects.get(id=transaction.account_id)
-        order = update_order_status(order, success, success)
-        Cart.objects.filter(user=order.user).delete()
-
-        # Send signal for asynchronous notifications
-        order_status_updated.send(sender=self.__class__, order=order, success=success)
-        print(f"payment {'successful' if success else 'cancelled'} params: {params}")
-        return order
+        changed = record_payment(
+            PaymentMethodChoices.CLICK,
+            transaction.transaction_id,
+            transaction.account_id,
+            success,
+        )
+        if changed:
+            logger.info(
+                f"Payment {'successful' if success else 'cancelled'} params: {params}"
+            )
+        else:
+            logger.info(f"Payment callback already processed params: {params}")
+        return changed
 
     def successfully_payment(self, params):
         self.handle_payment(params, success=True)
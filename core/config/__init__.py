@@ -1,4 +1,5 @@
 from .apps import *  # noqa
+from .bot import *  # noqa
 from .cache import *  # noqa
 from .jwt import *  # noqa
 from .logs import *  # noqa
@@ -0,0 +1,104 @@
+import os
+
+############################################
+# BOT USER PROFILE CACHE
+############################################
+BOT_PROFILE_CACHE_SIZE = int(os.getenv("BOT_PROFILE_CACHE_SIZE", 10000))
+BOT_PROFILE_LOCAL_TTL = int(os.getenv("BOT_PROFILE_LOCAL_TTL", 60))
+BOT_PROFILE_SHARED_TTL = int(os.getenv("BOT_PROFILE_SHARED_TTL", 3600))
+
+############################################
+# BOT USER WRITE-BEHIND
+############################################
+BOT_USER_FLUSH_INTERVAL = int(os.getenv("BOT_USER_FLUSH_INTERVAL", 500))  # ms
+BOT_USER_FLUSH_BATCH_SIZE = int(os.getenv("BOT_USER_FLUSH_BATCH_SIZE", 500))
+
+############################################
+# ASYNC BOT RUNTIME
+############################################
+# Handler threads: also the number of updates handled at once
+BOT_ASYNC_WORKERS = int(os.getenv("BOT_ASYNC_WORKERS", 64))
+BOT_ASYNC_CONNECTIONS = int(os.getenv("BOT_ASYNC_CONNECTIONS", 100))
+
+############################################
+# WEBHOOK INGESTION
+############################################
+BOT_WEBHOOK_URL = os.getenv("BOT_WEBHOOK_URL")
+BOT_WEBHOOK_SECRET = os.getenv("BOT_WEBHOOK_SECRET")
+BOT_UPDATES_REDIS_URL = os.getenv(
+    "BOT_UPDATES_REDIS_URL", os.getenv("REDIS_CACHE_URL", "redis://redis:6379/1")
+)
+BOT_UPDATES_STREAM = os.getenv("BOT_UPDATES_STREAM", "bot:updates")
+BOT_UPDATES_STREAM_MAXLEN = int(os.getenv("BOT_UPDATES_STREAM_MAXLEN", 100000))
+BOT_UPDATES_GROUP = os.getenv("BOT_UPDATES_GROUP", "bot-workers")
+BOT_UPDATES_READ_COUNT = int(os.getenv("BOT_UPDATES_READ_COUNT", 100))
+BOT_UPDATES_SHARDS = int(os.getenv("BOT_UPDATES_SHARDS", 8))
+BOT_UPDATES_LEASE = int(os.getenv("BOT_UPDATES_LEASE", 60))
+
+############################################
+# CONVERSATION STATE
+############################################
+BOT_STATE_TTL = int(os.getenv("BOT_STATE_TTL", 86400))
+
+############################################
+# RATE LIMITS
+############################################
+BOT_REDIS_URL = os.getenv(
+    "BOT_REDIS_URL", os.getenv("REDIS_CACHE_URL", "redis://redis:6379/1")
+)
+BOT_ANTIFLOOD_RATE = float(os.getenv("BOT_ANTIFLOOD_RATE", 0.5))
+BOT_ANTIFLOOD_BURST = int(os.getenv("BOT_ANTIFLOOD_BURST", 3))
+BOT_ANTIFLOOD_LOCAL_SIZE = int(os.getenv("BOT_ANTIFLOOD_LOCAL_SIZE", 10000))
+
+############################################
+# OUTBOUND SEND QUEUE
+############################################
+BOT_SEND_RATE = float(os.getenv("BOT_SEND_RATE", 30))
+BOT_SEND_BURST = int(os.getenv("BOT_SEND_BURST", 30))
+BOT_SEND_CHAT_RATE = float(os.getenv("BOT_SEND_CHAT_RATE", 1))
+BOT_SEND_CHAT_BURST = int(os.getenv("BOT_SEND_CHAT_BURST", 3))
+BOT_SEND_WORKERS = int(os.getenv("BOT_SEND_WORKERS", 8))
+BOT_SEND_MAX_RETRIES = int(os.getenv("BOT_SEND_MAX_RETRIES", 5))
+
+############################################
+# NEWS BROADCAST
+############################################
+BOT_BROADCAST_CHUNK_SIZE = int(os.getenv("BOT_BROADCAST_CHUNK_SIZE", 5000))
+BOT_BROADCAST_BATCH_SIZE = int(os.getenv("BOT_BROADCAST_BATCH_SIZE", 50))
+BOT_BROADCAST_TTL = int(os.getenv("BOT_BROADCAST_TTL", 7 * 24 * 3600))
+# A queued or running chunk task holds its chunk for this long, renewed per batch
+BOT_BROADCAST_CLAIM_TTL = int(os.getenv("BOT_BROADCAST_CLAIM_TTL", 3600))
+
+############################################
+# INLINE QUERY
+############################################
+BOT_INLINE_CACHE_TIME = int(os.getenv("BOT_INLINE_CACHE_TIME", 300))
+BOT_INLINE_RESULTS_LIMIT = int(os.getenv("BOT_INLINE_RESULTS_LIMIT", 500))
+BOT_INLINE_RESULTS_TTL = int(os.getenv("BOT_INLINE_RESULTS_TTL", 86400))
+BOT_INLINE_VERSION_TTL = int(os.getenv("BOT_INLINE_VERSION_TTL", 5))
+
+############################################
+# CATALOG SNAPSHOT
+############################################
+BOT_CATALOG_VERSION_TTL = int(os.getenv("BOT_CATALOG_VERSION_TTL", 5))
+
+############################################
+# BOT IDENTITY
+############################################
+BOT_IDENTITY_REFRESH = int(os.getenv("BOT_IDENTITY_REFRESH", 3600))
+BOT_IDENTITY_TTL = int(os.getenv("BOT_IDENTITY_TTL", 86400))
+
+############################################
+# CART
+############################################
+# "database" or "redis"
+CART_STORE = os.getenv("CART_STORE", "database")
+CART_TTL = int(os.getenv("CART_TTL", 7 * 24 * 3600))
+CART_PERSIST_DELAY = int(os.getenv("CART_PERSIST_DELAY", 30))
+
+############################################
+# TELEGRAM HTTP CLIENT (Celery workers)
+############################################
+BOT_HTTP_POOL_SIZE = int(os.getenv("BOT_HTTP_POOL_SIZE", 16))
+BOT_HTTP_RETRIES = int(os.getenv("BOT_HTTP_RETRIES", 3))
+BOT_HTTP_BACKOFF = float(os.getenv("BOT_HTTP_BACKOFF", 0.5))
@@ -20,5 +20,16 @@ CELERY_BROKER_URL = os.getenv("CELERY_BROKER", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
+
+# Outbox relay (manage.py outbox_relay)
+OUTBOX_RELAY_INTERVAL = float(os.getenv("OUTBOX_RELAY_INTERVAL", 0.5))
+OUTBOX_RELAY_BATCH = int(os.getenv("OUTBOX_RELAY_BATCH", 100))
+# Published messages are kept this many days, pruned every OUTBOX_PRUNE_INTERVAL seconds
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", 7))
+OUTBOX_PRUNE_INTERVAL = int(os.getenv("OUTBOX_PRUNE_INTERVAL", 3600))
+
+# Sales analytics rollups (manage.py analytics_rebuild)
+ANALYTICS_REFRESH_DELAY = int(os.getenv("ANALYTICS_REFRESH_DELAY", 60))
+ANALYTICS_DAYS = int(os.getenv("ANALYTICS_DAYS", 28))
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
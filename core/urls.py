@@ -4,11 +4,13 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from django.views.static import serve
 
+from apps.bot.webhook import TelegramWebhookView
 from core.config.swagger import urlpatterns as swagger_patterns
 
 urlpatterns = (
     [
         path("i18n/", include("django.conf.urls.i18n")),
+        path("bot/webhook/", TelegramWebhookView.as_view(), name="bot-webhook"),
     ]
     + i18n_patterns(
         path("admin/", admin.site.urls),